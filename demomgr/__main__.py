@@ -1,8 +1,11 @@
 """
 Alternative module call for "py -m demomgr"
 """
+import multiprocessing
+
 from demomgr.main_app import MainApp
 
 if __name__ == "__main__":
+	multiprocessing.freeze_support()
 	m = MainApp()
 	m.root.mainloop()
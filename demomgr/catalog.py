@@ -0,0 +1,344 @@
+"""
+Persistent catalog of the demo library, stored next to the config.
+It remembers file system info, demo info and headers of the demos in
+every directory that was read, so they survive directory switches and
+program restarts.
+Nothing in it is trusted blindly: directory listings are revalidated by
+the directory's modification time, headers by their demo's size and
+modification time and demo info by the validator of its container, see
+`DemoDataManager.get_info_validators`.
+"""
+
+from contextlib import contextmanager
+import json
+import os
+import sqlite3
+import threading
+import typing as t
+
+from demomgr.constants import DATA_GRAB_MODE
+from demomgr.demo_info import DemoInfo, LazyDemoInfo
+from demomgr import platforming
+
+_SCHEMA_VERSION = 1
+# Stay well below SQLite's (old) limit of 999 host parameters.
+_MAX_PARAMS = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS directory (
+	path TEXT PRIMARY KEY,
+	mtime_ns INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS demo (
+	directory TEXT NOT NULL,
+	name TEXT NOT NULL,
+	size INTEGER,
+	mtime REAL,
+	info_mode INTEGER,
+	info_validator TEXT,
+	info TEXT,
+	header TEXT,
+	PRIMARY KEY (directory, name)
+) WITHOUT ROWID;
+"""
+
+
+class CatalogError(OSError):
+	"""
+	Raised when an operation on the catalog fails.
+	"""
+
+
+class CatalogEntry(t.NamedTuple):
+	"""
+	Everything the catalog knows about a demo.
+	`info_validator` is `None` if no demo info is stored for the demo;
+	otherwise the info returned by `get_info` is valid for `info_mode`
+	as long as the validator matches, even if it is `None`.
+	Demo info and header are only decoded on request.
+	"""
+	size: t.Optional[int]
+	mtime: t.Optional[float]
+	info_mode: t.Optional[DATA_GRAB_MODE]
+	info_validator: t.Optional[str]
+	info_data: t.Optional[str]
+	header_data: t.Optional[str]
+
+	def get_info(self, name: str) -> t.Optional[DemoInfo]:
+		return _decode_info(name, self.info_data)
+
+	def get_header(self) -> t.Optional[t.Dict]:
+		return None if self.header_data is None else json.loads(self.header_data)
+
+
+@contextmanager
+def _translate_errors():
+	try:
+		yield
+	except sqlite3.Error as e:
+		raise CatalogError(f"Catalog error: {e}") from e
+
+
+# Demo info not parsed yet is stored as its source, prefixed by one of these.
+_SOURCE_LOGCHUNK = "L"
+_SOURCE_JSON = "J"
+
+def _encode_info(info: t.Optional[DemoInfo]) -> t.Optional[str]:
+	if info is None:
+		return None
+	if isinstance(info, LazyDemoInfo):
+		source = info.get_source()
+		if source is not None:
+			return (_SOURCE_JSON if source[1] else _SOURCE_LOGCHUNK) + source[0]
+	return json.dumps([list(info.killstreaks.iter_tuples()), list(info.bookmarks.iter_tuples())])
+
+def _decode_info(name: str, data: t.Optional[str]) -> t.Optional[DemoInfo]:
+	if data is None:
+		return None
+	if data[:1] in (_SOURCE_LOGCHUNK, _SOURCE_JSON):
+		return LazyDemoInfo.from_source(name, data[1:], data[0] == _SOURCE_JSON)
+	ks, bm = json.loads(data)
+	return DemoInfo(name, ks, bm)
+
+
+class Catalog():
+	"""
+	The catalog database. Thread-safe, as each thread gets its own
+	connection.
+	"""
+
+	def __init__(self, path: str) -> None:
+		"""
+		path: Path to the catalog's database file. Its directory is
+			created if it does not exist.
+
+		May raise: OSError.
+		"""
+		self.path = path
+		self._local = threading.local()
+		os.makedirs(os.path.dirname(path), exist_ok = True)
+		conn = self._get_conn()
+		with _translate_errors():
+			if conn.execute("PRAGMA user_version").fetchone()[0] != _SCHEMA_VERSION:
+				with conn:
+					conn.executescript(
+						"DROP TABLE IF EXISTS directory; DROP TABLE IF EXISTS demo;" + _SCHEMA
+					)
+					conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+
+	def _get_conn(self) -> sqlite3.Connection:
+		conn = getattr(self._local, "conn", None)
+		if conn is None:
+			with _translate_errors():
+				conn = sqlite3.connect(self.path, timeout = 10.0)
+				conn.execute("PRAGMA journal_mode = WAL")
+			self._local.conn = conn
+		return conn
+
+	@staticmethod
+	def _key(directory: str) -> str:
+		return os.path.normcase(os.path.normpath(directory))
+
+	def get_directory_mtime(self, directory: str) -> t.Optional[int]:
+		"""
+		Returns the modification time in nanoseconds `directory` had when
+		its listing was last stored, or `None` if it never was.
+
+		May raise: OSError.
+		"""
+		with _translate_errors():
+			row = self._get_conn().execute(
+				"SELECT mtime_ns FROM directory WHERE path = ?", (self._key(directory),)
+			).fetchone()
+		return None if row is None else row[0]
+
+	def get_entries(self, directory: str) -> t.Dict[str, CatalogEntry]:
+		"""
+		Returns all catalog entries of demos in `directory`, mapped by
+		their name.
+
+		May raise: OSError.
+		"""
+		res = {}
+		with _translate_errors():
+			cur = self._get_conn().execute(
+				"SELECT name, size, mtime, info_mode, info_validator, info, header "
+				"FROM demo WHERE directory = ?",
+				(self._key(directory),),
+			)
+			for name, size, mtime, info_mode, validator, info, header in cur:
+				res[name] = CatalogEntry(
+					size,
+					mtime,
+					None if info_mode is None else DATA_GRAB_MODE(info_mode),
+					validator,
+					info,
+					header,
+				)
+		return res
+
+	def update_directory(
+		self,
+		directory: str,
+		mtime_ns: t.Optional[int],
+		listing: t.Optional[t.Sequence[str]],
+		changed: t.Sequence[t.Tuple[
+			str, t.Optional[int], t.Optional[float], DATA_GRAB_MODE, t.Optional[str],
+			t.Optional[DemoInfo],
+		]],
+	) -> None:
+		"""
+		Updates the entries of `directory` in a single transaction.
+
+		mtime_ns: Modification time the directory had before it was
+			listed, or `None` if it is unknown, in which case the listing
+			won't be trusted next time.
+		listing: Names of all demos in the directory. Entries of demos not
+			contained are removed. May be `None` if the listing was taken
+			from the catalog in the first place.
+		changed: Sequence of (name, size, mtime, info_mode,
+			info_validator, info) tuples for all demos whose entry is new
+			or changed. Stored headers are kept if size and modification
+			time did not change.
+
+		May raise: OSError.
+		"""
+		key = self._key(directory)
+		conn = self._get_conn()
+		with _translate_errors(), conn:
+			if listing is not None:
+				conn.execute("CREATE TEMP TABLE IF NOT EXISTS listed (name TEXT PRIMARY KEY)")
+				conn.execute("DELETE FROM temp.listed")
+				conn.executemany("INSERT OR IGNORE INTO temp.listed VALUES (?)", ((n,) for n in listing))
+				conn.execute(
+					"DELETE FROM demo WHERE directory = ? AND "
+					"name NOT IN (SELECT name FROM temp.listed)",
+					(key,),
+				)
+			self._upsert_demos(conn, key, changed)
+			if mtime_ns is None:
+				conn.execute("DELETE FROM directory WHERE path = ?", (key,))
+			else:
+				conn.execute(
+					"INSERT OR REPLACE INTO directory (path, mtime_ns) VALUES (?, ?)", (key, mtime_ns)
+				)
+
+	def put_info(
+		self,
+		directory: str,
+		items: t.Iterable[t.Tuple[
+			str, t.Optional[int], t.Optional[float], DATA_GRAB_MODE, t.Optional[str],
+			t.Optional[DemoInfo],
+		]],
+	) -> None:
+		"""
+		Stores demo info of demos in `directory` in a single transaction,
+		without touching the directory's listing.
+		`items` are tuples as taken by `update_directory`'s `changed`.
+
+		May raise: OSError.
+		"""
+		conn = self._get_conn()
+		with _translate_errors(), conn:
+			self._upsert_demos(conn, self._key(directory), items)
+
+	@staticmethod
+	def _upsert_demos(conn: sqlite3.Connection, key: str, items: t.Iterable[t.Tuple]) -> None:
+		conn.executemany(
+			"INSERT INTO demo (directory, name, size, mtime, info_mode, info_validator, info) "
+			"VALUES (?, ?, ?, ?, ?, ?, ?) "
+			"ON CONFLICT (directory, name) DO UPDATE SET "
+			"header = CASE WHEN size IS excluded.size AND mtime IS excluded.mtime "
+			"THEN header ELSE NULL END, "
+			"size = excluded.size, mtime = excluded.mtime, info_mode = excluded.info_mode, "
+			"info_validator = excluded.info_validator, info = excluded.info",
+			(
+				(key, name, size, mtime, int(mode), validator, _encode_info(info))
+				for name, size, mtime, mode, validator, info in items
+			),
+		)
+
+	def get_headers(
+		self, directory: str, names: t.Sequence[str]
+	) -> t.Dict[str, t.Tuple[int, float, t.Dict]]:
+		"""
+		Returns a dict mapping names of demos in `directory` to a tuple
+		of their size and modification time at the time their header was
+		stored and the header itself, for all demos in `names` that have
+		one stored.
+
+		May raise: OSError.
+		"""
+		key = self._key(directory)
+		names = list(names)
+		res = {}
+		with _translate_errors():
+			conn = self._get_conn()
+			for i in range(0, len(names), _MAX_PARAMS):
+				batch = names[i:i + _MAX_PARAMS]
+				cur = conn.execute(
+					f"SELECT name, size, mtime, header FROM demo WHERE directory = ? AND "
+					f"header IS NOT NULL AND name IN ({', '.join('?' * len(batch))})",
+					(key, *batch),
+				)
+				for name, size, mtime, header in cur:
+					res[name] = (size, mtime, json.loads(header))
+		return res
+
+	def put_headers(
+		self, directory: str, items: t.Iterable[t.Tuple[str, int, float, t.Dict]]
+	) -> None:
+		"""
+		Stores headers of demos in `directory` given as (name, size,
+		mtime, header) tuples in a single transaction.
+		If the size or modification time differ from the stored ones, the
+		demo's stored demo info is dropped.
+
+		May raise: OSError.
+		"""
+		key = self._key(directory)
+		conn = self._get_conn()
+		with _translate_errors(), conn:
+			conn.executemany(
+				"INSERT INTO demo (directory, name, size, mtime, header) VALUES (?, ?, ?, ?, ?) "
+				"ON CONFLICT (directory, name) DO UPDATE SET "
+				"info_validator = CASE WHEN size IS excluded.size AND mtime IS excluded.mtime "
+				"THEN info_validator ELSE NULL END, "
+				"size = excluded.size, mtime = excluded.mtime, header = excluded.header",
+				(
+					(key, name, size, mtime, json.dumps(header))
+					for name, size, mtime, header in items
+				),
+			)
+
+	def remove_directory(self, directory: str) -> None:
+		"""
+		Removes everything stored about `directory`.
+
+		May raise: OSError.
+		"""
+		key = self._key(directory)
+		conn = self._get_conn()
+		with _translate_errors(), conn:
+			conn.execute("DELETE FROM demo WHERE directory = ?", (key,))
+			conn.execute("DELETE FROM directory WHERE path = ?", (key,))
+
+
+_catalog: t.Optional[Catalog] = None
+_catalog_failed = False
+_catalog_lock = threading.Lock()
+
+def get_catalog() -> t.Optional[Catalog]:
+	"""
+	Returns the process-wide catalog, opening it if necessary.
+	Returns `None` if it could not be opened, in which case no further
+	attempts are made.
+	"""
+	global _catalog, _catalog_failed
+	with _catalog_lock:
+		if _catalog is None and not _catalog_failed:
+			try:
+				_catalog = Catalog(platforming.get_catalog_storage_path())
+			except OSError:
+				_catalog_failed = True
+		return _catalog
@@ -131,10 +131,18 @@ DEFAULT = {
 	"file_manager_path": None,
 	"_comment": "By messing with the firstrun parameter you acknowledge the disclaimer :P",
 	"first_run": True,
+	"hardlink_copies": False,
+	"header_columns": False,
 	"hlae_path": None,
 	"hlae_tf2_exe_name": "tf.exe",
+	"io_bytes_per_sec": 0,
+	"io_game_mode": True,
+	"io_low_priority": False,
+	"io_ops_per_sec": 0,
 	"last_path": None,
 	"lazy_reload": False,
+	"library_catalog": True,
+	"parse_processes": 0,
 	"preview_demos": True,
 	"rcon_port": 27015,
 	"rcon_pwd": None,
@@ -143,8 +151,12 @@ DEFAULT = {
 		"launch_tf2": [],
 		"settings": [],
 		"bulk_operator": [],
+		"rename": [],
 	},
 	"ui_theme": "Dark",
+	"validate_json": False,
+	"watch_directory": False,
+	"worker_threads": 3,
 }
 
 
@@ -162,10 +174,18 @@ _SCHEMA = Schema(
 		"file_manager_path": Or(None, StringClipper(CNST.PATH_MAX)),
 		"_comment": str,
 		"first_run": bool,
+		"hardlink_copies": bool,
+		"header_columns": bool,
 		"hlae_path": Or(None, StringClipper(CNST.PATH_MAX)),
 		"hlae_tf2_exe_name": And(StringClipper(CNST.FILENAME_MAX), lambda x: x != ""),
+		"io_bytes_per_sec": IntClipper(0, 1 << 40),
+		"io_game_mode": bool,
+		"io_low_priority": bool,
+		"io_ops_per_sec": IntClipper(0, 1 << 20),
 		"last_path": Or(str, None, int), # str only for pre-1.9.0 comp
 		"lazy_reload": bool,
+		"library_catalog": bool,
+		"parse_processes": IntClipper(0, 64),
 		"preview_demos": bool,
 		"rcon_port": IntClipper(0, 65535),
 		"rcon_pwd": Or(None, StringClipper(CNST.RCON_PWD_MAX)),
@@ -180,8 +200,12 @@ _SCHEMA = Schema(
 				[CNST.BULK_OPERATION.DELETE, ""],
 				[EnumTransformer(CNST.BULK_OPERATION), StringClipper(CNST.PATH_MAX)],
 			),
+			"rename": RememberListValidator(["{name}"], [StringClipper(CNST.FILENAME_MAX)]),
 		},
 		"ui_theme": str,
+		"validate_json": bool,
+		"watch_directory": bool,
+		"worker_threads": IntClipper(1, 32),
 	},
 	ignore_extra_keys = True,
 )
@@ -8,6 +8,7 @@ class DATA_GRAB_MODE(IntEnum):
 	NONE = 0
 	EVENTS = 1
 	JSON = 2
+	SQLITE = 3
 
 	def get_display_name(self):
 		if self is self.NONE:
@@ -16,6 +17,8 @@ class DATA_GRAB_MODE(IntEnum):
 			return EVENT_FILE
 		elif self is self.JSON:
 			return ".json"
+		elif self is self.SQLITE:
+			return "SQLite database"
 
 
 class FILE_MANAGER_MODE(IntEnum):
@@ -29,6 +32,12 @@ class BULK_OPERATION(IntEnum):
 	DELETE = 2
 
 
+class BOOKMARK_OPERATION(IntEnum):
+	ADD = 0
+	REMOVE = 1
+	RENAME = 2
+
+
 WELCOME = (
 	"Hi and Thank You for using Demomgr!\n\n"
 	"This program is able to delete files if you tell it to.\n"
@@ -39,6 +48,7 @@ WELCOME = (
 )
 
 EVENT_FILE = "_events.txt"
+DATABASE_FILE = "_demomgr.sqlite"
 
 DATE_FORMATS = (
 	"%d.%m.%Y %H:%M:%S",
@@ -53,6 +63,9 @@ EVENTFILE_KILLSTREAK = "Killstreak"
 
 STATUSBARDEFAULT = "Ready."
 
+# Pseudo demo path shown in the path selection to view all demo paths at once.
+ALL_DEMO_PATHS = "<All demo paths>"
+
 TF2_HEAD_PATH = "steamapps/common/Team Fortress 2/"
 TF2_FS_ROOT_TAIL_PATH = "tf/"
 TF2_LAUNCHARGS = ["-steam", "-game", "tf"]
@@ -74,6 +87,11 @@ STEAM_CFG_PATH1 = "config/localconfig.vdf"
 STEAM_EXE = "steam.exe"
 STEAM_SH = "steam.sh"
 
+# Lowercase names of the game's processes. On Linux, they are cut off after 15 characters.
+GAME_PROCESS_NAMES = frozenset((
+	"hl2.exe", "tf.exe", "tf_win64.exe", "hl2_linux", "tf_linux64",
+))
+
 PATH_MAX = 4095
 RCON_PWD_MAX = 512
 FILENAME_MAX = 512
@@ -91,6 +109,16 @@ STEAM_CFG_USER_NAME = ("UserLocalConfigStore", "friends", "PersonaName")
 # Setting this to lower values might lock the UI, use with care.
 
 GUI_UPDATE_WAIT = 30
+# Maximum time in msecs a ThreadGroup callback spends processing its queue
+# before handing control back to tkinter.
+GUI_UPDATE_BUDGET = 12
+
+# Directories needing demo information read for at least this many demos show
+# them right away and load their info in the background, visible rows first.
+DEFER_INFO_MIN_DEMOS = 2000
+# Interval in msecs the main listbox's viewport is checked for changes in
+# while demo info is loaded in the background.
+VIEWPORT_POLL_INTERVAL = 150
 
 THEME_SUBDIR = "ui_themes"
 ICON_FILENAME = "icon.gif"
@@ -108,3 +136,6 @@ HEADER_HUMAN_NAMES = {
 	"tick_num": "No. of ticks",
 	"game_dir": "Game directory",
 }
+
+# IDs of the main listbox's optional columns filled from demo headers.
+HEADER_COLUMN_IDS = ("col_map", "col_player", "col_playtime", "col_ticks")
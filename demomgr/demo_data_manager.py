@@ -1,18 +1,31 @@
 
+from concurrent.futures import CancelledError, ThreadPoolExecutor
 from enum import IntEnum
+import errno
+from itertools import chain, repeat
 import json
 import os
 import shutil
 import tempfile
+import threading
 import typing as t
 
+from demomgr.catalog import get_catalog
 from demomgr.constants import DATA_GRAB_MODE, EVENT_FILE
-from demomgr.demo_info import DemoInfo
+from demomgr.demo_db import DemoDatabase, database_exists, get_database_path
+from demomgr.demo_info import GROUP, RE_LINE, DemoInfo, LazyDemoInfo
+from demomgr.demo_info_cache import get_demo_info_cache, get_stat_key
 import demomgr.handle_events as he
+from demomgr.helpers import readdemoheaders
+from demomgr.io_governor import get_io_governor
+from demomgr import parse_pool
 
 if t.TYPE_CHECKING:
 	from demomgr.config import Config
 
+# JSON files are written by this many threads once at least as many are written at once.
+_JSON_WRITE_THREADS = 8
+
 
 class PROCESSOR_TYPE(IntEnum):
 	READER = 0
@@ -50,6 +63,15 @@ class Reader(DemoInfoProcessor):
 	def get_info(self, names: t.List[str]) -> t.List[t.Optional[DemoInfo]]:
 		raise NotImplementedError("Le abstract class")
 
+	def _cancelled_result(self, names: t.List[str], done = None) -> t.List:
+		"""
+		Convenience method to build a result list in case the DDM's
+		cancellation token was set. All results in `done` are kept, the
+		remaining names are padded with `CancelledError`s.
+		"""
+		done = [] if done is None else done
+		return done + [CancelledError()] * (len(names) - len(done))
+
 
 class Writer(DemoInfoProcessor):
 	def __init__(self, ddm: "DemoDataManager"):
@@ -66,37 +88,106 @@ class Writer(DemoInfoProcessor):
 
 
 class EventsReader(Reader):
+	"""
+	Reads demo info from the directory's `_events.txt`, answering from
+	and contributing to the process-wide demo info cache.
+	"""
+
 	def __init__(self, ddm):
 		super().__init__(ddm)
 		self.reader = None
 
+	def _publish(self) -> None:
+		get_demo_info_cache().put_events(
+			self.ddm.directory, self._stat_key, self.chunk_cache, self._complete
+		)
+
+	def _parse_in_parallel(self) -> None:
+		"""
+		Parses the entire events file in worker processes, filling the
+		chunk cache and closing the reader.
+		May raise: OSError, UnicodeDecodeError, CancelledError.
+		"""
+		self.chunk_cache.update(parse_pool.parse_events_file(
+			self.reader.filename, self.ddm.cfg.parse_processes, self.ddm.cancel_token
+		))
+		self.reader.destroy()
+		self.reader = None
+		self._complete = True
+
 	def get_info(self, names):
-		if self.reader is None:
+		if self._stat_key is None: # No _events.txt exists.
 			return [None] * len(names)
 
+		if self._complete or all(name in self.chunk_cache for name in names):
+			return [self.chunk_cache.get(name, None) for name in names]
+
+		try:
+			if self.reader is None:
+				self.reader = he.EventReader(self._events_file, blocksz = self.ddm.cfg.events_blocksize)
+		except OSError as e:
+			return [e] * len(names)
+
+		if (
+			self.ddm.cfg.parse_processes > 0 and
+			self._stat_key[0] >= parse_pool.EVENTS_PARALLEL_MIN_SIZE
+		):
+			try:
+				self._parse_in_parallel()
+			except CancelledError:
+				return self._cancelled_result(names)
+			except (OSError, UnicodeDecodeError) as e:
+				return [e] * len(names)
+			self._publish()
+			return [self.chunk_cache.get(name, None) for name in names]
+
 		pending_names = set(names)
 		try:
 			for chk in self.reader:
+				if self.ddm.is_cancelled():
+					return self._cancelled_result(names)
 				try:
-					info = DemoInfo.from_raw_logchunk(chk)
+					info = LazyDemoInfo.from_raw_logchunk(chk)
 				except ValueError:
 					continue
 				self.chunk_cache[info.demo_name] = info
 				pending_names.discard(info.demo_name)
 				if not pending_names:
 					break
+			else:
+				self._complete = True
+			if not self._complete:
+				# Look one chunk ahead, to know whether the file was read entirely
+				for chk in self.reader:
+					try:
+						info = LazyDemoInfo.from_raw_logchunk(chk)
+					except ValueError:
+						break
+					self.chunk_cache[info.demo_name] = info
+					break
+				else:
+					self._complete = True
 		except (OSError, UnicodeDecodeError) as e:
 			return [e] * len(names)
+		self._publish()
 		return [self.chunk_cache.get(name, None) for name in names]
 
 	def acquire(self):
 		super().acquire()
-		events_file = os.path.join(self.ddm.directory, EVENT_FILE)
-		if not os.path.exists(events_file):
-			self.reader = None
-		else:
-			self.reader = he.EventReader(events_file, blocksz = self.ddm.cfg.events_blocksize)
+		self._events_file = os.path.join(self.ddm.directory, EVENT_FILE)
+		self.reader = None
 		self.chunk_cache = {}
+		self._complete = False
+		try:
+			self._stat_key = get_stat_key(self._events_file)
+		except FileNotFoundError:
+			self._stat_key = None
+			return
+
+		entry = get_demo_info_cache().get_events(self.ddm.directory, self._stat_key)
+		if entry is not None:
+			self.chunk_cache = entry.infos.copy()
+			self._complete = entry.complete
 
 	def release(self):
 		super().release()
@@ -154,16 +245,27 @@ class EventsWriter(Writer):
 
 	def acquire(self):
 		super().acquire()
-		events_file = os.path.join(self.ddm.directory, EVENT_FILE)
-		if not os.path.exists(events_file):
-			self.reader = None
-		else:
-			self.reader = he.EventReader(events_file, blocksz = self.ddm.cfg.events_blocksize)
 		self._write_on_release = False
 		self._reader_error = None
 		self._demo_info = []
 		self._name_to_chunk_idx_map = {}
 		self._expected_write_result_names = set()
+		events_file = os.path.join(self.ddm.directory, EVENT_FILE)
+		try:
+			stat_key = get_stat_key(events_file)
+		except FileNotFoundError:
+			self.reader = None
+			return
+
+		# If the file's entire content is cached, there's nothing left to read.
+		entry = get_demo_info_cache().get_events(self.ddm.directory, stat_key)
+		if entry is not None and entry.complete:
+			self.reader = None
+			for name, info in entry.infos.items():
+				self._name_to_chunk_idx_map[name] = len(self._demo_info)
+				self._demo_info.append(info)
+		else:
+			self.reader = he.EventReader(events_file, blocksz = self.ddm.cfg.events_blocksize)
 
 	def release(self):
 		super().release()
@@ -184,9 +286,11 @@ class EventsWriter(Writer):
 			fhandle_int, fname = tempfile.mkstemp(text = True)
 			writer = he.EventWriter(fhandle_int)
 
+			written_info = {}
 			for info in self._demo_info:
 				if not (info is None or info.is_empty()):
 					writer.writechunk(info.to_logchunk())
+					written_info[info.demo_name] = info
 			# Writes any pending logchunks from a non-fully-exhausted reader.
 			# This is so stupidly overengineered lmao
 			if self.reader is not None:
@@ -196,13 +300,21 @@ class EventsWriter(Writer):
 					except ValueError:
 						continue
 					writer.writechunk(info.to_logchunk())
+					written_info[info.demo_name] = info
 				self.reader.destroy()
 				self.reader = None
 
 			writer.destroy()
 			writer = None
 
-			shutil.copyfile(fname, os.path.join(self.ddm.directory, EVENT_FILE))
+			events_file = os.path.join(self.ddm.directory, EVENT_FILE)
+			shutil.copyfile(fname, events_file)
+			try:
+				get_demo_info_cache().put_events(
+					self.ddm.directory, get_stat_key(events_file), written_info, True
+				)
+			except OSError:
+				pass
 		except (OSError, UnicodeDecodeError, UnicodeEncodeError) as e:
 			write_result = e
 		finally:
@@ -231,6 +343,12 @@ class EventsWriter(Writer):
 
 
 class JSONReader(Reader):
+	"""
+	Reads demo info from JSON files next to the demos. Files whose size
+	and modification time did not change are answered from the
+	process-wide demo info cache.
+	"""
+
 	def _single_get_info(self, name: str) -> t.Optional[DemoInfo]:
 		json_name = os.path.splitext(name)[0] + ".json"
 		try:
@@ -241,19 +359,69 @@ class JSONReader(Reader):
 			return e
 
 		try:
-			data = json.load(fh)
-		except (json.decoder.JSONDecodeError, UnicodeDecodeError) as e:
+			text = fh.read()
+		except UnicodeDecodeError as e:
 			return e
 		finally:
 			fh.close()
 
 		try:
-			return DemoInfo.from_json(data, name)
+			return LazyDemoInfo.from_json_text(text, name)
 		except (KeyError, ValueError, TypeError) as e:
 			return e
 
 	def get_info(self, names):
-		return [self._single_get_info(name) for name in names]
+		cache = get_demo_info_cache()
+		res = [None] * len(names)
+		# Indices into `names` that were not cached, along with the stat key
+		# of their JSON file.
+		misses = []
+		for i, name in enumerate(names):
+			if self.ddm.is_cancelled():
+				return self._cancelled_result(names)
+			json_path = os.path.join(self.ddm.directory, os.path.splitext(name)[0] + ".json")
+			try:
+				stat_key = get_stat_key(json_path)
+			except FileNotFoundError:
+				continue
+			except OSError as e:
+				res[i] = e
+				continue
+			info = cache.get_json(self.ddm.directory, name, stat_key)
+			if info is None:
+				misses.append((i, stat_key))
+			else:
+				res[i] = info
+
+		miss_names = [names[i] for i, _ in misses]
+		if (
+			self.ddm.cfg.parse_processes > 0 and
+			len(miss_names) >= parse_pool.JSON_PARALLEL_MIN_FILES
+		):
+			try:
+				miss_res = parse_pool.parse_json_files(
+					self.ddm.directory, miss_names, self.ddm.cfg.parse_processes,
+					self.ddm.cancel_token,
+				)
+			except CancelledError:
+				return self._cancelled_result(names)
+		else:
+			governor = get_io_governor()
+			miss_res = []
+			for name in miss_names:
+				try:
+					governor.throttle(0, 1, self.ddm.cancel_token)
+				except CancelledError:
+					return self._cancelled_result(names)
+				if self.ddm.is_cancelled():
+					return self._cancelled_result(names)
+				miss_res.append(self._single_get_info(name))
+
+		for (i, stat_key), info in zip(misses, miss_res):
+			res[i] = info
+			if isinstance(info, DemoInfo):
+				cache.put_json(self.ddm.directory, names[i], stat_key, info)
+		return res
 
 
 class JSONWriter(Writer):
@@ -269,7 +437,14 @@ class JSONWriter(Writer):
 					f.write(new)
 			except (OSError, UnicodeEncodeError) as e:
 				return e
+			try:
+				get_demo_info_cache().put_json(
+					self.ddm.directory, name, get_stat_key(json_path), info
+				)
+			except OSError:
+				pass
 		else:
+			get_demo_info_cache().drop_json(self.ddm.directory, name)
 			try:
 				if os.path.exists(json_path):
 					os.unlink(json_path)
@@ -279,8 +454,481 @@ class JSONWriter(Writer):
 		return None
 
 	def write_info(self, names, info):
-		for name, info_obj in zip(names, info):
-			self._write_results[name] = self._single_write_info(name, info_obj)
+		if len(names) < _JSON_WRITE_THREADS:
+			results = map(self._single_write_info, names, info)
+		else:
+			# Writing is bound by file system latency, not the GIL.
+			with ThreadPoolExecutor(_JSON_WRITE_THREADS) as executor:
+				results = list(executor.map(self._single_write_info, names, info))
+		for name, result in zip(names, results):
+			self._write_results[name] = result
+
+
+def uses_database(directory: str, cfg: "Config") -> bool:
+	"""
+	Returns whether demo info in `directory` should be kept in a demo
+	database, which is the case if one exists or `SQLITE` is the
+	configured data grab mode.
+	"""
+	return cfg.data_grab_mode is DATA_GRAB_MODE.SQLITE or database_exists(directory)
+
+def import_into_database(
+	directory: str,
+	cfg: "Config",
+	cancel_token: t.Optional[threading.Event] = None,
+) -> None:
+	"""
+	Creates the demo database of `directory` and fills it with the demo
+	info of all demos in the directory found in its `_events.txt` and
+	JSON files, with JSON files taking precedence.
+	Demo info that can not be read is skipped.
+	If anything goes wrong, the database is removed again.
+
+	May raise: OSError, CancelledError.
+	"""
+	names = [name for name in os.listdir(directory) if os.path.splitext(name)[1] == ".dem"]
+	infos = {}
+	ddm = DemoDataManager(directory, cfg, cancel_token)
+	try:
+		for mode in (DATA_GRAB_MODE.EVENTS, DATA_GRAB_MODE.JSON):
+			for name, res in zip(names, ddm.get_demo_info(names, mode)):
+				if isinstance(res, CancelledError):
+					raise res
+				if isinstance(res, DemoInfo):
+					infos[name] = res
+	finally:
+		ddm.destroy()
+
+	try:
+		with DemoDatabase(directory, create = True) as db:
+			db.write_info(infos.items())
+	except OSError:
+		try:
+			os.unlink(get_database_path(directory))
+		except OSError:
+			pass
+		raise
+
+
+def _get_chunk_stem(content: str) -> t.Optional[str]:
+	"""
+	Returns the name of the demo a logchunk belongs to without its
+	extension, or `None` if it is malformed.
+	"""
+	match = RE_LINE.search(content)
+	return None if match is None else match[GROUP.DEMO]
+
+def _rename_events_chunks(directory: str, renames: t.Dict[str, str], cfg: "Config") -> None:
+	"""
+	Renames the logchunks of the demos in `renames` in the `_events.txt`
+	of `directory` in a single pass over it, copying all other chunks as
+	they are. Chunks already named after one of the new names are
+	dropped.
+
+	May raise: OSError, UnicodeError.
+	"""
+	events_file = os.path.join(directory, EVENT_FILE)
+	if not os.path.exists(events_file):
+		return
+
+	stems = {
+		os.path.splitext(old)[0]: os.path.splitext(new)[0] for old, new in renames.items()
+	}
+	new_stems = set(stems.values())
+	reader = writer = fname = None
+	try:
+		reader = he.EventReader(events_file, blocksz = cfg.events_blocksize)
+		fhandle_int, fname = tempfile.mkstemp(text = True)
+		writer = he.EventWriter(fhandle_int)
+		for chk in reader:
+			content = chk.content
+			stem = _get_chunk_stem(content)
+			if stem in stems:
+				content = content.replace(f'("{stem}" at ', f'("{stems[stem]}" at ')
+			elif stem in new_stems:
+				continue
+			writer.writechunk(content)
+		reader.destroy()
+		reader = None
+		writer.destroy()
+		writer = None
+		shutil.copyfile(fname, events_file)
+	finally:
+		if reader is not None:
+			try:
+				reader.destroy()
+			except OSError:
+				pass
+		if writer is not None:
+			try:
+				writer.destroy()
+			except OSError:
+				pass
+		if fname is not None:
+			try:
+				os.unlink(fname)
+			except OSError:
+				pass
+
+def rename_demo_info(
+	directory: str,
+	renames: t.Dict[str, str],
+	cfg: "Config",
+) -> t.Dict[DATA_GRAB_MODE, t.Dict[str, t.Optional[Exception]]]:
+	"""
+	Moves the demo info of the demos in `directory` whose old names
+	map to their new names in `renames` to the new names in all info
+	containers, without parsing it: The `_events.txt` is rewritten in
+	a single pass renaming the affected chunks, JSON files are renamed
+	and database entries updated. Info that already exists under a new
+	name is dropped.
+	Returns a dict in the format of `DemoDataManager.get_write_results`,
+	mapping each touched mode to a dict of the old demo names to `None`
+	or the exception that prevented moving their info.
+	"""
+	res = {}
+
+	try:
+		_rename_events_chunks(directory, renames, cfg)
+	except (OSError, UnicodeError) as e:
+		res[DATA_GRAB_MODE.EVENTS] = {old: e for old in renames}
+	else:
+		res[DATA_GRAB_MODE.EVENTS] = {old: None for old in renames}
+
+	json_res = res[DATA_GRAB_MODE.JSON] = {}
+	for old, new in renames.items():
+		old_path = os.path.join(directory, os.path.splitext(old)[0] + ".json")
+		new_path = os.path.join(directory, os.path.splitext(new)[0] + ".json")
+		try:
+			if os.path.exists(old_path):
+				os.replace(old_path, new_path)
+			elif os.path.exists(new_path):
+				os.unlink(new_path)
+		except OSError as e:
+			json_res[old] = e
+		else:
+			json_res[old] = None
+
+	if database_exists(directory):
+		try:
+			with DemoDatabase(directory) as db:
+				db.rename_demos(list(renames.items()))
+		except OSError as e:
+			res[DATA_GRAB_MODE.SQLITE] = {old: e for old in renames}
+		else:
+			res[DATA_GRAB_MODE.SQLITE] = {old: None for old in renames}
+
+	get_demo_info_cache().invalidate(directory)
+	return res
+
+def _transfer_json_file(
+	name: str,
+	source_dir: str,
+	target_dir: str,
+	move: bool,
+	validate: bool,
+	cancel_token: t.Optional[threading.Event],
+) -> t.Optional[Exception]:
+	if cancel_token is not None and cancel_token.is_set():
+		return CancelledError()
+	json_name = os.path.splitext(name)[0] + ".json"
+	src_path = os.path.join(source_dir, json_name)
+	dst_path = os.path.join(target_dir, json_name)
+	governor = get_io_governor()
+	try:
+		governor.throttle(0, 1, cancel_token)
+		if not os.path.exists(src_path):
+			if os.path.exists(dst_path):
+				os.unlink(dst_path)
+			return None
+
+		data = None
+		if validate:
+			with open(src_path, "rb") as f:
+				data = f.read()
+			DemoInfo.from_json(json.loads(data.decode("utf-8")), name)
+		if move:
+			try:
+				os.replace(src_path, dst_path)
+				return None
+			except OSError as e:
+				if e.errno != errno.EXDEV:
+					raise
+		if data is None:
+			with open(src_path, "rb") as f:
+				data = f.read()
+		governor.throttle(len(data), 0, cancel_token)
+		with open(dst_path, "wb") as f:
+			f.write(data)
+		if move:
+			os.unlink(src_path)
+	except (
+		OSError, UnicodeDecodeError, KeyError, ValueError, TypeError, CancelledError
+	) as e:
+		return e
+	return None
+
+def transfer_json_info(
+	source_dir: str,
+	target_dir: str,
+	names: t.List[str],
+	move: bool,
+	validate: bool = False,
+	cancel_token: t.Optional[threading.Event] = None,
+) -> t.Dict[str, t.Optional[Exception]]:
+	"""
+	Copies or moves (if `move` is true) the JSON files of the demos
+	`names` from `source_dir` to `target_dir` byte for byte, or by
+	renaming them where possible. A JSON file in `target_dir` is
+	removed if the demo has none in `source_dir`, as writing its
+	missing info would.
+	If `validate` is true, each JSON file is parsed beforehand and not
+	transferred if that fails.
+	Once `cancel_token` is set, the remaining files are not transferred
+	and a `CancelledError` is given for each of them.
+	Returns a dict mapping each demo name to `None` or the exception
+	that prevented transferring its info.
+	"""
+	cache = get_demo_info_cache()
+	for name in names:
+		if move:
+			cache.drop_json(source_dir, name)
+		cache.drop_json(target_dir, name)
+
+	args = (
+		repeat(source_dir), repeat(target_dir), repeat(move), repeat(validate),
+		repeat(cancel_token),
+	)
+	if len(names) < _JSON_WRITE_THREADS:
+		results = map(_transfer_json_file, names, *args)
+	else:
+		# See JSONWriter.write_info
+		with ThreadPoolExecutor(_JSON_WRITE_THREADS) as executor:
+			results = list(executor.map(
+				get_io_governor().bind(_transfer_json_file), names, *args
+			))
+	return dict(zip(names, results))
+
+def _write_events_temp(directory: str, chunks: t.Iterable[str]) -> str:
+	"""
+	Writes the logchunks `chunks` to a new temporary file in `directory`
+	and syncs it to disk, so it can atomically replace the directory's
+	`_events.txt`, whose permissions it is given. Returns its path.
+
+	May raise: OSError, UnicodeError.
+	"""
+	fhandle_int, fname = tempfile.mkstemp(dir = directory, text = True)
+	try:
+		writer = he.EventWriter(fhandle_int)
+		try:
+			writer.writechunks(chunks)
+			writer.handle.flush()
+			os.fsync(writer.handle.fileno())
+		finally:
+			writer.destroy()
+		events_file = os.path.join(directory, EVENT_FILE)
+		if os.path.exists(events_file):
+			shutil.copymode(events_file, fname)
+	except BaseException:
+		try:
+			os.unlink(fname)
+		except OSError:
+			pass
+		raise
+	return fname
+
+def _add_events_chunks(
+	directory: str,
+	stems: t.Set[str],
+	chunks: t.List[str],
+	cfg: "Config",
+) -> None:
+	"""
+	Adds the logchunks `chunks` to the `_events.txt` of `directory`,
+	replacing all chunks of the demos whose names without extension are
+	in `stems`. If it has none of those, the chunks are simply appended
+	and the file is cut back to its old size should that fail.
+	Otherwise, the file is rewritten and atomically replaced.
+
+	May raise: OSError, UnicodeError.
+	"""
+	events_file = os.path.join(directory, EVENT_FILE)
+	has_stale_chunks = False
+	if os.path.exists(events_file):
+		with he.EventReader(events_file, blocksz = cfg.events_blocksize) as reader:
+			has_stale_chunks = any(_get_chunk_stem(chk.content) in stems for chk in reader)
+
+	if has_stale_chunks:
+		with he.EventReader(events_file, blocksz = cfg.events_blocksize) as reader:
+			fname = _write_events_temp(directory, chain(
+				(chk.content for chk in reader if _get_chunk_stem(chk.content) not in stems),
+				chunks,
+			))
+		try:
+			os.replace(fname, events_file)
+		except OSError:
+			os.unlink(fname)
+			raise
+		return
+
+	if not chunks:
+		return
+	with open(events_file, "a+", encoding = "utf-8") as handle:
+		old_size = handle.seek(0, os.SEEK_END)
+		try:
+			with he.EventWriter(handle) as writer:
+				writer.writechunks(chunks)
+			handle.flush()
+			os.fsync(handle.fileno())
+		except BaseException:
+			try:
+				handle.truncate(old_size)
+			except OSError:
+				pass
+			raise
+
+def splice_events(
+	source_dir: str,
+	target_dir: str,
+	names: t.List[str],
+	move: bool,
+	cfg: "Config",
+) -> t.Dict[str, t.Optional[Exception]]:
+	"""
+	Copies or moves (if `move` is true) the logchunks of the demos
+	`names` from the `_events.txt` of `source_dir` to the one of
+	`target_dir`, without parsing them. Their chunks in the target file
+	are replaced, see `_add_events_chunks`.
+	The source file is read once. When moving, the chunks that stay are
+	written to a new source file in the same pass, which only replaces
+	the old one once the target file has been written and synced to
+	disk. An interruption thus leaves chunks in both files at worst,
+	never in neither.
+	Returns a dict mapping each demo name to `None` or the exception
+	that prevented transferring its info.
+	"""
+	stems = {os.path.splitext(name)[0] for name in names}
+	events_file = os.path.join(source_dir, EVENT_FILE)
+	moved_chunks = []
+	fname = None
+	error = None
+
+	def remaining_chunks(reader):
+		for chk in reader:
+			if _get_chunk_stem(chk.content) in stems:
+				moved_chunks.append(chk.content)
+			else:
+				yield chk.content
+
+	try:
+		if os.path.exists(events_file):
+			with he.EventReader(events_file, blocksz = cfg.events_blocksize) as reader:
+				if move:
+					fname = _write_events_temp(source_dir, remaining_chunks(reader))
+				else:
+					for _ in remaining_chunks(reader):
+						pass
+		_add_events_chunks(target_dir, stems, moved_chunks, cfg)
+		if fname is not None:
+			os.replace(fname, events_file)
+			fname = None
+	except (OSError, UnicodeError) as e:
+		error = e
+	finally:
+		if fname is not None:
+			try:
+				os.unlink(fname)
+			except OSError:
+				pass
+
+	cache = get_demo_info_cache()
+	cache.invalidate(target_dir)
+	if move:
+		cache.invalidate(source_dir)
+	return {name: error for name in names}
+
+class SQLiteReader(Reader):
+	"""
+	Reads demo info from the directory's demo database. If it does not
+	exist yet and `SQLITE` is the configured data grab mode, it is
+	created and the directory's other info containers are imported.
+	"""
+
+	def get_info(self, names):
+		if self._needs_import:
+			try:
+				import_into_database(self.ddm.directory, self.ddm.cfg, self.ddm.cancel_token)
+				self.db = DemoDatabase(self.ddm.directory)
+			except CancelledError:
+				return self._cancelled_result(names)
+			except OSError as e:
+				return [e] * len(names)
+			self._needs_import = False
+
+		if self.db is None:
+			return [None] * len(names)
+
+		try:
+			found = self.db.get_info(names)
+		except OSError as e:
+			return [e] * len(names)
+		return [found.get(name, None) for name in names]
+
+	def acquire(self):
+		super().acquire()
+		self.db = None
+		self._needs_import = False
+		if database_exists(self.ddm.directory):
+			self.db = DemoDatabase(self.ddm.directory)
+		elif self.ddm.cfg.data_grab_mode is DATA_GRAB_MODE.SQLITE:
+			self._needs_import = True
+
+	def release(self):
+		super().release()
+		if self.db is None:
+			return
+		try:
+			self.db.close()
+		except OSError:
+			pass
+		finally:
+			self.db = None
+
+
+class SQLiteWriter(Writer):
+	"""
+	Collects all writes and commits them to the directory's demo
+	database in a single transaction on release.
+	Nothing is written if the directory has no database and `SQLITE` is
+	not the configured data grab mode.
+	"""
+
+	def write_info(self, names, info):
+		self._pending.update(zip(names, info))
+
+	def acquire(self):
+		super().acquire()
+		self._pending = {}
+
+	def release(self):
+		super().release()
+		if not self._pending:
+			return
+
+		write_result = None
+		try:
+			if uses_database(self.ddm.directory, self.ddm.cfg):
+				if not database_exists(self.ddm.directory):
+					# Writes are never cancelled, so neither is this.
+					import_into_database(self.ddm.directory, self.ddm.cfg)
+				with DemoDatabase(self.ddm.directory) as db:
+					db.write_info(self._pending.items())
+		except OSError as e:
+			write_result = e
+		finally:
+			for name in self._pending:
+				self._write_results[name] = write_result
+			self._pending = {}
 
 
 class NoneReader(Reader):
@@ -302,6 +950,10 @@ _PROCESSOR_MAP = {
 		PROCESSOR_TYPE.READER: JSONReader,
 		PROCESSOR_TYPE.WRITER: JSONWriter,
 	},
+	DATA_GRAB_MODE.SQLITE: {
+		PROCESSOR_TYPE.READER: SQLiteReader,
+		PROCESSOR_TYPE.WRITER: SQLiteWriter,
+	},
 	DATA_GRAB_MODE.NONE: {
 		PROCESSOR_TYPE.READER: NoneReader,
 		PROCESSOR_TYPE.WRITER: NoneWriter,
@@ -314,18 +966,34 @@ class DemoDataManager():
 	being able to read and modify it as safely as possible.
 	"""
 
-	def __init__(self, directory: str, cfg: "Config"):
+	def __init__(
+		self,
+		directory: str,
+		cfg: "Config",
+		cancel_token: t.Optional[threading.Event] = None,
+	):
 		"""
 		Creates a new DemoDataManager.
 
 		directory: Directory the DDM should operate on.
 		cfg: Program configuration
+		cancel_token: Optional event. Once it is set, all reading
+			operations stop as soon as possible and report a
+			`CancelledError` for each demo they did not get to.
+			Writes are never cancelled.
 		"""
 		self.readers: t.Dict[DATA_GRAB_MODE, Reader] = {}
 		self.writers: t.Dict[DATA_GRAB_MODE, Writer] = {}
 		self._write_results: t.Dict[DATA_GRAB_MODE, t.Dict[str, t.Optional[Exception]]] = {}
 		self.directory = directory
 		self.cfg = cfg
+		self.cancel_token = cancel_token
+
+	def is_cancelled(self) -> bool:
+		"""
+		Returns whether the DDM's cancellation token was set.
+		"""
+		return self.cancel_token is not None and self.cancel_token.is_set()
 
 	def _get_reader(self, mode: DATA_GRAB_MODE) -> Reader:
 		"""
@@ -389,8 +1057,14 @@ class DemoDataManager():
 
 		This returns a list of (For each string passed in via `demos`):
 		A DemoInfo object, `None` in case no info container at all was
-		found, or an exception if one occurred.
+		found, or an exception if one occurred. That exception is a
+		`CancelledError` if the DDM was cancelled before the demo's info
+		was read.
+		Returned DemoInfo objects may be shared through the process-wide
+		demo info cache and must not be modified in place.
 		"""
+		if self.is_cancelled():
+			return [CancelledError()] * len(demos)
 		try:
 			r = self._get_reader(mode)
 		except OSError as e:
@@ -405,10 +1079,13 @@ class DemoDataManager():
 			- Dict with two keys: 'size', 'mtime', containing the
 			  demo's size and last modification time.
 			- An exception if one occurred while getting file system
-			  info.
+			  info, or a `CancelledError` if the DDM was cancelled.
 		"""
 		res = []
 		for name in names:
+			if self.is_cancelled():
+				res.extend([CancelledError()] * (len(names) - len(res)))
+				break
 			target = os.path.join(self.directory, name)
 			try:
 				stat_res = os.stat(target)
@@ -418,6 +1095,96 @@ class DemoDataManager():
 			res.append(stat_res)
 		return res
 
+	def get_info_validators(
+		self,
+		names: t.List[str],
+		mode: DATA_GRAB_MODE,
+	) -> t.List[t.Optional[str]]:
+		"""
+		Returns a string for each demo that changes whenever its demo
+		info in `mode` may have changed, so copies of it kept elsewhere
+		can be validated. It is derived from the size and modification
+		time of the demo's info container.
+		The string is `None` if it could not be determined.
+		"""
+		def validator(path):
+			try:
+				return "{}:{}".format(*get_stat_key(path))
+			except FileNotFoundError:
+				return "-"
+			except OSError:
+				return None
+
+		if mode is DATA_GRAB_MODE.NONE:
+			return [""] * len(names)
+		elif mode is DATA_GRAB_MODE.EVENTS:
+			return [validator(os.path.join(self.directory, EVENT_FILE))] * len(names)
+		elif mode is DATA_GRAB_MODE.SQLITE:
+			return [validator(get_database_path(self.directory))] * len(names)
+		return [
+			validator(os.path.join(self.directory, os.path.splitext(name)[0] + ".json"))
+			for name in names
+		]
+
+	def get_demo_headers(self, names: t.List[str]) -> t.List[t.Union[t.Dict, Exception]]:
+		"""
+		Reads the headers of all given demos.
+		Headers are cached in the directory's demo database if its demo
+		info is kept in one, otherwise in the library catalog if it is
+		enabled. Cached headers are reused as long as the demo's size and
+		modification time do not change.
+
+		Returns a list of either:
+			- The demo's header, as returned by `readdemoheader`.
+			- An exception if one occurred while reading it, or a
+			  `CancelledError` if the DDM was cancelled.
+		"""
+		paths = [os.path.join(self.directory, name) for name in names]
+		if uses_database(self.directory, self.cfg) and database_exists(self.directory):
+			def get_headers():
+				with DemoDatabase(self.directory) as db:
+					return db.get_headers(names)
+			def put_headers(items):
+				with DemoDatabase(self.directory) as db:
+					db.put_headers(items)
+		elif self.cfg.library_catalog and get_catalog() is not None:
+			get_headers = lambda: get_catalog().get_headers(self.directory, names)
+			put_headers = lambda items: get_catalog().put_headers(self.directory, items)
+		else:
+			return readdemoheaders(paths, self.cancel_token)
+
+		fs_info = self.get_fs_info(names)
+		try:
+			cached = get_headers()
+		except OSError:
+			cached = {}
+
+		res = [None] * len(names)
+		misses = []
+		for i, (name, stat_res) in enumerate(zip(names, fs_info)):
+			if isinstance(stat_res, Exception):
+				res[i] = stat_res
+				continue
+			if name in cached:
+				size, mtime, header = cached[name]
+				if size == stat_res["size"] and mtime == stat_res["mtime"]:
+					res[i] = header
+					continue
+			misses.append(i)
+
+		to_store = []
+		for i, header in zip(misses, readdemoheaders([paths[i] for i in misses], self.cancel_token)):
+			res[i] = header
+			if isinstance(header, dict):
+				to_store.append((names[i], fs_info[i]["size"], fs_info[i]["mtime"], header))
+
+		if to_store:
+			try:
+				put_headers(to_store)
+			except OSError:
+				pass
+		return res
+
 	def write_demo_info(
 		self,
 		names: t.List[str],
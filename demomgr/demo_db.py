@@ -0,0 +1,233 @@
+"""
+SQLite database storing the demo information of a single demo
+directory, backing the `SQLITE` data grab mode.
+It also offers a table to cache demo headers in, which are validated
+by the size and modification time of their demo.
+"""
+
+from contextlib import contextmanager
+import json
+import os
+import sqlite3
+import typing as t
+
+from demomgr.constants import DATABASE_FILE
+from demomgr.demo_info import DemoInfo
+
+_SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS event (
+	demo TEXT NOT NULL,
+	kind INTEGER NOT NULL,
+	value NOT NULL,
+	tick INTEGER NOT NULL,
+	time TEXT
+);
+CREATE INDEX IF NOT EXISTS event_demo ON event (demo);
+CREATE TABLE IF NOT EXISTS header (
+	demo TEXT PRIMARY KEY,
+	size INTEGER NOT NULL,
+	mtime REAL NOT NULL,
+	data TEXT NOT NULL
+);
+"""
+
+_KILLSTREAK = 0
+_BOOKMARK = 1
+
+# Stay well below SQLite's (old) limit of 999 host parameters.
+_MAX_PARAMS = 500
+
+
+class DemoDatabaseError(OSError):
+	"""
+	Raised when an operation on a demo database fails.
+	Subclasses OSError, as this is what info processors are expected
+	to raise and report.
+	"""
+
+
+@contextmanager
+def _translate_errors():
+	try:
+		yield
+	except sqlite3.Error as e:
+		raise DemoDatabaseError(f"Demo database error: {e}") from e
+
+
+def _batched(seq: t.Sequence, n: int = _MAX_PARAMS) -> t.Iterator[t.Sequence]:
+	for i in range(0, len(seq), n):
+		yield seq[i:i + n]
+
+
+def get_database_path(directory: str) -> str:
+	return os.path.join(directory, DATABASE_FILE)
+
+
+def database_exists(directory: str) -> bool:
+	return os.path.isfile(get_database_path(directory))
+
+
+class DemoDatabase():
+	"""
+	Connection to the demo database of a directory.
+	Not thread-safe; each thread should open its own.
+	"""
+
+	def __init__(self, directory: str, create: bool = False) -> None:
+		"""
+		Opens the database in `directory`.
+
+		create: Whether to create the database if it does not exist.
+
+		May raise: OSError, `FileNotFoundError` if the database does not
+			exist and `create` is False.
+		"""
+		path = get_database_path(directory)
+		if not create and not os.path.isfile(path):
+			raise FileNotFoundError(f"No demo database in {directory}")
+
+		with _translate_errors():
+			self._conn = sqlite3.connect(path, timeout = 10.0)
+			try:
+				if self._conn.execute("PRAGMA user_version").fetchone()[0] != _SCHEMA_VERSION:
+					with self._conn:
+						self._conn.executescript(_SCHEMA)
+						self._conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+			except sqlite3.Error:
+				self._conn.close()
+				raise
+
+	def close(self) -> None:
+		with _translate_errors():
+			self._conn.close()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *_):
+		self.close()
+
+	def get_info(self, names: t.Sequence[str]) -> t.Dict[str, DemoInfo]:
+		"""
+		Returns a dict mapping all demos in `names` that have demo info
+		stored to it.
+
+		May raise: OSError.
+		"""
+		events: t.Dict[str, t.Tuple[t.List[t.Tuple], t.List[t.Tuple]]] = {}
+		with _translate_errors():
+			for batch in _batched(names):
+				cur = self._conn.execute(
+					f"SELECT demo, kind, value, tick, time FROM event "
+					f"WHERE demo IN ({', '.join('?' * len(batch))}) ORDER BY rowid",
+					batch,
+				)
+				for demo, kind, value, tick, time in cur:
+					if demo not in events:
+						events[demo] = ([], [])
+					events[demo][kind].append((value, tick, time))
+		return {name: DemoInfo(name, ks, bm) for name, (ks, bm) in events.items()}
+
+	def get_all_names(self) -> t.List[str]:
+		"""
+		Returns the names of all demos that have demo info stored.
+
+		May raise: OSError.
+		"""
+		with _translate_errors():
+			return [r[0] for r in self._conn.execute("SELECT DISTINCT demo FROM event")]
+
+	def write_info(self, items: t.Iterable[t.Tuple[str, t.Optional[DemoInfo]]]) -> None:
+		"""
+		Replaces the stored demo info of all demos in `items`, which is
+		an iterable of (name, DemoInfo) pairs, in a single transaction.
+		Passing `None` or empty demo info deletes it.
+
+		May raise: OSError, in which case nothing was written.
+		"""
+		items = list(items)
+		rows = []
+		for name, info in items:
+			if info is None:
+				continue
+			rows.extend((name, _KILLSTREAK, v, tick, time) for v, tick, time in info.killstreaks.iter_tuples())
+			rows.extend((name, _BOOKMARK, v, tick, time) for v, tick, time in info.bookmarks.iter_tuples())
+
+		with _translate_errors(), self._conn:
+			for batch in _batched([name for name, _ in items]):
+				self._conn.execute(
+					f"DELETE FROM event WHERE demo IN ({', '.join('?' * len(batch))})", batch
+				)
+			self._conn.executemany(
+				"INSERT INTO event (demo, kind, value, tick, time) VALUES (?, ?, ?, ?, ?)", rows
+			)
+
+	def rename_demos(self, renames: t.Sequence[t.Tuple[str, str]]) -> None:
+		"""
+		Moves the demo info and headers of demos given as (old name,
+		new name) pairs to their new name in a single transaction.
+		Anything stored under a new name before is dropped.
+
+		May raise: OSError, in which case nothing was changed.
+		"""
+		new_names = [new for _, new in renames]
+		with _translate_errors(), self._conn:
+			for batch in _batched(new_names):
+				params = ', '.join('?' * len(batch))
+				self._conn.execute(f"DELETE FROM event WHERE demo IN ({params})", batch)
+				self._conn.execute(f"DELETE FROM header WHERE demo IN ({params})", batch)
+			self._conn.executemany(
+				"UPDATE event SET demo = ? WHERE demo = ?", [(new, old) for old, new in renames]
+			)
+			self._conn.executemany(
+				"UPDATE header SET demo = ? WHERE demo = ?", [(new, old) for old, new in renames]
+			)
+
+	def get_headers(
+		self, names: t.Sequence[str]
+	) -> t.Dict[str, t.Tuple[int, float, t.Dict]]:
+		"""
+		Returns a dict mapping demo names to a tuple of the demo's size
+		and modification time at the time its header was stored and the
+		header itself, for all demos in `names` that have one stored.
+
+		May raise: OSError.
+		"""
+		res = {}
+		with _translate_errors():
+			for batch in _batched(names):
+				cur = self._conn.execute(
+					f"SELECT demo, size, mtime, data FROM header "
+					f"WHERE demo IN ({', '.join('?' * len(batch))})",
+					batch,
+				)
+				for demo, size, mtime, data in cur:
+					res[demo] = (size, mtime, json.loads(data))
+		return res
+
+	def put_headers(self, items: t.Iterable[t.Tuple[str, int, float, t.Dict]]) -> None:
+		"""
+		Stores headers given as (name, size, mtime, header) tuples in a
+		single transaction.
+
+		May raise: OSError.
+		"""
+		with _translate_errors(), self._conn:
+			self._conn.executemany(
+				"INSERT OR REPLACE INTO header (demo, size, mtime, data) VALUES (?, ?, ?, ?)",
+				((name, size, mtime, json.dumps(hdr)) for name, size, mtime, hdr in items),
+			)
+
+	def delete_headers(self, names: t.Sequence[str]) -> None:
+		"""
+		Removes the headers of all demos in `names`.
+
+		May raise: OSError.
+		"""
+		with _translate_errors(), self._conn:
+			for batch in _batched(names):
+				self._conn.execute(
+					f"DELETE FROM header WHERE demo IN ({', '.join('?' * len(batch))})", batch
+				)
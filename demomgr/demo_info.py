@@ -3,16 +3,43 @@ Contains the DemoInfo class and offers ability to construct it
 from either a handle_events.RawLogchunk or a json file.
 """
 
+from array import array
+import json
 import os
 import re
+import threading
 
-from demomgr.helpers import getstreakpeaks
+from demomgr.handle_events import RawLogchunk
 
 RE_LINE = re.compile(
 	r'\[(\d{4}/\d\d/\d\d \d\d:\d\d)\] (Killstreak|Bookmark)'
 	r' (.*) \("(.*)" at (\d+)\)'
 )
 
+# A logchunk line as TF2 writes it, matching all lines the regex above
+# matches when searching them, except for unusual values.
+RE_LINES_STRICT = re.compile(
+	r'^\[\d{4}/\d\d/\d\d \d\d:\d\d\] (?:Killstreak (\d{1,9})|Bookmark .*)'
+	r' \(".*" at \d{1,9}\)$',
+	re.M,
+)
+
+_RE_JSON_WS = r'[ \t\n\r]*'
+_RE_JSON_INT = r'(?:0|[1-9]\d{0,8})'
+_RE_JSON_STR = r'"(?:[^"\\\x00-\x1f]|\\(?:["\\/bfnrt]|u[\da-fA-F]{4}))*"'
+_RE_JSON_EVENT = (
+	r'\{{{ws}"name"{ws}:{ws}"(Killstreak|Bookmark)"{ws},{ws}'
+	r'"value"{ws}:{ws}(?:"(\d{{1,9}})"|({int})|{str}){ws},{ws}'
+	r'"tick"{ws}:{ws}(?:"\d{{1,9}}"|{int}){ws}\}}'
+).format(ws = _RE_JSON_WS, int = _RE_JSON_INT, str = _RE_JSON_STR)
+# A JSON file as TF2 and Demomgr write it
+RE_JSON_STRICT = re.compile(
+	r'{ws}\{{{ws}"events"{ws}:{ws}\[{ws}(?:{ev}(?:{ws},{ws}{ev})*)?{ws}\]{ws}\}}{ws}'.format(
+		ws = _RE_JSON_WS, ev = _RE_JSON_EVENT
+	)
+)
+RE_JSON_EVENT = re.compile(_RE_JSON_EVENT)
+
 class GROUP:
 	DATE = 1
 	TYPE = 2
@@ -65,8 +92,161 @@ class DemoEvent():
 		return NotImplemented
 
 
+class _StringTable():
+	"""
+	Table of strings shared by all EventArrays, so each distinct
+	bookmark name and date is only stored once. Only ever grows, which
+	is fine as long as the amount of distinct strings is sane.
+	"""
+
+	def __init__(self):
+		self._lock = threading.Lock()
+		self._index = {}
+		self.strings = []
+
+	def get_index(self, string):
+		idx = self._index.get(string)
+		if idx is None:
+			with self._lock:
+				idx = self._index.get(string)
+				if idx is None:
+					idx = len(self.strings)
+					self.strings.append(string)
+					self._index[string] = idx
+		return idx
+
+_STRINGS = _StringTable()
+# Shared by all empty EventArrays, never modified.
+_EMPTY = array("q")
+
+
+class EventArray():
+	"""
+	Immutable sequence of DemoEvents, stored compactly: Values, ticks
+	and times of all events are interleaved in a single `array`, with
+	string values and times stored as indexes into a string table shared
+	by all instances. The DemoEvents are created when accessed, so
+	changing them has no effect on the EventArray.
+	Instances are compared by their events.
+	"""
+
+	__slots__ = ("_data", "_str_values")
+
+	def __init__(self, events = (), str_values = False):
+		"""
+		events: Iterable of DemoEvents or (value, tick, time) tuples.
+		str_values <Bool>: Whether the event values are strings; they
+			are ints otherwise.
+
+		May raise: ValueError if an int value or tick does not fit into
+			64 bits, TypeError if one is not an int.
+		"""
+		get_index = _STRINGS.get_index
+		data = []
+		for value, tick, time in events:
+			data += (
+				get_index(value) if str_values else value,
+				tick,
+				-1 if time is None else get_index(time),
+			)
+		self._str_values = str_values
+		try:
+			self._data = array("q", data) if data else _EMPTY
+		except OverflowError as e:
+			raise ValueError(f"Event value or tick out of range: {e}") from e
+
+	def _take(self, indices):
+		"""
+		Returns a new EventArray of the events at `indices`.
+		"""
+		data = self._data
+		res = EventArray((), self._str_values)
+		res._data = array("q", [data[j] for i in indices for j in range(3 * i, 3 * i + 3)])
+		return res
+
+	def get_streak_peaks(self):
+		"""
+		Returns an EventArray of only the events whose values make up
+		the peak of their sequence, see `helpers.getstreakpeaks`.
+		"""
+		values = self._data[::3]
+		peaks = [i - 1 for i in range(1, len(values)) if values[i] <= values[i - 1]]
+		if values:
+			peaks.append(len(values) - 1)
+		if len(peaks) == len(values):
+			return self
+		return self._take(peaks)
+
+	def get_values(self):
+		"""
+		Returns a list of the events' values, without creating any
+		DemoEvents.
+		"""
+		values = self._data[::3]
+		if self._str_values:
+			strings = _STRINGS.strings
+			return [strings[value] for value in values]
+		return values.tolist()
+
+	def iter_tuples(self):
+		"""
+		Returns an iterator over the events as (value, tick, time)
+		tuples, which is a lot faster than iterating over the DemoEvents.
+		"""
+		strings = _STRINGS.strings
+		data = self._data
+		times = [None if time == -1 else strings[time] for time in data[2::3]]
+		return zip(self.get_values(), data[1::3].tolist(), times)
+
+	def __len__(self):
+		return len(self._data) // 3
+
+	def __getitem__(self, i):
+		if isinstance(i, slice):
+			return self._take(range(*i.indices(len(self))))
+		if i < 0:
+			i += len(self)
+		if not 0 <= i < len(self):
+			raise IndexError("EventArray index out of range")
+		strings = _STRINGS.strings
+		value, tick, time = self._data[3 * i:3 * i + 3]
+		return DemoEvent(
+			strings[value] if self._str_values else value,
+			tick,
+			None if time == -1 else strings[time],
+		)
+
+	def __iter__(self):
+		strings = _STRINGS.strings
+		str_values = self._str_values
+		it = iter(self._data)
+		for value, tick, time in zip(it, it, it):
+			yield DemoEvent(
+				strings[value] if str_values else value,
+				tick,
+				None if time == -1 else strings[time],
+			)
+
+	def __eq__(self, other):
+		if isinstance(other, EventArray):
+			return self._str_values == other._str_values and self._data == other._data
+		return NotImplemented
+
+	__hash__ = None
+
+	def __reduce__(self):
+		# String table indexes are only valid in this process.
+		return (EventArray, (list(self.iter_tuples()), self._str_values))
+
+	def __repr__(self):
+		return f"EventArray({list(self.iter_tuples())!r}, {self._str_values!r})"
+
+
 class DemoInfo():
-	"""Container class to hold information regarding a demo."""
+	"""
+	Container class to hold information regarding a demo.
+	Its events are stored as EventArrays.
+	"""
 
 	__slots__ = ("demo_name", "killstreaks", "killstreak_peaks", "bookmarks")
 
@@ -74,18 +254,23 @@ class DemoInfo():
 		"""
 		demo_name: The name of the demo that is described in the
 			logchunk. (str)
-		killstreaks <List>: Killstreaks as a list of DemoEvents.
-		bookmarks <List>: Bookmarks as a list of DemoEvents.
+		killstreaks <Iterable>: Killstreaks as DemoEvents or
+			(value, tick, time) tuples, or an EventArray.
+		bookmarks <Iterable>: Bookmarks as DemoEvents or
+			(value, tick, time) tuples, or an EventArray.
 
-		NOTE: `killstreak_peaks` will be invalidated if direct changes
-			to `killstreaks` are made. Use `set_killstreaks` instead.
+		NOTE: `killstreak_peaks` will be invalidated if `killstreaks` is
+			reassigned. Use `set_killstreaks` instead.
+
+		May raise: ValueError, TypeError on bad event values or ticks.
 		"""
 		# Funny dilemma: I know what properties are by now, but still
 		# don't like code running just by setting an attribute.
 		self.demo_name = demo_name
-		self.killstreaks = killstreaks
-		self.killstreak_peaks = getstreakpeaks(killstreaks)
-		self.bookmarks = bookmarks
+		self.set_killstreaks(killstreaks)
+		self.bookmarks = (
+			bookmarks if isinstance(bookmarks, EventArray) else EventArray(bookmarks, True)
+		)
 
 	def is_empty(self):
 		"""
@@ -93,6 +278,16 @@ class DemoInfo():
 		"""
 		return not (self.killstreaks or self.bookmarks)
 
+	def get_killstreak_count(self):
+		"""
+		Returns the amount of killstreaks, which is the amount of
+		killstreak peaks.
+		"""
+		return len(self.killstreak_peaks)
+
+	def get_bookmark_count(self):
+		return len(self.bookmarks)
+
 	@classmethod
 	def from_json(cls, json_data, demo_name):
 		"""
@@ -109,9 +304,9 @@ class DemoInfo():
 
 		for k in json_data["events"]:
 			if k["name"] == "Killstreak":
-				cur_ks.append(DemoEvent(int(k["value"]), int(k["tick"]), None))
+				cur_ks.append((int(k["value"]), int(k["tick"]), None))
 			elif k["name"] == "Bookmark":
-				cur_bm.append(DemoEvent(k["value"], int(k["tick"]), None))
+				cur_bm.append((k["value"], int(k["tick"]), None))
 		return cls(demo_name, cur_ks, cur_bm)
 
 	def to_json(self):
@@ -124,8 +319,8 @@ class DemoInfo():
 
 		May raise: ValueError if data has been screwed up.
 		"""
-		events = [{"name": "Killstreak", "value": v, "tick": t} for v, t, _ in self.killstreaks]
-		events += [{"name": "Bookmark", "value": v, "tick": t} for v, t, _ in self.bookmarks]
+		events = [{"name": "Killstreak", "value": v, "tick": t} for v, t, _ in self.killstreaks.iter_tuples()]
+		events += [{"name": "Bookmark", "value": v, "tick": t} for v, t, _ in self.bookmarks.iter_tuples()]
 		return {"events": sorted(events, key = lambda e: int(e["tick"]))}
 
 	@classmethod
@@ -155,9 +350,9 @@ class DemoInfo():
 			value = regres[GROUP.VALUE]
 			tick = int(regres[GROUP.TICK])
 			if line_type == "Killstreak":
-				killstreaks.append(DemoEvent(int(value), tick, regres[GROUP.DATE]))
+				killstreaks.append((int(value), tick, regres[GROUP.DATE]))
 			elif line_type == "Bookmark":
-				bookmarks.append(DemoEvent(value, tick, regres[GROUP.DATE]))
+				bookmarks.append((value, tick, regres[GROUP.DATE]))
 
 		return cls(demo, killstreaks, bookmarks)
 
@@ -171,8 +366,8 @@ class DemoInfo():
 		May raise: ValueError if information has been messed up.
 		"""
 		demo_name = os.path.splitext(self.demo_name)[0]
-		to_write = [("Killstreak", value, tick, date) for value, tick, date in self.killstreaks]
-		to_write.extend(("Bookmark", value, tick, date) for value, tick, date in self.bookmarks)
+		to_write = [("Killstreak", value, tick, date) for value, tick, date in self.killstreaks.iter_tuples()]
+		to_write.extend(("Bookmark", value, tick, date) for value, tick, date in self.bookmarks.iter_tuples())
 
 		to_write.sort(key = lambda t: t[2])
 
@@ -182,5 +377,176 @@ class DemoInfo():
 		)
 
 	def set_killstreaks(self, killstreaks):
+		if not isinstance(killstreaks, EventArray):
+			killstreaks = EventArray(killstreaks)
 		self.killstreaks = killstreaks
-		self.killstreak_peaks = getstreakpeaks(killstreaks)
+		self.killstreak_peaks = killstreaks.get_streak_peaks()
+
+
+class LazyDemoInfo(DemoInfo):
+	"""
+	DemoInfo that keeps the logchunk or JSON text it was read from and
+	only parses its events once one of `killstreaks`, `killstreak_peaks`
+	or `bookmarks` is accessed. The amounts of killstreaks and bookmarks
+	are known without that.
+	The text is only kept if it is in the format TF2 writes, which is
+	checked quickly; otherwise it is parsed right away, so errors are
+	raised just like they would be by DemoInfo.
+	"""
+
+	__slots__ = ("_text", "_is_json", "_killstreak_count", "_bookmark_count")
+
+	_EVENT_ATTRS = frozenset(("killstreaks", "killstreak_peaks", "bookmarks"))
+
+	def __init__(self, demo_name, killstreaks, bookmarks):
+		self._text = None
+		super().__init__(demo_name, killstreaks, bookmarks)
+
+	@classmethod
+	def _from_text(cls, demo_name, text, is_json, killstreak_values, bookmark_count):
+		self = cls.__new__(cls)
+		self.demo_name = demo_name
+		self._text = text
+		self._is_json = is_json
+		self._killstreak_count = (
+			sum(b <= a for a, b in zip(killstreak_values, killstreak_values[1:])) +
+			(1 if killstreak_values else 0)
+		)
+		self._bookmark_count = bookmark_count
+		return self
+
+	def __getattr__(self, name):
+		# Only called for unset attributes, which the events are until parsed.
+		if name not in self._EVENT_ATTRS:
+			raise AttributeError(name)
+		self._parse()
+		return object.__getattribute__(self, name)
+
+	def _parse(self):
+		text = self._text
+		if text is None:
+			# Parsed already, possibly by another thread.
+			return
+		try:
+			if self._is_json:
+				info = DemoInfo.from_json(json.loads(text), self.demo_name)
+			else:
+				info = DemoInfo.from_raw_logchunk(RawLogchunk(text, False, None))
+		except ValueError:
+			# Only possible for absurd lines the quick check let through. The eager
+			# parse would have dropped the chunk, so treat it as empty.
+			info = DemoInfo(self.demo_name, [], [])
+		self.bookmarks = info.bookmarks
+		self.killstreaks = info.killstreaks
+		self.killstreak_peaks = info.killstreak_peaks
+		self._text = None
+
+	def is_parsed(self):
+		return self._text is None
+
+	def get_source(self):
+		"""
+		Returns a tuple of the text the events will be parsed from and
+		whether it is JSON, or `None` if they were parsed already.
+		Feeding it into `from_source` recreates the LazyDemoInfo.
+		"""
+		text = self._text
+		if text is None:
+			return None
+		return (text, self._is_json)
+
+	@classmethod
+	def from_source(cls, demo_name, text, is_json):
+		"""
+		Creates a LazyDemoInfo from a source as returned by `get_source`.
+
+		May raise: KeyError, ValueError, TypeError.
+		"""
+		if is_json:
+			return cls.from_json_text(text, demo_name)
+		return cls.from_raw_logchunk(RawLogchunk(text, False, None))
+
+	def is_empty(self):
+		if self._text is None:
+			return super().is_empty()
+		return not (self._killstreak_count or self._bookmark_count)
+
+	def get_killstreak_count(self):
+		if self._text is None:
+			return super().get_killstreak_count()
+		return self._killstreak_count
+
+	def get_bookmark_count(self):
+		if self._text is None:
+			return super().get_bookmark_count()
+		return self._bookmark_count
+
+	def set_killstreaks(self, killstreaks):
+		# Parsing later would overwrite them.
+		if getattr(self, "_text", None) is not None:
+			self._parse()
+		super().set_killstreaks(killstreaks)
+
+	@classmethod
+	def from_raw_logchunk(cls, in_chk):
+		"""
+		Takes a handle_events.RawLogchunk and converts it into
+		LazyDemoInfo.
+
+		in_chk : RawLogchunk to process, as returned by an EventReader.
+
+		May raise: ValueError on bad logchunks.
+		"""
+		content = in_chk.content
+		killstreak_values = RE_LINES_STRICT.findall(content)
+		regres = RE_LINE.match(content)
+		if regres is None or len(killstreak_values) != content.count("\n") + 1:
+			return super().from_raw_logchunk(in_chk)
+
+		bookmark_count = killstreak_values.count("")
+		killstreak_values = [int(v) for v in killstreak_values if v]
+		return cls._from_text(
+			regres[GROUP.DEMO] + ".dem", content, False, killstreak_values, bookmark_count
+		)
+
+	@classmethod
+	def from_json_text(cls, text, demo_name):
+		"""
+		Parses the given text, which should be the content of a standard
+		format JSON file, into a LazyDemoInfo.
+
+		text: Content of a JSON file as the source engine writes it. (str)
+		demo_name: Name of associated demo file; i.e. "foo.dem". (str)
+
+		May raise: KeyError, ValueError, TypeError.
+		"""
+		if RE_JSON_STRICT.fullmatch(text) is None:
+			return cls.from_json(json.loads(text), demo_name)
+
+		killstreak_values = []
+		bookmark_count = 0
+		for type_, quoted_value, value in RE_JSON_EVENT.findall(text):
+			if type_ == "Bookmark":
+				bookmark_count += 1
+			elif quoted_value or value:
+				killstreak_values.append(int(quoted_value or value))
+			else:
+				return cls.from_json(json.loads(text), demo_name)
+		return cls._from_text(demo_name, text, True, killstreak_values, bookmark_count)
+
+
+def is_same_info(a, b):
+	"""
+	Determines whether the two DemoInfo objects or `None`s `a` and `b`
+	hold exactly the same events.
+	"""
+	if a is b:
+		return True
+	if a is None or b is None:
+		return False
+	if (
+		isinstance(a, LazyDemoInfo) and isinstance(b, LazyDemoInfo) and
+		not a.is_parsed() and a._text == b._text
+	):
+		return True
+	return a.killstreaks == b.killstreaks and a.bookmarks == b.bookmarks
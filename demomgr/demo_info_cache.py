@@ -0,0 +1,180 @@
+"""
+Process-wide cache of parsed demo information, shared between all
+DemoDataManagers so the same `_events.txt` and JSON files are not parsed
+over and over again.
+Entries are validated by the size and modification time of the files
+they were parsed from, so changes made from outside of the program
+invalidate them as well.
+
+DemoInfo objects handed out by the cache are shared; they must never be
+modified in place. Create new ones instead.
+"""
+
+from collections import OrderedDict
+import os
+import threading
+import typing as t
+
+from demomgr.demo_info import DemoInfo
+
+# (st_size, st_mtime_ns)
+StatKey = t.Tuple[int, int]
+
+# Directories remembered per data grab mode.
+_MAX_DIRECTORIES = 8
+
+
+def get_stat_key(path: str) -> StatKey:
+	"""
+	Returns the values a cache entry for the file at `path` is
+	validated by.
+
+	May raise: OSError.
+	"""
+	stat_res = os.stat(path)
+	return (stat_res.st_size, stat_res.st_mtime_ns)
+
+
+class EventsEntry():
+	"""
+	Cached content of a directory's `_events.txt`.
+	"""
+
+	__slots__ = ("stat_key", "infos", "complete")
+
+	def __init__(self, stat_key: StatKey, infos: t.Dict[str, DemoInfo], complete: bool):
+		"""
+		stat_key: Stat key of the events file the info was read from.
+		infos: Maps demo names to their DemoInfo.
+		complete: Whether the entire file was read. If it was, demos not
+			contained in `infos` have no info in the events file.
+		"""
+		self.stat_key = stat_key
+		self.infos = infos
+		self.complete = complete
+
+
+class DemoInfoCache():
+	"""
+	Thread-safe store of parsed demo info per (directory, mode) pair.
+	Only the `EVENTS` and `JSON` modes are cached.
+	"""
+
+	def __init__(self) -> None:
+		self._lock = threading.Lock()
+		self._events: "OrderedDict[str, EventsEntry]" = OrderedDict()
+		self._json: "OrderedDict[str, t.Dict[str, t.Tuple[StatKey, DemoInfo]]]" = OrderedDict()
+
+	@staticmethod
+	def _key(directory: str) -> str:
+		return os.path.normcase(os.path.normpath(directory))
+
+	@staticmethod
+	def _touch(store: OrderedDict, key: str, default_factory = None):
+		"""
+		Moves `key` to the end of the LRU-ordered `store` and returns its
+		value. If it does not exist and `default_factory` is given, it is
+		created, evicting the least recently used directory if needed.
+		"""
+		if key in store:
+			store.move_to_end(key)
+			return store[key]
+		if default_factory is None:
+			return None
+		store[key] = default_factory()
+		if len(store) > _MAX_DIRECTORIES:
+			store.popitem(last = False)
+		return store[key]
+
+	def get_events(self, directory: str, stat_key: StatKey) -> t.Optional[EventsEntry]:
+		"""
+		Returns the cached events entry for `directory` if it exists and
+		was created from an events file with the given stat key.
+		"""
+		with self._lock:
+			entry = self._touch(self._events, self._key(directory))
+			if entry is None or entry.stat_key != stat_key:
+				return None
+			return entry
+
+	def put_events(
+		self,
+		directory: str,
+		stat_key: StatKey,
+		infos: t.Dict[str, DemoInfo],
+		complete: bool,
+	) -> None:
+		"""
+		Stores info read from the events file of `directory`.
+		If an entry with the same stat key exists, the infos are merged
+		into it; otherwise it is replaced.
+		The dict `infos` is copied.
+		"""
+		key = self._key(directory)
+		with self._lock:
+			old = self._events.get(key)
+			if old is not None and old.stat_key == stat_key and not complete:
+				new_infos = old.infos.copy()
+				new_infos.update(infos)
+				complete = old.complete
+			else:
+				new_infos = infos.copy()
+			self._events[key] = EventsEntry(stat_key, new_infos, complete)
+			self._events.move_to_end(key)
+			if len(self._events) > _MAX_DIRECTORIES:
+				self._events.popitem(last = False)
+
+	def get_json(
+		self, directory: str, name: str, stat_key: StatKey
+	) -> t.Optional[DemoInfo]:
+		"""
+		Returns the cached DemoInfo read from the JSON file of demo
+		`name` in `directory`, if it was read from a file with the given
+		stat key.
+		"""
+		with self._lock:
+			store = self._touch(self._json, self._key(directory))
+			if store is None or name not in store:
+				return None
+			cached_key, info = store[name]
+			return info if cached_key == stat_key else None
+
+	def put_json(self, directory: str, name: str, stat_key: StatKey, info: DemoInfo) -> None:
+		"""
+		Stores the DemoInfo read from or written to the JSON file of
+		demo `name` in `directory`.
+		"""
+		with self._lock:
+			self._touch(self._json, self._key(directory), dict)[name] = (stat_key, info)
+
+	def drop_json(self, directory: str, name: str) -> None:
+		"""
+		Removes the cached info of demo `name` in `directory`.
+		"""
+		with self._lock:
+			store = self._touch(self._json, self._key(directory))
+			if store is not None:
+				store.pop(name, None)
+
+	def invalidate(self, directory: t.Optional[str] = None) -> None:
+		"""
+		Drops all cached info for `directory`, or everything if it is
+		`None`.
+		"""
+		with self._lock:
+			if directory is None:
+				self._events.clear()
+				self._json.clear()
+				return
+			key = self._key(directory)
+			self._events.pop(key, None)
+			self._json.pop(key, None)
+
+
+_cache = DemoInfoCache()
+
+def get_demo_info_cache() -> DemoInfoCache:
+	"""
+	Returns the process-wide demo info cache.
+	"""
+	return _cache
@@ -0,0 +1,190 @@
+"""
+Contains the DemoTable class, the container demo data of a set of
+demos is passed around in.
+"""
+
+from array import array
+from itertools import compress, repeat
+import math
+import typing as t
+
+from demomgr.demo_info import DemoInfo
+
+# Sentinels standing in for unknown values in the numeric columns
+_NO_SIZE = -1
+_NO_MTIME = math.nan
+
+
+class DemoTable():
+	"""
+	Demo data of a set of demos, stored by column: their names, demo
+	info, modification times and sizes and optionally their headers
+	and directories.
+	Modification times and sizes are kept in `array`s; unknown ones are
+	stored as a sentinel and returned as `None` by the getters. Headers
+	and directories are `None` as a whole if they are not known for any
+	demo or the demos are not spread across directories.
+	Rows are looked up by name (and directory) through an index built
+	on first use. Subsets are taken with `take` and `where`, which do
+	not touch the demo info or headers themselves.
+	Tables are not safe to modify from several threads at once; threads
+	hand them over when they are done with them.
+	"""
+
+	__slots__ = ("names", "demo_info", "mtimes", "sizes", "headers", "directories", "_index")
+
+	def __init__(
+		self,
+		names: t.Optional[t.List[str]] = None,
+		demo_info: t.Optional[t.List[t.Optional[DemoInfo]]] = None,
+		mtimes: t.Optional[t.Iterable[t.Optional[float]]] = None,
+		sizes: t.Optional[t.Iterable[t.Optional[int]]] = None,
+		headers: t.Optional[t.List[t.Optional[t.Dict]]] = None,
+		directories: t.Optional[t.List[str]] = None,
+	) -> None:
+		"""
+		Creates a table from the given columns, which must be of the same
+		length. Lists are taken over, not copied. Missing demo info,
+		modification times and sizes are unknown.
+		"""
+		self.names = [] if names is None else names
+		amount = len(self.names)
+		self.demo_info = [None] * amount if demo_info is None else demo_info
+		self.mtimes = (
+			array("d", repeat(_NO_MTIME, amount)) if mtimes is None else
+			mtimes if isinstance(mtimes, array) else
+			array("d", [_NO_MTIME if x is None else x for x in mtimes])
+		)
+		self.sizes = (
+			array("q", repeat(_NO_SIZE, amount)) if sizes is None else
+			sizes if isinstance(sizes, array) else
+			array("q", [_NO_SIZE if x is None else x for x in sizes])
+		)
+		self.headers = headers
+		self.directories = directories
+		self._index = None
+
+	def __len__(self) -> int:
+		return len(self.names)
+
+	def get_mtime(self, i: int) -> t.Optional[float]:
+		mtime = self.mtimes[i]
+		return None if math.isnan(mtime) else mtime
+
+	def get_size(self, i: int) -> t.Optional[int]:
+		size = self.sizes[i]
+		return None if size == _NO_SIZE else size
+
+	def get_mtimes(self) -> t.List[t.Optional[float]]:
+		"""
+		Returns a new list of all modification times, `None` where unknown.
+		"""
+		return [None if math.isnan(x) else x for x in self.mtimes]
+
+	def get_sizes(self) -> t.List[t.Optional[int]]:
+		"""
+		Returns a new list of all sizes, `None` where unknown.
+		"""
+		if _NO_SIZE not in self.sizes:
+			return self.sizes.tolist()
+		return [None if x == _NO_SIZE else x for x in self.sizes]
+
+	def get_total_size(self) -> int:
+		"""
+		Returns the sum of all known sizes.
+		"""
+		return sum(self.sizes) - _NO_SIZE * self.sizes.count(_NO_SIZE)
+
+	def get_headers(self) -> t.List[t.Optional[t.Dict]]:
+		"""
+		Returns a new list of all headers, `None` where unknown.
+		"""
+		if self.headers is None:
+			return [None] * len(self.names)
+		return self.headers.copy()
+
+	def get_row(self, i: int) -> t.Dict[str, t.Any]:
+		"""
+		Returns row `i` as a single row of demo data in the format the
+		directory watcher delivers.
+		"""
+		return {
+			"col_filename": self.names[i],
+			"col_demo_info": self.demo_info[i],
+			"col_ctime": self.get_mtime(i),
+			"col_filesize": self.get_size(i),
+		}
+
+	def index(self, name: str, directory: t.Optional[str] = None) -> t.Optional[int]:
+		"""
+		Returns the row of the demo `name`, or `None` if it is not in the
+		table. If the table spans several directories, `directory` must
+		be given as well.
+		"""
+		if self._index is None:
+			if self.directories is None:
+				self._index = {name: i for i, name in enumerate(self.names)}
+			else:
+				self._index = {key: i for i, key in enumerate(zip(self.directories, self.names))}
+		return self._index.get(name if self.directories is None else (directory, name))
+
+	def set_headers(self, headers: t.List[t.Optional[t.Dict]]) -> None:
+		self.headers = headers
+
+	def set_directory(self, directory: str) -> None:
+		"""
+		Marks all demos as being in `directory`.
+		"""
+		self.directories = [directory] * len(self.names)
+		self._index = None
+
+	def take(self, indices: t.Sequence[int]) -> "DemoTable":
+		"""
+		Returns a new table of the rows at `indices`, in that order.
+		"""
+		get = lambda col: None if col is None else [col[i] for i in indices]
+		return DemoTable(
+			[self.names[i] for i in indices],
+			[self.demo_info[i] for i in indices],
+			array("d", map(self.mtimes.__getitem__, indices)),
+			array("q", map(self.sizes.__getitem__, indices)),
+			get(self.headers),
+			get(self.directories),
+		)
+
+	def where(self, mask: t.Sequence[bool]) -> "DemoTable":
+		"""
+		Returns a new table of the rows for which `mask` is true,
+		keeping their order.
+		"""
+		get = lambda col: None if col is None else list(compress(col, mask))
+		return DemoTable(
+			list(compress(self.names, mask)),
+			list(compress(self.demo_info, mask)),
+			array("d", compress(self.mtimes, mask)),
+			array("q", compress(self.sizes, mask)),
+			get(self.headers),
+			get(self.directories),
+		)
+
+	def extend(self, other: "DemoTable") -> None:
+		"""
+		Appends the rows of `other` to this table. Either both or none
+		of the tables must span several directories, unless this one is
+		empty.
+		"""
+		if not self.names and self.directories is None and other.directories is not None:
+			self.directories = []
+		if (self.directories is None) != (other.directories is None):
+			raise ValueError("Can not mix tables with and without directories.")
+
+		if self.headers is not None or other.headers is not None:
+			self.headers = self.get_headers()
+			self.headers.extend(other.get_headers())
+		if self.directories is not None:
+			self.directories.extend(other.directories)
+		self.names.extend(other.names)
+		self.demo_info.extend(other.demo_info)
+		self.mtimes.extend(other.mtimes)
+		self.sizes.extend(other.sizes)
+		self._index = None
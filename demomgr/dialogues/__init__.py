@@ -1,13 +1,15 @@
 from .bookmark_setter import BookmarkSetter
+from .bulk_bookmarker import BulkBookmarker
 from .cfg_error import CfgError
 from .bulk_operator import BulkOperator
 from .first_run import FirstRun
 from .play import Play
-# from .rename import Rename
+from .rename import Rename
 from .settings import Settings
 from ._diagresult import DIAGSIG
 
 __all__ = (
-	"BookmarkSetter", "CfgError", "BulkOperator", "FirstRun", "Play", "Settings",
+	"BookmarkSetter", "BulkBookmarker", "CfgError", "BulkOperator", "FirstRun", "Play", "Rename",
+	"Settings",
 	"DIAGSIG"
 )
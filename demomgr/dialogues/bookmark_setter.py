@@ -236,7 +236,7 @@ class BookmarkSetter(BaseDialog):
 				map(int, self.listbox.get_column("col_tick")),
 			)
 		]
-		self.thread_container_state = [None, None]
+		self.thread_container_state = [None] * (len(CNST.DATA_GRAB_MODE) - 1)
 
 		self.savebtn.configure(text = "Cancel", command = self._cancel_mark)
 		self.threadgroup.start_thread(
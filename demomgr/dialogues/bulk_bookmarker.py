@@ -0,0 +1,283 @@
+"""
+This module contains the BulkBookmarker dialog which adds, removes or
+renames a bookmark in the info containers of many demos at once.
+"""
+
+from time import time
+import tkinter as tk
+from tkinter import messagebox as tk_msg
+import tkinter.ttk as ttk
+
+from multiframe_list import MultiframeList, SELECTION_TYPE
+
+from demomgr import constants as CNST, platforming
+from demomgr.dialogues._base import BaseDialog
+from demomgr.dialogues._diagresult import DIAGSIG
+from demomgr.helpers import frmd_label
+from demomgr.threadgroup import ThreadGroup, THREADGROUPSIG
+from demomgr.threads import THREADSIG, ThreadBulkMark
+from demomgr.tk_widgets import DmgrEntry, TtkText
+
+
+_DGM_TXT = {
+	CNST.DATA_GRAB_MODE.JSON: "JSON file",
+	CNST.DATA_GRAB_MODE.EVENTS: "_events logchunk",
+	CNST.DATA_GRAB_MODE.SQLITE: "database entry",
+}
+
+class BulkBookmarker(BaseDialog):
+	"""
+	Dialog that adds a bookmark to, removes or renames a bookmark in
+	the demo info of several demos of a directory.
+
+	After the dialog is closed:
+	`self.result.state` will be SUCCESS if a thread was run at least once
+		and demo info was likely modified in some way.
+		Otherwise, it will be FAILURE.
+	`self.result.data` will be a dict with the following key:
+		"demo_info": A dict mapping `DATA_GRAB_MODE`s to dicts mapping
+			the names of demos whose info was changed in the info
+			container of that mode to their new DemoInfo, or `None`
+			if the container was removed.
+	"""
+
+	def __init__(self, parent, demodir, files, cfg, styleobj):
+		"""
+		parent: Parent widget, should be a `Tk` or `Toplevel` instance.
+		demodir: Absolute path to the directory containing the demos.
+		files: List of file names of the demos to be operated on.
+		cfg: Program config.
+		styleobj: Instance of tkinter.ttk.Style.
+		"""
+		super().__init__(parent, "Bulk Bookmarker")
+
+		self.master = parent
+		self.demodir = demodir
+		self.files = files
+		self.cfg = cfg
+		self.styleobj = styleobj
+
+		self.result.data = {"demo_info": {}}
+
+		self._listbox_idx_map = {}
+		# Maps demo names to the modes whose info containers failed to update
+		# in the last run, or are absent if they were all updated.
+		self.failed_modes = {}
+		self.processed_files = set()
+		self.thread_last_start_time = 0
+		self.thread_alive = False
+
+		self.threadgroup = ThreadGroup(ThreadBulkMark, self.master)
+		self.threadgroup.build_cb_method(self._mark_after_callback)
+
+	def _listbox_fmt_state(self, demo_name):
+		if demo_name in self.failed_modes:
+			return "Failed for: " + ", ".join(
+				_DGM_TXT[mode] for mode in sorted(self.failed_modes[demo_name])
+			)
+		if demo_name in self.processed_files:
+			return "Done."
+		return ""
+
+	def body(self, master):
+		self.protocol("WM_DELETE_WINDOW", self.destroy)
+
+		master.grid_columnconfigure(0, weight = 1)
+		master.grid_rowconfigure(0, weight = 1)
+
+		self.listbox = MultiframeList(
+			master,
+			(
+				{"col_id": "col_file", "name": "Filename"},
+				{"col_id": "col_state", "name": "State", "formatter": self._listbox_fmt_state},
+			),
+			rightclickbtn = platforming.get_rightclick_btn(),
+			resizable = True,
+			selection_type = SELECTION_TYPE.SINGLE,
+		)
+		self.listbox.set_data({
+			"col_file": self.files,
+			"col_state": self.files.copy(),
+		})
+		self.listbox.format()
+		self._listbox_idx_map = {f: i for i, f in enumerate(self.files)}
+
+		self.operation_var = tk.IntVar()
+		self.operation_radiobuttons = []
+		option_frame = ttk.LabelFrame(
+			master,
+			padding = 5,
+			labelwidget = frmd_label(master, "Options"),
+		)
+		option_frame.grid_columnconfigure(1, weight = 1)
+		radiobutton_frame = ttk.Frame(option_frame, style = "Contained.TFrame")
+		for i, (text, op) in enumerate((
+			("Add", CNST.BOOKMARK_OPERATION.ADD),
+			("Remove", CNST.BOOKMARK_OPERATION.REMOVE),
+			("Rename", CNST.BOOKMARK_OPERATION.RENAME),
+		)):
+			bt = ttk.Radiobutton(
+				radiobutton_frame,
+				command = self._on_operation_change,
+				variable = self.operation_var,
+				value = op.value,
+				text = text,
+				style = "Contained.TRadiobutton"
+			)
+			bt.grid(row = 0, column = i, padx = (0, 10 * (i < 2)), ipadx = 1, sticky = "ew")
+			self.operation_radiobuttons.append(bt)
+
+		ttk.Label(
+			option_frame, style = "Contained.TLabel", text = "Name:"
+		).grid(row = 1, column = 0, sticky = "w")
+		ttk.Label(
+			option_frame, style = "Contained.TLabel", text = "Tick:"
+		).grid(row = 2, column = 0, sticky = "w")
+		self.new_name_label = ttk.Label(
+			option_frame, style = "Contained.TLabel", text = "New name:"
+		)
+		self.name_entry = DmgrEntry(option_frame, CNST.BOOKMARK_NAME_MAX)
+		self.tick_entry = DmgrEntry(option_frame, -1)
+		self.new_name_entry = DmgrEntry(option_frame, CNST.BOOKMARK_NAME_MAX)
+		self.tick_hint_label = ttk.Label(
+			option_frame, style = "Info.Contained.TLabel", text = "(Leave empty for any tick)"
+		)
+
+		textframe = ttk.Frame(master, padding = 5)
+		textframe.grid_columnconfigure(0, weight = 1)
+		self.textbox = TtkText(textframe, self.styleobj, wrap = tk.NONE, width = 60, height = 3)
+		self.textbox.config(state = tk.DISABLED)
+
+		button_frame = ttk.Frame(master)
+		self.okbutton = ttk.Button(button_frame, text = "Start", command = self._start_marking)
+		self.closebutton = ttk.Button(button_frame, text = "Close", command = self.destroy)
+		self.canceloperationbutton = ttk.Button(button_frame, text = "Abort", command = self._stopoperation)
+
+		self.listbox.grid(row = 0, column = 0, sticky = "nesw")
+
+		self.textbox.grid(column = 0, row = 0, sticky = "ew")
+		textframe.grid(row = 1, column = 0, sticky = "ew")
+
+		radiobutton_frame.grid(row = 0, column = 0, columnspan = 3, pady = (0, 5))
+		self.name_entry.grid(row = 1, column = 1, columnspan = 2, sticky = "ew", padx = (5, 0), pady = 2)
+		self.tick_entry.grid(row = 2, column = 1, sticky = "ew", padx = (5, 0), pady = 2)
+		self.tick_hint_label.grid(row = 2, column = 2, sticky = "w", padx = (5, 0))
+		self.new_name_label.grid(row = 3, column = 0, sticky = "w")
+		self.new_name_entry.grid(row = 3, column = 1, columnspan = 2, sticky = "ew", padx = (5, 0), pady = 2)
+		option_frame.grid(row = 2, column = 0, sticky = "ew", pady = (0, 5))
+
+		self.okbutton.pack(side = tk.LEFT, fill = tk.X, expand = 1, padx = (0, 3))
+		self.closebutton.pack(side = tk.LEFT, fill = tk.X, expand = 1, padx = (3, 0))
+		button_frame.grid(row = 3, column = 0, sticky = "ew")
+
+		self.operation_var.set(CNST.BOOKMARK_OPERATION.ADD.value)
+		self._on_operation_change()
+		self._log(f"{len(self.files)} demos selected.")
+
+	def _on_operation_change(self):
+		op = CNST.BOOKMARK_OPERATION(self.operation_var.get())
+		if op is CNST.BOOKMARK_OPERATION.ADD:
+			self.tick_hint_label.grid_remove()
+		else:
+			self.tick_hint_label.grid()
+		if op is CNST.BOOKMARK_OPERATION.RENAME:
+			self.new_name_label.grid()
+			self.new_name_entry.grid()
+		else:
+			self.new_name_label.grid_remove()
+			self.new_name_entry.grid_remove()
+
+	def _log(self, to_log):
+		with self.textbox:
+			self.textbox.insert(tk.END, to_log + "\n")
+			self.textbox.yview_moveto(1.0)
+
+	def _set_widget_state(self, state):
+		for w in (
+			*self.operation_radiobuttons, self.name_entry, self.tick_entry, self.new_name_entry
+		):
+			w.configure(state = state)
+
+	def _stopoperation(self):
+		self.threadgroup.join_thread()
+
+	def _start_marking(self):
+		# See BulkOperator._start_demo_processing
+		if self.thread_alive:
+			return
+
+		op = CNST.BOOKMARK_OPERATION(self.operation_var.get())
+		name = self.name_entry.get()
+		tick = self.tick_entry.get()
+		tick = int(tick) if tick else None
+		new_name = self.new_name_entry.get() if op is CNST.BOOKMARK_OPERATION.RENAME else None
+		if not name:
+			tk_msg.showinfo("Demomgr", "You must enter a bookmark name.", parent = self)
+			return
+		if op is CNST.BOOKMARK_OPERATION.ADD and tick is None:
+			tk_msg.showinfo("Demomgr", "You must enter a tick to add the bookmark at.", parent = self)
+			return
+		if op is CNST.BOOKMARK_OPERATION.RENAME and not new_name:
+			tk_msg.showinfo("Demomgr", "You must enter a new bookmark name.", parent = self)
+			return
+
+		self._set_widget_state(tk.DISABLED)
+		self.okbutton.pack_forget()
+		self.closebutton.pack_forget()
+		self.canceloperationbutton.pack(side = tk.LEFT, fill = tk.X, expand = 1)
+
+		self.failed_modes = {}
+		self.processed_files = set()
+		self.listbox.format(("col_state",))
+		self.thread_last_start_time = time()
+		self.thread_alive = True
+		self.threadgroup.start_thread(
+			directory = self.demodir,
+			names = self.files,
+			operation = op,
+			bookmark_name = name,
+			tick = tick,
+			new_name = new_name,
+			cfg = self.cfg,
+		)
+
+	def _mark_after_callback(self, sig, *args):
+		if sig.is_finish_signal():
+			self._log(
+				("Finished" if sig is THREADSIG.SUCCESS else "Aborted") +
+				f" after {round(time() - self.thread_last_start_time, 3)} seconds; "
+				f"{len(self.processed_files) - len(self.failed_modes)}/{len(self.files)} "
+				"demos updated successfully."
+			)
+			self.result.state = DIAGSIG.SUCCESS
+			self.canceloperationbutton.pack_forget()
+			self.okbutton.pack(side = tk.LEFT, fill = tk.X, expand = 1, padx = (0, 3))
+			self.closebutton.pack(side = tk.LEFT, fill = tk.X, expand = 1, padx = (3, 0))
+			self._set_widget_state(tk.NORMAL)
+			self.thread_alive = False
+			self.listbox.format(("col_state",))
+			return THREADGROUPSIG.FINISHED
+
+		elif sig is THREADSIG.BOOKMARK_CONTAINER_UPDATE_START:
+			self._log(f"Updating {args[0].get_display_name()}...")
+
+		elif sig is THREADSIG.RESULT_INFO_WRITE_RESULTS:
+			mode, results = args
+			failures = 0
+			for demo_name, write_result in results.items():
+				self.processed_files.add(demo_name)
+				if write_result is not None:
+					self.failed_modes.setdefault(demo_name, set()).add(mode)
+					failures += 1
+			if failures:
+				self._log(f"{mode.get_display_name()}: {failures} failures.")
+
+		elif sig is THREADSIG.RESULT_DEMO_INFO:
+			mode, infos = args
+			self.result.data["demo_info"].setdefault(mode, {}).update(infos)
+
+		return THREADGROUPSIG.CONTINUE
+
+	def destroy(self):
+		self._stopoperation()
+		super().destroy()
@@ -12,7 +12,7 @@ from multiframe_list import MultiframeList, SELECTION_TYPE
 from demomgr import constants as CNST, platforming
 from demomgr.dialogues._base import BaseDialog
 from demomgr.dialogues._diagresult import DIAGSIG
-from demomgr.helpers import frmd_label
+from demomgr.helpers import convertunit, frmd_label
 from demomgr.platforming import is_same_path
 from demomgr.tk_widgets import TtkText
 from demomgr.threadgroup import ThreadGroup, THREADGROUPSIG
@@ -20,7 +20,11 @@ from demomgr.threads import THREADSIG, CMDDemosThread
 from demomgr.tk_widgets import DmgrEntry, DynamicLabel
 
 
-_DGM_TXT = {CNST.DATA_GRAB_MODE.JSON: "JSON file", CNST.DATA_GRAB_MODE.EVENTS: "_events logchunk"}
+_DGM_TXT = {
+	CNST.DATA_GRAB_MODE.JSON: "JSON file",
+	CNST.DATA_GRAB_MODE.EVENTS: "_events logchunk",
+	CNST.DATA_GRAB_MODE.SQLITE: "database entry",
+}
 
 class BulkOperator(BaseDialog):
 	"""
@@ -371,6 +375,10 @@ class BulkOperator(BaseDialog):
 				self.pending_demo_info[name] = self._FULL_DGM.copy()
 			self.listbox.format(("col_state",), (self._listbox_idx_map[name],))
 
+		elif sig is THREADSIG.INFO_PROGRESS:
+			done, total = args
+			self.textbox_set_line(2, f"Transferred {convertunit(done)} of {convertunit(total)}.")
+
 		elif sig is THREADSIG.RESULT_INFO_WRITE_RESULTS:
 			mode = args[0]
 			for demo_name, write_result in args[1].items():
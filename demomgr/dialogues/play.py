@@ -437,8 +437,8 @@ class Play(BaseDialog):
 
 		# Populate the event mfl here
 		events = []
-		events += [("Killstreak", t, v) for v, t, _ in self.info.killstreak_peaks]
-		events += [("Bookmark", t, v) for v, t, _ in self.info.bookmarks]
+		events += [("Killstreak", t, v) for v, t, _ in self.info.killstreak_peaks.iter_tuples()]
+		events += [("Bookmark", t, v) for v, t, _ in self.info.bookmarks.iter_tuples()]
 		events.sort(key = lambda x: x[1])
 		data = {"col_type": [], "col_tick": [], "col_val": []}
 		for type, tick, val in events:
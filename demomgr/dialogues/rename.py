@@ -0,0 +1,269 @@
+"""
+This module contains the Rename dialog which renames demos after a
+name pattern, taking their demo info along.
+"""
+
+from time import time
+import tkinter as tk
+from tkinter import messagebox as tk_msg
+import tkinter.ttk as ttk
+
+from multiframe_list import MultiframeList, SELECTION_TYPE
+
+from demomgr import constants as CNST, platforming
+from demomgr.dialogues._base import BaseDialog
+from demomgr.dialogues._diagresult import DIAGSIG
+from demomgr.helpers import format_demo_name, frmd_label, get_name_pattern_fields
+from demomgr.threadgroup import ThreadGroup, THREADGROUPSIG
+from demomgr.threads import THREADSIG, ThreadRenameDemos
+from demomgr.tk_widgets import DmgrEntry, TtkText
+
+
+_DGM_TXT = {
+	CNST.DATA_GRAB_MODE.JSON: "JSON file",
+	CNST.DATA_GRAB_MODE.EVENTS: "_events logchunk",
+	CNST.DATA_GRAB_MODE.SQLITE: "database entry",
+}
+
+# Time the pattern has to stay unchanged before the preview is updated, in ms.
+_PREVIEW_DELAY = 150
+
+class Rename(BaseDialog):
+	"""
+	Dialog that renames demos of a directory after a name pattern, see
+	`helpers.format_demo_name`, and previews the new names.
+
+	After the dialog is closed:
+	`self.result.state` will be SUCCESS if a thread was run at least once
+		and demos were likely renamed. Otherwise, it will be FAILURE.
+	`self.result.data` will be a dict with the following key:
+		"renamed": A dict mapping the old names of all renamed demos to
+			their new names.
+	Widget state remembering:
+		0: The last used name pattern.
+	"""
+
+	def __init__(self, parent, demodir, files, mtimes, headers, cfg, styleobj, remember):
+		"""
+		parent: Parent widget, should be a `Tk` or `Toplevel` instance.
+		demodir: Absolute path to the directory containing the demos.
+		files: List of file names of the demos to be renamed.
+		mtimes: List of the demos' modification times, for the preview.
+			May contain `None` for unknown ones.
+		headers: List of the demos' headers, for the preview. May
+			contain `None` for unknown ones, which are read when renaming.
+		cfg: Program config.
+		styleobj: Instance of tkinter.ttk.Style.
+		remember: Widget state remembering; See class docstring.
+		"""
+		super().__init__(parent, "Rename")
+
+		self.master = parent
+		self.demodir = demodir
+		self.files = files
+		self.mtimes = dict(zip(files, mtimes))
+		self.headers = dict(zip(files, headers))
+		self.cfg = cfg
+		self.styleobj = styleobj
+		self._rem_pattern = remember[0]
+
+		self.result.data = {"renamed": {}}
+
+		# Current names of the demos, which change as they are renamed
+		self.current_names = files.copy()
+		self._name_idx_map = {name: i for i, name in enumerate(files)}
+		self.preview = {}
+		self.state = {}
+		self.thread_last_start_time = 0
+		self.thread_alive = False
+		self._preview_handle = None
+
+		self.threadgroup = ThreadGroup(ThreadRenameDemos, self.master)
+		self.threadgroup.build_cb_method(self._rename_after_callback)
+
+	def body(self, master):
+		self.protocol("WM_DELETE_WINDOW", self.destroy)
+
+		master.grid_columnconfigure(0, weight = 1)
+		master.grid_rowconfigure(0, weight = 1)
+
+		self.listbox = MultiframeList(
+			master,
+			(
+				{
+					"col_id": "col_file", "name": "Filename",
+					"formatter": lambda i: self.current_names[i],
+				},
+				{
+					"col_id": "col_new", "name": "New name",
+					"formatter": lambda i: self.preview.get(self.files[i], ""),
+				},
+				{
+					"col_id": "col_state", "name": "State",
+					"formatter": lambda i: self.state.get(self.files[i], ""),
+				},
+			),
+			rightclickbtn = platforming.get_rightclick_btn(),
+			resizable = True,
+			selection_type = SELECTION_TYPE.SINGLE,
+		)
+		self.listbox.set_data({
+			"col_file": list(range(len(self.files))),
+			"col_new": list(range(len(self.files))),
+			"col_state": list(range(len(self.files))),
+		})
+		self.listbox.format()
+
+		option_frame = ttk.LabelFrame(
+			master,
+			padding = 5,
+			labelwidget = frmd_label(master, "Name pattern"),
+		)
+		option_frame.grid_columnconfigure(0, weight = 1)
+		self.pattern_var = tk.StringVar()
+		self.pattern_entry = DmgrEntry(
+			option_frame, CNST.FILENAME_MAX, textvariable = self.pattern_var
+		)
+		ttk.Label(
+			option_frame,
+			style = "Info.Contained.TLabel",
+			text = (
+				"Fields: {name}, {n} (position in the list), {date} (accepts strftime "
+				"formats, like {date:%Y%m%d}), {map}, {player}, {server}. "
+				"\".dem\" is appended."
+			),
+			wraplength = 400,
+		).grid(row = 1, column = 0, sticky = "ew", pady = (3, 0))
+		self.pattern_entry.grid(row = 0, column = 0, sticky = "ew")
+
+		textframe = ttk.Frame(master, padding = 5)
+		textframe.grid_columnconfigure(0, weight = 1)
+		self.textbox = TtkText(textframe, self.styleobj, wrap = tk.NONE, width = 60, height = 3)
+		self.textbox.config(state = tk.DISABLED)
+		self.textbox.grid(column = 0, row = 0, sticky = "ew")
+
+		button_frame = ttk.Frame(master)
+		self.okbutton = ttk.Button(button_frame, text = "Rename", command = self._start_rename)
+		self.closebutton = ttk.Button(button_frame, text = "Close", command = self.destroy)
+		self.canceloperationbutton = ttk.Button(button_frame, text = "Abort", command = self._stopoperation)
+
+		self.listbox.grid(row = 0, column = 0, sticky = "nesw")
+		option_frame.grid(row = 1, column = 0, sticky = "ew", pady = (0, 5))
+		textframe.grid(row = 2, column = 0, sticky = "ew")
+		self.okbutton.pack(side = tk.LEFT, fill = tk.X, expand = 1, padx = (0, 3))
+		self.closebutton.pack(side = tk.LEFT, fill = tk.X, expand = 1, padx = (3, 0))
+		button_frame.grid(row = 3, column = 0, sticky = "ew")
+
+		self.pattern_var.set(self._rem_pattern)
+		del self._rem_pattern
+		self.pattern_var.trace_add("write", self._schedule_preview)
+		self.pattern_entry.focus()
+		self._update_preview()
+
+	def _schedule_preview(self, *_):
+		if self._preview_handle is not None:
+			self.after_cancel(self._preview_handle)
+		self._preview_handle = self.after(_PREVIEW_DELAY, self._update_preview)
+
+	def _update_preview(self):
+		self._preview_handle = None
+		pattern = self.pattern_var.get()
+		self.preview = {}
+		try:
+			get_name_pattern_fields(pattern)
+		except ValueError as e:
+			self._log(str(e))
+		else:
+			for i, name in enumerate(self.current_names, 1):
+				file = self.files[i - 1]
+				try:
+					self.preview[file] = format_demo_name(
+						pattern, name, i, self.mtimes[file], self.headers[file]
+					)
+				except ValueError as e:
+					self.preview[file] = f"? ({e})"
+		self.listbox.format(("col_new",))
+
+	def _log(self, to_log):
+		with self.textbox:
+			self.textbox.insert(tk.END, to_log + "\n")
+			self.textbox.yview_moveto(1.0)
+
+	def _stopoperation(self):
+		self.threadgroup.join_thread()
+
+	def _start_rename(self):
+		# See BulkOperator._start_demo_processing
+		if self.thread_alive:
+			return
+
+		pattern = self.pattern_var.get()
+		try:
+			get_name_pattern_fields(pattern)
+		except ValueError as e:
+			tk_msg.showerror("Demomgr", str(e), parent = self)
+			return
+
+		self.pattern_entry.configure(state = tk.DISABLED)
+		self.okbutton.pack_forget()
+		self.closebutton.pack_forget()
+		self.canceloperationbutton.pack(side = tk.LEFT, fill = tk.X, expand = 1)
+
+		self.state = {}
+		self.listbox.format(("col_state",))
+		self.thread_last_start_time = time()
+		self.thread_alive = True
+		self.threadgroup.start_thread(
+			directory = self.demodir,
+			names = self.current_names.copy(),
+			pattern = pattern,
+			cfg = self.cfg,
+			headers = {name: self.headers[f] for name, f in zip(self.current_names, self.files)},
+		)
+
+	def _rename_after_callback(self, sig, *args):
+		if sig.is_finish_signal():
+			self._log(
+				("Finished" if sig is THREADSIG.SUCCESS else "Stopped") +
+				f" after {round(time() - self.thread_last_start_time, 3)} seconds."
+			)
+			self.result.state = DIAGSIG.SUCCESS
+			self.canceloperationbutton.pack_forget()
+			self.okbutton.pack(side = tk.LEFT, fill = tk.X, expand = 1, padx = (0, 3))
+			self.closebutton.pack(side = tk.LEFT, fill = tk.X, expand = 1, padx = (3, 0))
+			self.pattern_entry.configure(state = tk.NORMAL)
+			self.thread_alive = False
+			self.listbox.format(("col_file", "col_state"))
+			self._update_preview()
+			return THREADGROUPSIG.FINISHED
+
+		elif sig is THREADSIG.FILE_OPERATION_SUCCESS:
+			old, new = args
+			i = self._name_idx_map.pop(old)
+			self._name_idx_map[new] = i
+			self.current_names[i] = new
+			if old != new:
+				self.state[self.files[i]] = "Renamed."
+
+		elif sig is THREADSIG.FILE_OPERATION_FAILURE:
+			name, err = args
+			self.state[self.files[self._name_idx_map[name]]] = f"Failed: {err}"
+
+		elif sig is THREADSIG.RESULT_INFO_WRITE_RESULTS:
+			mode, results = args
+			failed = [name for name, res in results.items() if res is not None]
+			if failed:
+				self._log(
+					f"Failed moving the {_DGM_TXT[mode]} of {len(failed)} demos: "
+					f"{results[failed[0]]}"
+				)
+
+		return THREADGROUPSIG.CONTINUE
+
+	def destroy(self):
+		self._stopoperation()
+		self.result.remember = [self.pattern_var.get()]
+		self.result.data["renamed"] = {
+			file: name for file, name in zip(self.files, self.current_names) if file != name
+		}
+		super().destroy()
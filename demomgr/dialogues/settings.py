@@ -120,17 +120,38 @@ class Settings(BaseDialog):
 		"data_grab_mode": (DATA_GRAB_MODE)
 		"file_manager_mode": (FILE_MANAGER_MODE)
 		"preview_demos": Whether to preview demos in the main view. (bool)
+		"header_columns": Whether to show columns taken from demo headers
+			in the main view. (bool)
 		"steam_path": Path to steam (str | None)
 		"hlae_path": Path to HLAE (str | None)
 		"file_manager_path": Path to file manager (str | None)
 		"events_blocksize": Chunk size _events.txt should be read in. (int)
+		"worker_threads": Amount of threads in the shared worker pool. (int)
+		"parse_processes": Amount of processes to parse demo information in,
+			0 to parse it in the reading thread. (int)
 		"ui_theme": Interface theme. Key of same name must be in
 			constants. (str)
 		"lazy_reload": Whether to lazily refresh singular UI elements instead
 			of reloading entire UI on changes as single demo deletion or
 			bookmark setting. (bool)
+		"library_catalog": Whether to keep a persistent catalog of all
+			demo paths. (bool)
+		"watch_directory": Whether to watch the displayed directory and
+			update the main view on changes. (bool)
 		"rcon_pwd": Password to use for RCON connections. (str | None)
 		"rcon_port": Port to use for RCON connections. (int)
+		"hardlink_copies": Whether demos copied within a file system may be
+			hardlinked instead. (bool)
+		"io_bytes_per_sec": Bytes background I/O may transfer per second,
+			0 for no limit. (int)
+		"io_ops_per_sec": File operations background I/O may do per
+			second, 0 for no limit. (int)
+		"io_low_priority": Whether to lower the priority of background
+			I/O. (bool)
+		"io_game_mode": Whether to limit background I/O further while
+			the game is running. (bool)
+		"validate_json": Whether to check JSON files for being valid demo
+			info before copying or moving them along with demos. (bool)
 
 	Widget state remembering:
 		0: Last visited section
@@ -158,8 +179,15 @@ class Settings(BaseDialog):
 		self.datagrabmode_var = tk.IntVar(value = self.cfg.data_grab_mode.value)
 		self.file_manager_mode_var = tk.IntVar(value = self.cfg.file_manager_mode.value)
 		self.preview_var = tk.BooleanVar(value = self.cfg.preview_demos)
+		self.header_columns_var = tk.BooleanVar(value = self.cfg.header_columns)
 		self.ui_style_var = tk.StringVar(value = self.cfg.ui_theme)
 		self.lazyreload_var = tk.BooleanVar(value = self.cfg.lazy_reload)
+		self.catalog_var = tk.BooleanVar(value = self.cfg.library_catalog)
+		self.watch_var = tk.BooleanVar(value = self.cfg.watch_directory)
+		self.hardlink_var = tk.BooleanVar(value = self.cfg.hardlink_copies)
+		self.validate_json_var = tk.BooleanVar(value = self.cfg.validate_json)
+		self.io_low_priority_var = tk.BooleanVar(value = self.cfg.io_low_priority)
+		self.io_game_mode_var = tk.BooleanVar(value = self.cfg.io_game_mode)
 		self._selectedpane_var = tk.IntVar()
 
 		master.grid_columnconfigure((0, 1), weight = 1)
@@ -178,6 +206,17 @@ class Settings(BaseDialog):
 			display_labelframe, variable = self.preview_var, text = "Show demo header information",
 			style = "Contained.TCheckbutton"
 		).grid(sticky = "w", ipadx = 4) # Preview
+		header_columns_btn = ttk.Checkbutton(
+			display_labelframe, variable = self.header_columns_var, text = "Show header columns",
+			style = "Contained.TCheckbutton"
+		)
+		header_columns_txt = DynamicLabel(
+			200, 400, display_labelframe,
+			text = (
+				"Will show map, player, playtime and tick count of demos in the main view, "
+				"loaded in the background."
+			), justify = tk.LEFT, style = "Contained.TLabel"
+		)
 		lazyreload_btn = ttk.Checkbutton(
 			display_labelframe, variable = self.lazyreload_var, text = "Lazy reload of main demo view",
 			style = "Contained.TCheckbutton"
@@ -189,8 +228,23 @@ class Settings(BaseDialog):
 				"bookmark modification."
 			), justify = tk.LEFT, style = "Contained.TLabel"
 		)
+		watch_btn = ttk.Checkbutton(
+			display_labelframe, variable = self.watch_var, text = "Watch demo directory",
+			style = "Contained.TCheckbutton"
+		)
+		watch_txt = DynamicLabel(
+			200, 400, display_labelframe,
+			text = (
+				"Will add, remove and update demos in the main view as they change on disk, "
+				"for example while recording."
+			), justify = tk.LEFT, style = "Contained.TLabel"
+		)
+		header_columns_btn.grid(sticky = "w", ipadx = 4, pady = (2, 0))
+		header_columns_txt.grid(sticky = "w", padx = (8, 0)) # Header columns
 		lazyreload_btn.grid(sticky = "w", ipadx = 4, pady = (2, 0))
 		lazyreload_txt.grid(sticky = "w", padx = (8, 0)) # Lazy reload
+		watch_btn.grid(sticky = "w", ipadx = 4, pady = (2, 0))
+		watch_txt.grid(sticky = "w", padx = (8, 0)) # Directory watching
 
 		ui_style_labelframe = ttk.Labelframe(
 			display_labelframe, style = "Contained.TLabelframe", padding = 8,
@@ -269,6 +323,7 @@ class Settings(BaseDialog):
 			CNST.DATA_GRAB_MODE.NONE,
 			CNST.DATA_GRAB_MODE.EVENTS,
 			CNST.DATA_GRAB_MODE.JSON,
+			CNST.DATA_GRAB_MODE.SQLITE,
 		):
 			b = ttk.Radiobutton(
 				datagrab_labelframe, value = enum_attr.value, variable = self.datagrabmode_var,
@@ -286,6 +341,50 @@ class Settings(BaseDialog):
 		)
 		self.blockszselector.grid(sticky = "ew")
 
+		worker_labelframe = ttk.LabelFrame(
+			suboptions_pane, padding = 8,
+			labelwidget = frmd_label(suboptions_pane, "Background worker threads")
+		)
+		worker_labelframe.grid_columnconfigure(0, weight = 1)
+		self.worker_selector = ttk.Combobox(
+			worker_labelframe, state = "readonly", values = tuple(range(1, 17))
+		)
+		self.worker_selector.grid(sticky = "ew")
+
+		parse_process_labelframe = ttk.LabelFrame(
+			suboptions_pane, padding = 8,
+			labelwidget = frmd_label(suboptions_pane, "Parser processes")
+		)
+		parse_process_labelframe.grid_columnconfigure(0, weight = 1)
+		self.parse_process_selector = ttk.Combobox(
+			parse_process_labelframe, state = "readonly", values = tuple(range(0, 17))
+		)
+		self.parse_process_selector.grid(sticky = "ew")
+		DynamicLabel(
+			200, 400, parse_process_labelframe,
+			text = (
+				"Parses large _events.txt files and many .json files in separate "
+				"processes. 0 disables this."
+			), justify = tk.LEFT, style = "Contained.TLabel"
+		).grid(sticky = "w")
+
+		catalog_labelframe = ttk.LabelFrame(
+			suboptions_pane, padding = 8,
+			labelwidget = frmd_label(suboptions_pane, "Library catalog")
+		)
+		catalog_labelframe.grid_columnconfigure(0, weight = 1)
+		ttk.Checkbutton(
+			catalog_labelframe, variable = self.catalog_var, text = "Keep a library catalog",
+			style = "Contained.TCheckbutton"
+		).grid(sticky = "w", ipadx = 4)
+		DynamicLabel(
+			200, 400, catalog_labelframe,
+			text = (
+				"Remembers file, demo and header information of all demo paths "
+				"next to the config, so unchanged directories load quicker."
+			), justify = tk.LEFT, style = "Contained.TLabel"
+		).grid(sticky = "w", padx = (8, 0))
+
 		# === RCON pane ===
 		rcon_pwd_labelframe = ttk.LabelFrame(
 			suboptions_pane, padding = 8, labelwidget = frmd_label(suboptions_pane, "RCON password")
@@ -343,13 +442,76 @@ class Settings(BaseDialog):
 		)
 		file_manager_launchcmd_label.grid(column = 0, row = 1, sticky = "nesw")
 
+		# === File operations pane ===
+		copying_labelframe = ttk.LabelFrame(
+			suboptions_pane, padding = 8, labelwidget = frmd_label(suboptions_pane, "Copying demos")
+		)
+		copying_labelframe.grid_columnconfigure(0, weight = 1)
+		ttk.Checkbutton(
+			copying_labelframe, variable = self.hardlink_var,
+			text = "Hardlink copies on the same drive", style = "Contained.TCheckbutton"
+		).grid(sticky = "w", ipadx = 4)
+		DynamicLabel(
+			200, 400, copying_labelframe,
+			text = (
+				"Copies take no time or space, but share their data and permissions "
+				"with the original demo. Drives that can clone files do so regardless."
+			), justify = tk.LEFT, style = "Contained.TLabel"
+		).grid(sticky = "w", padx = (8, 0))
+		ttk.Checkbutton(
+			copying_labelframe, variable = self.validate_json_var,
+			text = "Check JSON files before transferring them", style = "Contained.TCheckbutton"
+		).grid(sticky = "w", ipadx = 4)
+		DynamicLabel(
+			200, 400, copying_labelframe,
+			text = (
+				"JSON files that don't contain valid demo info are left behind when "
+				"copying or moving demos. Slower for many demos."
+			), justify = tk.LEFT, style = "Contained.TLabel"
+		).grid(sticky = "w", padx = (8, 0))
+
+		background_io_labelframe = ttk.LabelFrame(
+			suboptions_pane, padding = 8,
+			labelwidget = frmd_label(suboptions_pane, "Background disk access")
+		)
+		background_io_labelframe.grid_columnconfigure(1, weight = 1)
+		ttk.Label(
+			background_io_labelframe, style = "Contained.TLabel", text = "Limit (kB/s):"
+		).grid(row = 0, column = 0, sticky = "w")
+		self.io_bytes_entry = DmgrEntry(background_io_labelframe, -1)
+		self.io_bytes_entry.grid(row = 0, column = 1, sticky = "ew", padx = (5, 0), pady = 2)
+		ttk.Label(
+			background_io_labelframe, style = "Contained.TLabel", text = "Limit (files/s):"
+		).grid(row = 1, column = 0, sticky = "w")
+		self.io_ops_entry = DmgrEntry(background_io_labelframe, -1)
+		self.io_ops_entry.grid(row = 1, column = 1, sticky = "ew", padx = (5, 0), pady = 2)
+		ttk.Checkbutton(
+			background_io_labelframe, variable = self.io_low_priority_var,
+			text = "Lower disk priority", style = "Contained.TCheckbutton"
+		).grid(row = 2, column = 0, columnspan = 2, sticky = "w", ipadx = 4)
+		ttk.Checkbutton(
+			background_io_labelframe, variable = self.io_game_mode_var,
+			text = "Hold back while TF2 is running", style = "Contained.TCheckbutton"
+		).grid(row = 3, column = 0, columnspan = 2, sticky = "w", ipadx = 4)
+		DynamicLabel(
+			200, 400, background_io_labelframe,
+			text = (
+				"Applies to copying, moving and deleting demos, reading demo headers "
+				"and refreshing the library catalog. 0 disables a limit."
+			), justify = tk.LEFT, style = "Contained.TLabel"
+		).grid(row = 4, column = 0, columnspan = 2, sticky = "w")
+
 		# Set up sidebar
 		self._INTERFACE = {
 			"Interface": (display_labelframe, date_format_labelframe),
-			"Information reading": (datagrab_labelframe, eventread_labelframe),
+			"Information reading": (
+				datagrab_labelframe, eventread_labelframe, worker_labelframe,
+				parse_process_labelframe, catalog_labelframe,
+			),
 			"Paths": (path_labelframe,),
 			"RCON": (rcon_pwd_labelframe, rcon_port_labelframe),
 			"File manager": (file_manager_labelframe, custom_file_manager_arg_labelframe),
+			"File operations": (copying_labelframe, background_io_labelframe),
 		}
 
 		sidebar_outerframe = ttk.Frame(mainframe, style = "Border.TFrame")
@@ -388,6 +550,9 @@ class Settings(BaseDialog):
 		else:
 			self.blockszselector.set(next(iter(self.blockszvals)))
 
+		self.worker_selector.set(min(self.cfg.worker_threads, 16))
+		self.parse_process_selector.set(min(self.cfg.parse_processes, 16))
+
 		tmp = self.cfg.date_format
 		if tmp in CNST.DATE_FORMATS:
 			self.date_fmt_combobox.set(tmp)
@@ -401,6 +566,8 @@ class Settings(BaseDialog):
 		self.path_entry_file_manager.insert(0, self.cfg.file_manager_path or "")
 		self.rcon_pwd_entry.insert(0, self.cfg.rcon_pwd or "")
 		self.rcon_port_entry.insert(0, str(self.cfg.rcon_port))
+		self.io_bytes_entry.insert(0, str(self.cfg.io_bytes_per_sec // 1000))
+		self.io_ops_entry.insert(0, str(self.cfg.io_ops_per_sec))
 		w = []
 		for arg, is_template in self.cfg.file_manager_launchcmd:
 			if is_template:
@@ -454,12 +621,23 @@ class Settings(BaseDialog):
 			"data_grab_mode": CNST.DATA_GRAB_MODE(self.datagrabmode_var.get()),
 			"file_manager_mode": CNST.FILE_MANAGER_MODE(self.file_manager_mode_var.get()),
 			"preview_demos": self.preview_var.get(),
+			"header_columns": self.header_columns_var.get(),
 			"date_format": self.date_fmt_combobox.get(),
 			"events_blocksize": self.blockszvals[self.blockszselector.get()],
+			"worker_threads": int(self.worker_selector.get()),
+			"parse_processes": int(self.parse_process_selector.get()),
 			"ui_theme": self.ui_style_var.get(),
 			"lazy_reload": self.lazyreload_var.get(),
+			"library_catalog": self.catalog_var.get(),
+			"watch_directory": self.watch_var.get(),
 			"rcon_pwd": self.rcon_pwd_entry.get() or None,
 			"rcon_port": int(self.rcon_port_entry.get() or 0),
+			"hardlink_copies": self.hardlink_var.get(),
+			"validate_json": self.validate_json_var.get(),
+			"io_bytes_per_sec": int(self.io_bytes_entry.get() or 0) * 1000,
+			"io_ops_per_sec": int(self.io_ops_entry.get() or 0),
+			"io_low_priority": self.io_low_priority_var.get(),
+			"io_game_mode": self.io_game_mode_var.get(),
 		}
 
 		for key, e, name in (
@@ -0,0 +1,211 @@
+"""
+Watchers reporting changes to the entries of a directory.
+On Linux, inotify is used through ctypes. Everywhere else, or if that
+fails, the directory and a few files in it are polled instead.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+import typing as t
+
+from demomgr import constants as CNST
+
+# From <sys/inotify.h>
+_IN_MODIFY = 0x2
+_IN_CLOSE_WRITE = 0x8
+_IN_MOVED_FROM = 0x40
+_IN_MOVED_TO = 0x80
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_IN_DELETE_SELF = 0x400
+_IN_MOVE_SELF = 0x800
+_IN_IGNORED = 0x8000
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+
+_WATCH_MASK = (
+	_IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE |
+	_IN_DELETE | _IN_DELETE_SELF | _IN_MOVE_SELF
+)
+_EVENT_HEADER = struct.Struct("iIII")
+
+# Files whose change may affect the demo information of every demo.
+CONTAINER_FILES = (CNST.EVENT_FILE, CNST.DATABASE_FILE)
+
+# Files modified within this many seconds are polled for changes even if the
+# directory itself did not change, as that is what demos being recorded do.
+_POLL_HOT_SECONDS = 60.0
+
+
+class WatcherGone(OSError):
+	"""
+	Raised when the watched directory was deleted or moved.
+	"""
+
+
+class InotifyWatcher():
+	"""
+	Watches a directory with inotify. Only available on Linux.
+	"""
+
+	def __init__(self, directory: str) -> None:
+		"""
+		May raise: OSError.
+		"""
+		libc_name = ctypes.util.find_library("c")
+		if libc_name is None:
+			raise OSError("libc not found")
+		libc = ctypes.CDLL(libc_name, use_errno = True)
+		if not hasattr(libc, "inotify_init1"):
+			raise OSError("inotify is not available")
+
+		self._fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+		if self._fd < 0:
+			errno = ctypes.get_errno()
+			raise OSError(errno, os.strerror(errno))
+		if libc.inotify_add_watch(self._fd, os.fsencode(directory), _WATCH_MASK) < 0:
+			errno = ctypes.get_errno()
+			os.close(self._fd)
+			raise OSError(errno, os.strerror(errno), directory)
+
+	def wait(self, timeout: float) -> t.Set[str]:
+		"""
+		Waits up to `timeout` seconds for changes and returns the names
+		of all directory entries that changed, which may be empty.
+
+		May raise: OSError, `WatcherGone`.
+		"""
+		readable, _, _ = select.select([self._fd], [], [], timeout)
+		if not readable:
+			return set()
+		try:
+			buf = os.read(self._fd, 1 << 16)
+		except BlockingIOError:
+			return set()
+
+		changed = set()
+		pos = 0
+		while pos + _EVENT_HEADER.size <= len(buf):
+			_, mask, _, name_len = _EVENT_HEADER.unpack_from(buf, pos)
+			pos += _EVENT_HEADER.size
+			name = buf[pos:pos + name_len].rstrip(b"\0")
+			pos += name_len
+			if mask & (_IN_DELETE_SELF | _IN_MOVE_SELF | _IN_IGNORED):
+				raise WatcherGone("Watched directory was removed.")
+			if name:
+				changed.add(os.fsdecode(name))
+		return changed
+
+	def close(self) -> None:
+		os.close(self._fd)
+
+
+class PollingWatcher():
+	"""
+	Watches a directory by polling the modification time of it and of
+	the info container files. Demos and JSON files are only rescanned
+	when the directory changed, except for recently modified ones, which
+	are checked on every poll.
+	"""
+
+	def __init__(self, directory: str, interval: float = 2.0) -> None:
+		"""
+		May raise: OSError.
+		"""
+		self.directory = directory
+		self.interval = interval
+		self._dir_mtime = os.stat(directory).st_mtime_ns
+		self._entries = self._scan()
+		self._containers = {n: self._stat(n) for n in CONTAINER_FILES}
+		self._next_poll = time.monotonic() + interval
+
+	def _stat(self, name: str) -> t.Optional[t.Tuple[int, int]]:
+		try:
+			s = os.stat(os.path.join(self.directory, name))
+		except OSError:
+			return None
+		return (s.st_size, s.st_mtime_ns)
+
+	def _scan(self) -> t.Dict[str, t.Tuple[int, int]]:
+		res = {}
+		with os.scandir(self.directory) as it:
+			for entry in it:
+				if os.path.splitext(entry.name)[1] not in (".dem", ".json"):
+					continue
+				try:
+					s = entry.stat()
+				except OSError:
+					continue
+				res[entry.name] = (s.st_size, s.st_mtime_ns)
+		return res
+
+	def wait(self, timeout: float) -> t.Set[str]:
+		"""
+		Waits up to `timeout` seconds for the next poll and returns the
+		names of all directory entries that changed, which may be empty.
+
+		May raise: OSError, `WatcherGone`.
+		"""
+		delay = self._next_poll - time.monotonic()
+		if delay > timeout:
+			time.sleep(timeout)
+			return set()
+		if delay > 0:
+			time.sleep(delay)
+		self._next_poll = time.monotonic() + self.interval
+
+		try:
+			dir_mtime = os.stat(self.directory).st_mtime_ns
+		except FileNotFoundError:
+			raise WatcherGone("Watched directory was removed.")
+
+		changed = set()
+		for name, old in self._containers.items():
+			new = self._stat(name)
+			if new != old:
+				self._containers[name] = new
+				changed.add(name)
+
+		if dir_mtime != self._dir_mtime:
+			self._dir_mtime = dir_mtime
+			new_entries = self._scan()
+			changed.update(
+				name for name in self._entries.keys() | new_entries.keys()
+				if self._entries.get(name) != new_entries.get(name)
+			)
+			self._entries = new_entries
+		else:
+			hot_after = time.time_ns() - int(_POLL_HOT_SECONDS * 1e9)
+			for name, old in list(self._entries.items()):
+				if old[1] < hot_after:
+					continue
+				new = self._stat(name)
+				if new != old:
+					changed.add(name)
+					if new is None:
+						del self._entries[name]
+					else:
+						self._entries[name] = new
+		return changed
+
+	def close(self) -> None:
+		pass
+
+
+def get_watcher(directory: str) -> t.Union[InotifyWatcher, PollingWatcher]:
+	"""
+	Returns the best watcher available for `directory`.
+
+	May raise: OSError.
+	"""
+	if sys.platform.startswith("linux"):
+		try:
+			return InotifyWatcher(directory)
+		except (OSError, AttributeError):
+			pass
+	return PollingWatcher(directory)
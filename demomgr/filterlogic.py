@@ -31,13 +31,13 @@ class FILTERFLAGS:
 
 FILTERDICT = {
 	"name":              ('"{}" in x["name"]', str, 0),
-	"bookmark_contains": ('any("{}" in b.value for b in x["demo_info"].bookmarks)', str, 0),
+	"bookmark_contains": ('any("{}" in v for v in x["demo_info"].bookmarks.get_values())', str, 0),
 	"map":               ('"{}" in x["header"]["map_name"]', str, FILTERFLAGS.HEADER),
 	"hostname":          ('"{}" in x["header"]["hostname"]', str, FILTERFLAGS.HEADER),
 	"clientid":          ('"{}" in x["header"]["clientid"]', str, FILTERFLAGS.HEADER),
-	"killstreaks":       ('len(x["demo_info"].killstreak_peaks) {sign} {}', int, 0),
-	"bookmarks":         ('len(x["demo_info"].bookmarks) {sign} {}', int, 0),
-	"beststreak":        ('max((i.value for i in x["demo_info"].killstreak_peaks), default=-1) {sign} {}', int, 0),
+	"killstreaks":       ('x["demo_info"].get_killstreak_count() {sign} {}', int, 0),
+	"bookmarks":         ('x["demo_info"].get_bookmark_count() {sign} {}', int, 0),
+	"beststreak":        ('max(x["demo_info"].killstreak_peaks.get_values(), default=-1) {sign} {}', int, 0),
 	"moddate":           ('x["filedata"]["modtime"] {sign} {}', int, FILTERFLAGS.FILESYS),
 	"filesize":          ('x["filedata"]["filesize"] {sign} {}', int, FILTERFLAGS.FILESYS),
 }
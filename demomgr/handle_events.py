@@ -4,6 +4,9 @@ by the source engine.
 2022 update: This code is like 2 years old and could use a serious make-over.
 """
 
+import os
+import re
+
 _DEF = {"sep": ">\n"}
 
 read_DEF = {"blocksz": 65536, "resethandle": True}
@@ -150,6 +153,168 @@ class EventReader():
 			[RawLogchunk(i[:-1], not bool(rawread), self.handle.name) for i in logchunks]
 		)
 
+class EventTailReader():
+	"""
+	Class designed to follow a Source engine demo event log file while
+	it is being appended to, returning only chunks that were added since
+	the last read.
+
+	path: Path to the file. It does not need to exist yet.
+	sep: Seperator of individual logchunks. (Default '>\\n', str)
+	blocksz: Blocksize to search the file's last chunk in. (Default
+		65536, int)
+	from_end: If True, following starts at the last chunk of the file
+		as it exists on the first read instead of its start. (Default
+		False, bool)
+
+	The last chunk of a file is usually not terminated by a seperator
+	and may keep growing, as the game appends lines to the chunk of the
+	demo being recorded. It is returned, with `is_last` set, whenever
+	it changed. Every chunk describes its demo entirely, so consumers
+	should let later chunks of a demo supersede earlier ones.
+	"""
+
+	# Bytes before the read offset that are remembered to detect rewrites
+	# that did not change the file's identity or shrink it.
+	_ANCHOR_SIZE = 64
+
+	def __init__(self, path, sep = None, blocksz = None, from_end = False):
+		self.path = path
+		sep = (_DEF["sep"] if sep is None else sep).encode("utf-8")
+		self.sep = sep
+		# Files written in text mode on windows may separate lines with \r\n
+		self._sep_re = re.compile(
+			re.escape(sep[:-1]) + rb"\r?\n" if sep.endswith(b"\n") else re.escape(sep)
+		)
+		self.blocksz = read_DEF["blocksz"] if blocksz is None else blocksz
+		self.from_end = from_end
+
+		self._started = False
+		self._file_id = None
+		self._size = 0
+		self._mtime = None
+		self._offset = 0
+		self._anchor = b""
+		self._pending_sent = b""
+
+	def _find_start(self, handle, size):
+		"""
+		Returns the offset following should start at in the file open
+		in `handle` with the given size.
+		"""
+		# A file that only appeared after following started is new entirely.
+		if not self.from_end or self._started:
+			return 0
+		pos = size
+		tail = b""
+		while pos > 0:
+			step = min(self.blocksz, pos)
+			pos -= step
+			handle.seek(pos)
+			tail = handle.read(step) + tail
+			last = None
+			for last in self._sep_re.finditer(tail):
+				pass
+			if last is not None:
+				return pos + last.end()
+		return 0
+
+	def _restart(self, handle, size):
+		self._offset = self._find_start(handle, size)
+		handle.seek(max(0, self._offset - self._ANCHOR_SIZE))
+		self._anchor = handle.read(self._offset - handle.tell())
+		self._pending_sent = b""
+
+	def _is_rewritten(self, handle, size, mtime):
+		"""
+		Heuristically determines whether the file was rewritten: It must
+		not shrink, grow when modified and still contain the bytes seen
+		last right before the read offset.
+		"""
+		if size < self._offset or (size == self._size and mtime != self._mtime):
+			return True
+		if not self._anchor:
+			return False
+		handle.seek(self._offset - len(self._anchor))
+		return handle.read(len(self._anchor)) != self._anchor
+
+	def _to_chunk(self, raw, is_last):
+		content = raw.decode("utf-8").replace("\r\n", "\n")
+		if content.endswith("\n"):
+			content = content[:-1]
+		if not content or content.isspace():
+			return None
+		return RawLogchunk(content, is_last, self.path)
+
+	def read_new(self):
+		"""
+		Reads everything appended to the file since the last call.
+		Returns a tuple of whether the file was deleted, truncated,
+		replaced or rewritten since the last call and a list of the new
+		RawLogchunks. On such a restart, previously returned chunks are
+		outdated and all chunks of the file are returned.
+		The first call never counts as a restart.
+
+		May raise:
+			OSError if the file can not be read.
+			UnicodeDecodeError when reading non-utf-8 data.
+		"""
+		try:
+			handle = open(self.path, "rb")
+		except FileNotFoundError:
+			restarted = self._file_id is not None
+			self._started = True
+			self._file_id = None
+			self._offset = 0
+			self._anchor = b""
+			self._pending_sent = b""
+			return (restarted, [])
+
+		with handle:
+			stat_res = os.fstat(handle.fileno())
+			file_id = (stat_res.st_dev, stat_res.st_ino)
+			restarted = False
+			if self._file_id is None:
+				self._restart(handle, stat_res.st_size)
+			elif (
+				file_id != self._file_id or
+				self._is_rewritten(handle, stat_res.st_size, stat_res.st_mtime_ns)
+			):
+				restarted = True
+				self._restart(handle, stat_res.st_size)
+			self._started = True
+			self._file_id = file_id
+			self._size = stat_res.st_size
+			self._mtime = stat_res.st_mtime_ns
+
+			handle.seek(self._offset)
+			data = handle.read()
+
+		chunks = []
+		consumed = 0
+		for match in self._sep_re.finditer(data):
+			raw = data[consumed:match.start()]
+			# The pending chunk was terminated; skip it if it was already returned as is.
+			if not (consumed == 0 and raw == self._pending_sent):
+				chk = self._to_chunk(raw, False)
+				if chk is not None:
+					chunks.append(chk)
+			consumed = match.end()
+		if consumed > 0:
+			self._anchor = (self._anchor + data[:consumed])[-self._ANCHOR_SIZE:]
+			self._offset += consumed
+			self._pending_sent = b""
+
+		pending = data[consumed:]
+		# Only return the pending chunk once its last line is complete.
+		if pending.endswith(b"\n") and pending != self._pending_sent:
+			chk = self._to_chunk(pending, True)
+			if chk is not None:
+				chunks.append(chk)
+			self._pending_sent = pending
+
+		return (restarted, chunks)
+
 class EventWriter():
 	"""
 	Class designed to write to a Source engine demo event log file.
@@ -1,14 +1,18 @@
 """Various helper functions and classes used all over the program."""
 
+from concurrent.futures import CancelledError
 import datetime
 from math import log10, floor
+import string
 import struct
 from tkinter.ttk import Frame, Label, Widget
 import typing as t
 
 from demomgr import constants as CNST
+from demomgr.io_governor import ACCESS_HINT, get_io_governor
 
 if t.TYPE_CHECKING:
+	import threading
 	from demomgr.demo_info import DemoEvent
 
 
@@ -43,6 +47,17 @@ def convertunit(inp, ext: str = "B") -> str:
 		f"{_CONVPREF[_CONVPREF_CENTER + mag]}{ext}"
 	)
 
+def format_duration(secs: float) -> str:
+	"""
+	Formats a duration given in seconds as `m:ss`, or `h:mm:ss` if it
+	is an hour or longer.
+	"""
+	mins, secs = divmod(int(secs), 60)
+	if mins < 60:
+		return f"{mins}:{secs:02}"
+	hours, mins = divmod(mins, 60)
+	return f"{hours}:{mins:02}:{secs:02}"
+
 def deepupdate_dict(target: t.Dict, update: t.Dict) -> t.Dict:
 	"""
 	Updates dicts and calls itself recursively if a dict is encountered
@@ -85,6 +100,8 @@ def readdemoheader(path) -> t.Dict:
 	"""
 	demhdr = {}
 	with open(path, "rb") as h:
+		# Only the start of the file is needed, don't read ahead
+		get_io_governor().advise(h.fileno(), ACCESS_HINT.RANDOM)
 		if readbin_str(h, 8) != "HL2DEMO":
 			raise ValueError("Malformed demo, expected `HL2DEMO` header")
 		try:
@@ -104,6 +121,37 @@ def readdemoheader(path) -> t.Dict:
 
 	return demhdr
 
+def readdemoheaders(
+	paths: t.Iterable[str],
+	cancel_token: t.Optional["threading.Event"] = None,
+) -> t.List[t.Union[t.Dict, Exception]]:
+	"""
+	Reads the headers of all demos in `paths`.
+	Returns a list containing, for each path, either the header dict as
+	returned by `readdemoheader` or the `OSError`/`ValueError` that
+	occurred while reading it.
+	If `cancel_token` is given and set while reading, the headers of
+	all remaining paths are reported as a `CancelledError`.
+	Each header read counts as one file operation of background I/O,
+	see `io_governor`.
+	"""
+	governor = get_io_governor()
+	res = []
+	for path in paths:
+		if cancel_token is not None and cancel_token.is_set():
+			res.append(CancelledError())
+			continue
+		try:
+			governor.throttle(0, 1, cancel_token)
+		except CancelledError as e:
+			res.append(e)
+			continue
+		try:
+			res.append(readdemoheader(path))
+		except (OSError, ValueError) as e:
+			res.append(e)
+	return res
+
 def getstreakpeaks(killstreaks: t.Sequence["DemoEvent"]) -> t.List["DemoEvent"]:
 	"""
 	Takes a list of DemoEvents, then returns a list of only the ones
@@ -152,3 +200,85 @@ def tk_secure_str(in_str: str, repl: t.Optional[str] = None) -> str:
 	if repl is None:
 		repl = CNST.REPLACEMENT_CHAR
 	return "".join((i if ord(i) <= 0xFFFF else repl) for i in in_str)
+
+class _PatternDate(datetime.datetime):
+	"""
+	Datetime that is formatted the way TF2 names its demos by default
+	when no format is given.
+	"""
+	def __format__(self, spec: str) -> str:
+		return super().__format__(spec or "%Y-%m-%d_%H-%M-%S")
+
+# Fields of a demo name pattern that require the demo's header
+NAME_PATTERN_HEADER_FIELDS = {"map": "map_name", "player": "clientid", "server": "hostname"}
+NAME_PATTERN_FIELDS = ("name", "n", "date", *NAME_PATTERN_HEADER_FIELDS)
+# Characters not allowed in demo names on any system or in _events.txt
+_INVALID_NAME_CHARS = frozenset('<>:"/\\|?*\0\n\r\t')
+
+def get_name_pattern_fields(pattern: str) -> t.Set[str]:
+	"""
+	Returns the names of all fields used in the demo name pattern
+	`pattern`, see `format_demo_name`.
+	May raise: ValueError if the pattern is malformed or uses unknown
+		fields.
+	"""
+	fields = set()
+	try:
+		parsed = list(string.Formatter().parse(pattern))
+	except ValueError as e:
+		raise ValueError(f"Malformed pattern: {e}") from e
+	for _, field, _, _ in parsed:
+		if field is None:
+			continue
+		if field not in NAME_PATTERN_FIELDS:
+			raise ValueError(f"Unknown field {{{field}}}")
+		fields.add(field)
+	return fields
+
+def format_demo_name(
+	pattern: str,
+	name: str,
+	index: int,
+	mtime: t.Optional[float],
+	header: t.Optional[t.Dict],
+) -> str:
+	"""
+	Builds a new demo name from `pattern`, in which the following
+	fields are replaced, `str.format` style:
+		{name}: The demo's name without its extension.
+		{n}: `index`, usually the 1-based position of the demo in a
+			selection.
+		{date}: The demo's modification time `mtime`. Takes `strftime`
+			format specs, like `{date:%Y%m%d}`.
+		{map}, {player}, {server}: The respective values from the demo's
+			`header`.
+	The returned name always ends in `.dem`.
+	May raise: ValueError if the pattern is malformed or uses unknown
+		fields, a field's value is unknown or the resulting name is not
+		a valid demo name.
+	"""
+	fields = get_name_pattern_fields(pattern)
+	values = {"name": name[:-4] if name.endswith(".dem") else name, "n": index}
+	if "date" in fields:
+		if mtime is None:
+			raise ValueError("Modification time unknown")
+		values["date"] = _PatternDate.fromtimestamp(mtime)
+	for field, key in NAME_PATTERN_HEADER_FIELDS.items():
+		if field in fields:
+			if header is None:
+				raise ValueError("Demo header unknown")
+			values[field] = header[key]
+
+	try:
+		res = pattern.format_map(values)
+	except (IndexError, ValueError) as e:
+		raise ValueError(f"Malformed pattern: {e}") from e
+	if not res or res.strip(" .") == "":
+		raise ValueError("Empty demo name")
+	invalid = _INVALID_NAME_CHARS.intersection(res)
+	if invalid:
+		raise ValueError(f"Invalid characters in demo name: {' '.join(sorted(map(repr, invalid)))}")
+	res += ".dem"
+	if len(res) > CNST.FILENAME_MAX:
+		raise ValueError("Demo name too long")
+	return res
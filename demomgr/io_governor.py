@@ -0,0 +1,252 @@
+"""
+A process-wide governor for the disk I/O of background work like bulk
+transfers, header scans and catalog refreshes, so it does not saturate
+the disk while the game records or plays back demos.
+I/O done by a thread inside `IOGovernor.background` is background I/O:
+`IOGovernor.throttle` makes it wait until a budget of bytes and file
+operations per second allows it, and if low-priority hints are enabled,
+the thread's I/O priority is lowered and the kernel is told how files
+are accessed. Outside of it, all of this does nothing.
+While the game is running, a stricter budget and the hints apply
+automatically if the game mode is enabled.
+"""
+
+from concurrent.futures import CancelledError
+from contextlib import contextmanager
+from enum import IntEnum
+import os
+import threading
+import time
+import typing as t
+
+from demomgr import platforming
+
+# Budget while the game is running, unless a stricter one is configured
+GAME_BYTES_PER_SEC = 8_000_000
+GAME_OPS_PER_SEC = 100
+
+# Seconds the result of checking whether the game is running is kept for
+_GAME_CHECK_INTERVAL = 5.0
+# Smallest chunk size suggested for throttled transfers
+_MIN_CHUNK_SIZE = 64 << 10
+
+
+class ACCESS_HINT(IntEnum):
+	"""
+	How a file is accessed, see `IOGovernor.advise`.
+	"""
+	SEQUENTIAL = 0
+	RANDOM = 1
+	DONE = 2
+
+if hasattr(os, "posix_fadvise"):
+	_FADVISE = {
+		ACCESS_HINT.SEQUENTIAL: os.POSIX_FADV_SEQUENTIAL,
+		ACCESS_HINT.RANDOM: os.POSIX_FADV_RANDOM,
+		ACCESS_HINT.DONE: os.POSIX_FADV_DONTNEED,
+	}
+else:
+	_FADVISE = None
+
+
+class _TokenBucket():
+	"""
+	Budget refilling at a rate of units per second, holding at most one
+	second's worth. Requests always succeed and may put it into debt,
+	which following ones have to wait out.
+	"""
+
+	def __init__(self) -> None:
+		self.rate = 0
+		self._level = 0.0
+		self._last = time.monotonic()
+
+	def take(self, amount: int, rate: int) -> float:
+		"""
+		Takes `amount` units from the bucket, refilling at `rate`.
+		Returns the amount of seconds to wait before using them.
+		"""
+		now = time.monotonic()
+		if rate != self.rate:
+			self._level = min(self._level, rate) if self.rate else rate
+			self.rate = rate
+		self._level = min(rate, self._level + (now - self._last) * rate)
+		self._last = now
+		self._level -= amount
+		return 0.0 if self._level >= 0 else -self._level / rate
+
+
+class IOGovernor():
+	"""
+	Throttles background I/O, see the module docstring.
+	"""
+
+	def __init__(self) -> None:
+		self.bytes_per_sec = 0
+		self.ops_per_sec = 0
+		self.low_priority = False
+		self.game_mode = False
+		self._lock = threading.Lock()
+		self._local = threading.local()
+		self._bytes = _TokenBucket()
+		self._ops = _TokenBucket()
+		self._game_running = False
+		self._game_checked = None
+
+	def configure(
+		self,
+		bytes_per_sec: int,
+		ops_per_sec: int,
+		low_priority: bool,
+		game_mode: bool,
+	) -> None:
+		"""
+		bytes_per_sec: Bytes background I/O may read or write per
+			second, 0 for no limit.
+		ops_per_sec: File operations like opening, renaming or reading
+			the header of a file background I/O may do per second, 0 for
+			no limit.
+		low_priority: Whether to lower the I/O priority of threads doing
+			background I/O and hint the kernel at how they access files.
+		game_mode: Whether to apply the game budget and low-priority
+			hints while the game is running.
+		"""
+		with self._lock:
+			self.bytes_per_sec = bytes_per_sec
+			self.ops_per_sec = ops_per_sec
+			self.low_priority = low_priority
+			self.game_mode = game_mode
+
+	def is_game_running(self) -> bool:
+		"""
+		Returns whether the game mode is enabled and the game is running.
+		"""
+		if not self.game_mode:
+			return False
+		now = time.monotonic()
+		if self._game_checked is None or now - self._game_checked >= _GAME_CHECK_INTERVAL:
+			# Races only cause a redundant check
+			self._game_checked = now
+			self._game_running = platforming.is_game_running()
+		return self._game_running
+
+	def get_limits(self) -> t.Tuple[int, int]:
+		"""
+		Returns the bytes and file operations per second background I/O
+		may currently use, 0 meaning no limit.
+		"""
+		bytes_per_sec = self.bytes_per_sec
+		ops_per_sec = self.ops_per_sec
+		if self.is_game_running():
+			bytes_per_sec = min(bytes_per_sec or GAME_BYTES_PER_SEC, GAME_BYTES_PER_SEC)
+			ops_per_sec = min(ops_per_sec or GAME_OPS_PER_SEC, GAME_OPS_PER_SEC)
+		return bytes_per_sec, ops_per_sec
+
+	def is_background(self) -> bool:
+		"""
+		Returns whether the calling thread is doing background I/O.
+		"""
+		return getattr(self._local, "depth", 0) > 0
+
+	def _use_hints(self) -> bool:
+		return self.low_priority or self.is_game_running()
+
+	@contextmanager
+	def background(self) -> t.Iterator[None]:
+		"""
+		Context manager under which the I/O of the calling thread is
+		background I/O. May be nested.
+		"""
+		depth = getattr(self._local, "depth", 0)
+		self._local.depth = depth + 1
+		lowered = depth == 0 and self._use_hints() and platforming.set_thread_background_io(True)
+		try:
+			yield
+		finally:
+			self._local.depth = depth
+			if lowered:
+				platforming.set_thread_background_io(False)
+
+	def bind(self, fn: t.Callable) -> t.Callable:
+		"""
+		Returns `fn` wrapped so it does background I/O in any thread it
+		is called from if the calling thread is doing background I/O
+		now. For handing work to other threads.
+		"""
+		if not self.is_background():
+			return fn
+		def wrapper(*args, **kwargs):
+			with self.background():
+				return fn(*args, **kwargs)
+		return wrapper
+
+	def throttle(
+		self,
+		nbytes: int = 0,
+		ops: int = 0,
+		cancel_token: t.Optional[threading.Event] = None,
+	) -> None:
+		"""
+		If the calling thread is doing background I/O, blocks until the
+		budget allows it to transfer `nbytes` bytes and do `ops` file
+		operations. Returns immediately otherwise.
+
+		May raise: CancelledError if `cancel_token` is set while waiting.
+		"""
+		if not self.is_background():
+			return
+		bytes_per_sec, ops_per_sec = self.get_limits()
+		delay = 0.0
+		with self._lock:
+			if bytes_per_sec and nbytes:
+				delay = self._bytes.take(nbytes, bytes_per_sec)
+			if ops_per_sec and ops:
+				delay = max(delay, self._ops.take(ops, ops_per_sec))
+		if delay <= 0.0:
+			return
+		if cancel_token is None:
+			time.sleep(delay)
+		elif cancel_token.wait(delay):
+			raise CancelledError()
+
+	def get_chunk_size(self, chunk_size: int) -> int:
+		"""
+		Returns `chunk_size`, made smaller for throttled background I/O
+		so its transfers proceed in steps of about a tenth of a second.
+		"""
+		if not self.is_background():
+			return chunk_size
+		bytes_per_sec, _ = self.get_limits()
+		if not bytes_per_sec:
+			return chunk_size
+		return max(_MIN_CHUNK_SIZE, min(chunk_size, bytes_per_sec // 10))
+
+	def advise(self, fd: int, hint: ACCESS_HINT) -> None:
+		"""
+		Tells the kernel how the open file `fd` is accessed if the
+		calling thread is doing background I/O with low-priority hints,
+		so it reads ahead only as much as needed and does not push more
+		important data out of its cache. Does nothing where
+		`posix_fadvise` is not available.
+		"""
+		if _FADVISE is None or not self.is_background() or not self._use_hints():
+			return
+		try:
+			os.posix_fadvise(fd, 0, 0, _FADVISE[hint])
+		except OSError:
+			pass
+
+
+_governor = IOGovernor()
+
+def get_io_governor() -> IOGovernor:
+	"""
+	Returns the process-wide I/O governor.
+	"""
+	return _governor
+
+def set_io_limits(bytes_per_sec: int, ops_per_sec: int, low_priority: bool, game_mode: bool) -> None:
+	"""
+	Configures the process-wide I/O governor, see `IOGovernor.configure`.
+	"""
+	_governor.configure(bytes_per_sec, ops_per_sec, low_priority, game_mode)
@@ -1,6 +1,9 @@
+import math
 import os
 import importlib.resources
+import itertools
 import json
+import queue
 import shutil
 import subprocess
 import tkinter as tk
@@ -12,18 +15,28 @@ import typing as t
 import multiframe_list.multiframe_list as mfl
 from schema import SchemaError
 
+from demomgr.catalog import get_catalog
 from demomgr import constants as CNST
 from demomgr import context_menus
 from demomgr.config import Config
-from demomgr.demo_info import DemoInfo
+from demomgr.demo_info import DemoInfo, is_same_info
+from demomgr.demo_table import DemoTable
 from demomgr.dialogues import *
 from demomgr.explorer import open_explorer
-from demomgr.helpers import build_date_formatter, convertunit
+from demomgr.helpers import build_date_formatter, convertunit, format_duration
+from demomgr.io_governor import set_io_limits
 from demomgr import platforming
+from demomgr.parse_pool import shutdown_process_pool
+from demomgr.snapshot import read_snapshot, write_snapshot
 from demomgr.style_helper import StyleHelper
 from demomgr.threadgroup import ThreadGroup, THREADGROUPSIG
-from demomgr.threads import THREADSIG, ThreadFilter, ThreadReadFolder, ReadDemoMetaThread
-from demomgr.tk_widgets import DmgrEntry, KeyValueDisplay, HeadedFrame, purge_commands
+from demomgr.threads import (
+	THREADSIG, ThreadFilter, ThreadLoadDemoInfo, ThreadPreviewDemo, ThreadReadFolder, ThreadReadLibrary,
+	ThreadRefreshCatalog, ThreadWatchDirectory, set_worker_count,
+)
+from demomgr.tk_widgets import (
+	DmgrEntry, KeyValueDisplay, HeadedFrame, VirtualMultiframeList, purge_commands,
+)
 
 
 __version__ = "1.11.1"
@@ -69,34 +82,67 @@ class MainApp():
 		self.demooperations = (
 			DemoOp("Play...", self._playdem, None, lambda s: s == 1),
 			DemoOp("Delete/Copy/Move...", self._copy_move_delete_demos, None, lambda s: s > 0),
-			# DemoOp("Rename...", self._rename, None, lambda s: s == 1),
+			DemoOp("Rename...", self._rename, None, lambda s: s > 0),
 			DemoOp("Manage bookmarks...", self._managebookmarks, None, lambda s: s == 1),
+			DemoOp("Bulk bookmarks...", self._bulk_bookmarks, None, lambda s: s > 0),
 			DemoOp("Reveal in file manager...", self._open_file_manager, None, lambda _: True),
 		)
 
 		self.cfgpath = platforming.get_cfg_storage_path()
 		self.curdir: t.Optional[str] = None
+		# Whether all demo paths are displayed at once. `self.curdir` is `None` then.
+		self.aggregate = False
+		# Demo data of all directories received so far while in aggregate mode.
+		self._aggregate_data: t.Optional[DemoTable] = None
+		# (directory, demo name) pairs matched by the running filter-select thread.
+		self._filter_select_hits: t.Set[t.Tuple[str, str]] = set()
+		# Whether the listbox displays the unfiltered demos of `self.curdir`.
+		self._showing_directory = False
+		# Whether the next fetchdata result should be patched into the displayed data
+		# instead of replacing it.
+		self._patch_fetched_data = False
+		# Viewport updates for the loadinfo thread, see `_poll_viewport`.
+		self._viewport_queue: queue.Queue = queue.Queue()
+		self._last_viewport: t.Optional[t.Tuple[int, int, int]] = None
+		# Maps demo names to their last known listbox row, see `_find_row`.
+		self._row_cache: t.Dict[str, int] = {}
 		self.spinboxvar = tk.StringVar()
 
 		self.after_handle_statusbar = self.root.after(0, lambda: True)
+		self.after_handle_viewport = self.root.after(0, lambda: True)
 
 		# Threading setup
 		self.threadgroups = {
 			"filter_select": ThreadGroup(ThreadFilter, self.root),
-			"demometa": ThreadGroup(ReadDemoMetaThread, self.root),
 			"fetchdata": ThreadGroup(ThreadReadFolder, self.root),
+			"fetchlibrary": ThreadGroup(ThreadReadLibrary, self.root),
 			"filter": ThreadGroup(ThreadFilter, self.root),
+			"watch": ThreadGroup(ThreadWatchDirectory, self.root),
+			"loadinfo": ThreadGroup(ThreadLoadDemoInfo, self.root),
 		}
 
 		self.threadgroups["filter_select"].register_finalize_method(
 			self._finalization_filter_select
 		)
 		self.threadgroups["fetchdata"].register_finalize_method(self._finalization_fetchdata)
+		self.threadgroups["fetchlibrary"].register_finalize_method(self._finalization_fetchdata)
 
 		self.threadgroups["filter_select"].build_cb_method(self._after_callback_filter_select)
-		self.threadgroups["demometa"].build_cb_method(self._after_callback_demoinfo)
 		self.threadgroups["fetchdata"].build_cb_method(self._after_callback_fetchdata)
+		self.threadgroups["fetchlibrary"].build_cb_method(self._after_callback_fetchlibrary)
 		self.threadgroups["filter"].build_cb_method(self._after_callback_filter)
+		self.threadgroups["watch"].build_cb_method(self._after_callback_watch)
+		self.threadgroups["loadinfo"].build_cb_method(self._after_callback_loadinfo)
+
+		# Not part of the other threadgroups, as it should survive reloads.
+		self.catalog_threadgroup = ThreadGroup(ThreadRefreshCatalog, self.root)
+		self.catalog_threadgroup.build_cb_method(self._after_callback_catalog)
+		# Long-lived, started on the first preview. Requests to it go through `_preview_queue`.
+		self.preview_threadgroup = ThreadGroup(ThreadPreviewDemo, self.root)
+		self.preview_threadgroup.build_cb_method(self._after_callback_preview)
+		self._preview_queue: queue.Queue = queue.Queue()
+		# Full path of the demo whose header the preview pane waits for.
+		self._preview_path: t.Optional[str] = None
 
 		# startup routine
 		if os.path.exists(self.cfgpath):
@@ -126,6 +172,12 @@ class MainApp():
 		if self.cfg is None:
 			return
 
+		set_worker_count(self.cfg.worker_threads)
+		set_io_limits(
+			self.cfg.io_bytes_per_sec, self.cfg.io_ops_per_sec,
+			self.cfg.io_low_priority, self.cfg.io_game_mode,
+		)
+
 		try:
 			quieres = importlib.resources.read_binary("demomgr.ui_themes", CNST.ICON_FILENAME)
 			icon = tk.PhotoImage(data = quieres)
@@ -173,7 +225,8 @@ class MainApp():
 			last_path = self.cfg.demo_paths[self.cfg.last_path]
 		self.curdir = last_path
 		self.spinboxvar.set("" if self.curdir is None else self.curdir)
-		self.reloadgui()
+		self.reloadgui(warm = True)
+		self._refresh_catalog()
 		# All subsequent changes to the spinbox will call
 		# self._spinboxsel -> self.reloadgui, and update main view.
 		self.spinboxvar.trace("w", self._spinboxsel)
@@ -206,20 +259,21 @@ class MainApp():
 		demoinfframe.internal_frame.grid_columnconfigure(0, weight = 1)
 		demoinfframe.internal_frame.grid_rowconfigure(1, weight = 1)
 
-		# Hardcoded weights that approximately relate to the length of each of the column's strings
-		self.listbox = mfl.MultiframeList(
+		# Hardcoded weights that approximately relate to the length of each of the column's strings.
+		# Only rows around the viewport are rendered, so large directories display quickly.
+		self.listbox = VirtualMultiframeList(
 			self.listboxframe,
 			inicolumns = (
 				{"name": "Name", "col_id": "col_filename", "sort": True,
 					"weight": round(1.5 * mfl.WEIGHT), "dblclick_cmd": lambda _: self._playdem()},
 				{"name": "Killstreaks", "col_id": "col_ks", "sort": True,
 					"weight": round(0.2 * mfl.WEIGHT),
-					"formatter": lambda i: len(i.killstreak_peaks) if i is not None else "?",
-					"sortkey": lambda i: len(i.killstreak_peaks) if i is not None else -1},
+					"formatter": lambda i: i.get_killstreak_count() if i is not None else "?",
+					"sortkey": lambda i: i.get_killstreak_count() if i is not None else -1},
 				{"name": "Bookmarks", "col_id": "col_bm", "sort": True,
 					"weight": round(0.2 * mfl.WEIGHT),
-					"formatter": lambda i: len(i.bookmarks) if i is not None else "?",
-					"sortkey": lambda i: len(i.bookmarks) if i is not None else -1,
+					"formatter": lambda i: i.get_bookmark_count() if i is not None else "?",
+					"sortkey": lambda i: i.get_bookmark_count() if i is not None else -1,
 					"dblclick_cmd": lambda _: self._managebookmarks()},
 				{"name": "Creation time", "col_id": "col_ctime", "sort": True,
 					"weight": round(0.9 * mfl.WEIGHT),
@@ -231,9 +285,34 @@ class MainApp():
 			resizable = True,
 			reorderable = True,
 		)
+		# Only displayed in aggregate mode, see `_show_columns`.
+		self.listbox.add_columns(
+			{"name": "Directory", "col_id": "col_directory", "sort": True,
+				"weight": round(1.2 * mfl.WEIGHT)},
+		)
+		# Only displayed if enabled in the settings. All of them hold the demo's header.
+		self.listbox.add_columns(
+			{"name": "Map", "col_id": "col_map", "sort": True,
+				"weight": round(0.6 * mfl.WEIGHT),
+				"formatter": lambda h: h["map_name"] if h else "?",
+				"sortkey": lambda h: h["map_name"] if h else ""},
+			{"name": "Player", "col_id": "col_player", "sort": True,
+				"weight": round(0.5 * mfl.WEIGHT),
+				"formatter": lambda h: h["clientid"] if h else "?",
+				"sortkey": lambda h: h["clientid"] if h else ""},
+			{"name": "Playtime", "col_id": "col_playtime", "sort": True,
+				"weight": round(0.3 * mfl.WEIGHT),
+				"formatter": lambda h: format_duration(h["playtime"]) if h else "?",
+				"sortkey": lambda h: h["playtime"] if h else -1},
+			{"name": "Ticks", "col_id": "col_ticks", "sort": True,
+				"weight": round(0.3 * mfl.WEIGHT),
+				"formatter": lambda h: h["tick_num"] if h else "?",
+				"sortkey": lambda h: h["tick_num"] if h else -1},
+		)
+		self._show_columns(CNST.HEADER_COLUMN_IDS, self.cfg.header_columns)
 
 		self.pathsel_spinbox = ttk.Combobox(widgetframe0, state = "readonly")
-		self.pathsel_spinbox.config(values = tuple(self.cfg.demo_paths))
+		self.pathsel_spinbox.config(values = self._get_path_selection_values())
 		self.pathsel_spinbox.config(textvariable = self.spinboxvar)
 
 		rempathbtn = ttk.Button(widgetframe0, text = "Remove demo path", command = self._rempath)
@@ -341,13 +420,20 @@ class MainApp():
 		# I did that instead lul
 
 	def quit_app(self, save_cfg: bool = True) -> None:
+		self.root.after_cancel(self.after_handle_viewport)
 		for g in self.threadgroups.values():
 			g.cancel_after() # Calling first to cancel running after callbacks asap
+		self.catalog_threadgroup.cancel_after()
+		self.preview_threadgroup.cancel_after()
 		for g in self.threadgroups.values():
 			g.join_thread(finalize = False)
+		self.catalog_threadgroup.join_thread(finalize = False)
+		self.preview_threadgroup.join_thread(finalize = False)
+		shutdown_process_pool()
 		if save_cfg:
 			if self.curdir in self.cfg.demo_paths:
 				self.cfg.last_path = self.cfg.demo_paths.index(self.curdir)
+			self._write_snapshot()
 			self.writecfg()
 
 		purge_commands(self.root)
@@ -378,7 +464,7 @@ class MainApp():
 		Reconfigs the state of action buttons based on the current
 		selection as well as whether a valid directory is selected.
 		"""
-		disable = self.curdir is None or force_disable
+		disable = (self.curdir is None and not self.aggregate) or force_disable
 		sel_len = len(self.listbox.selection)
 		for (_, _, btn, fit_for_sel) in self.demooperations:
 			state = tk.DISABLED if disable or not fit_for_sel(sel_len) else tk.NORMAL
@@ -406,20 +492,29 @@ class MainApp():
 				"col_ctime", formatter = build_date_formatter(dialog.result.data["date_format"])
 			)
 		self.cfg.update(dialog.result.data)
+		set_worker_count(self.cfg.worker_threads)
+		set_io_limits(
+			self.cfg.io_bytes_per_sec, self.cfg.io_ops_per_sec,
+			self.cfg.io_low_priority, self.cfg.io_game_mode,
+		)
+		self._show_columns(CNST.HEADER_COLUMN_IDS, self.cfg.header_columns)
 		self.reloadgui()
+		self._refresh_catalog()
 		self._applytheme()
 
 	def _open_file_manager(self) -> None:
 		"""
-		Opens file manager in the current directory.
+		Opens file manager in the current directory, or the selected
+		demos' directory in aggregate mode.
 		"""
-		if self.curdir is None:
+		directory = self._get_selection_dir() if self.aggregate else self.curdir
+		if directory is None:
 			return
 
 		if self.cfg.file_manager_mode is CNST.FILE_MANAGER_MODE.WINDOWS_EXPLORER:
 			try:
 				open_explorer(
-					self.curdir,
+					directory,
 					[self.listbox.get_cell("col_filename", i) for i in sorted(self.listbox.selection)]
 				)
 			except OSError as e:
@@ -444,7 +539,7 @@ class MainApp():
 
 				if arg == "D":
 					# Shouldn't be possible to get here when it's None, but better be safe
-					final_args.append(self.curdir if self.curdir is not None else "")
+					final_args.append(directory)
 				elif arg == "S" or arg == "s":
 					d = self.listbox.get_column("col_filename")
 					if self.listbox.selection:
@@ -474,7 +569,7 @@ class MainApp():
 		demo_info = self.listbox.get_cell("col_ks", index)
 		dialog = Play(
 			self.root,
-			demo_dir = self.curdir,
+			demo_dir = self._get_row_dir(index),
 			info = DemoInfo(
 				self.listbox.get_cell("col_filename", index),
 				[] if demo_info is None else demo_info.killstreaks,
@@ -496,18 +591,17 @@ class MainApp():
 		"""
 		if not self.listbox.selection:
 			return
+		demodir = self._get_selection_dir()
+		if demodir is None:
+			return
 
-		file_idx_map = {
-			self.listbox.get_cell("col_filename", i): i
-			for i in self.listbox.selection
-		}
+		selection = sorted(self.listbox.selection)
+		names = self.listbox.get_column("col_filename")
+		file_idx_map = {names[i]: i for i in selection}
 		dialog = BulkOperator(
 			self.root,
-			demodir = self.curdir,
-			files = [
-				x for i, x in enumerate(self.listbox.get_column("col_filename"))
-				if i in self.listbox.selection
-			],
+			demodir = demodir,
+			files = [names[i] for i in selection],
 			cfg = self.cfg,
 			styleobj = self.ttkstyle,
 			remember = self.cfg.ui_remember["bulk_operator"],
@@ -541,22 +635,50 @@ class MainApp():
 			self.listbox.remove_rows(to_remove)
 			self._updatedemowindow(clear = True)
 
-	# def _rename(self) -> None:
-	# 	"""Opens the rename dialog"""
-	# 	if not self.listbox.selection:
-	# 		return
+	def _rename(self) -> None:
+		"""
+		Opens a rename dialog on the selected demos and applies its
+		return values.
+		"""
+		if not self.listbox.selection:
+			return
+		demodir = self._get_selection_dir()
+		if demodir is None:
+			return
+
+		selection = sorted(self.listbox.selection)
+		names = self.listbox.get_column("col_filename")
+		mtimes = self.listbox.get_column("col_ctime")
+		headers = self.listbox.get_column("col_map")
+		dialog = Rename(
+			self.root,
+			demodir = demodir,
+			files = [names[i] for i in selection],
+			mtimes = [mtimes[i] for i in selection],
+			headers = [headers[i] for i in selection],
+			cfg = self.cfg,
+			styleobj = self.ttkstyle,
+			remember = self.cfg.ui_remember["rename"],
+		)
+		dialog.show()
+		if dialog.result.state == DIAGSIG.GLITCHED:
+			return
+
+		self.cfg.ui_remember["rename"] = dialog.result.remember
 
-	# 	index = next(iter(self.listbox.selection))
-	# 	target = self.listbox.get_cell("col_filename", index)
-	# 	dialog = Rename(self.root, self.cfg, self.curdir, target)
-	# 	dialog.show()
-	# 	if dialog.result.state != DIAGSIG.SUCCESS:
-	# 		return
+		if dialog.result.state != DIAGSIG.SUCCESS:
+			return
 
-	# 	if not self.cfg.lazy_reload:
-	# 		self.reloadgui()
-	# 	else:
-	# 		self.listbox.set_cell("col_filename", index, dialog.result.data)
+		if not self.cfg.lazy_reload:
+			self.reloadgui()
+			return
+
+		renamed = dialog.result.data["renamed"]
+		for index in selection:
+			new_name = renamed.get(names[index])
+			if new_name is not None:
+				self.listbox.set_cell("col_filename", index, new_name)
+		self._updatedemowindow(no_io = True)
 
 	def _managebookmarks(self) -> None:
 		"""Offers dialog to manage a demo's bookmarks."""
@@ -565,7 +687,7 @@ class MainApp():
 
 		index = next(iter(self.listbox.selection))
 		demo_name = self.listbox.get_cell("col_filename", index)
-		path = os.path.join(self.curdir, demo_name)
+		path = os.path.join(self._get_row_dir(index), demo_name)
 		info = self.listbox.get_cell("col_bm", index)
 		dialog = BookmarkSetter(
 			self.root,
@@ -590,16 +712,17 @@ class MainApp():
 			return
 
 		if container_state:
-			# FIXME The DemoInfo object is stored both in col_bm and col_ks, so the change is
-			# visible in both. See multiframe_list issue #7
+			# The DemoInfo object is stored both in col_bm and col_ks and may be shared
+			# with the demo info cache, so replace it instead of modifying it.
+			# See multiframe_list issue #7
 			info = self.listbox.get_cell("col_bm", index)
-			if info is None:
-				info = DemoInfo(demo_name, [], dialog.result.data["bookmarks"])
-				# This is nasty, info needs to be inserted here
-				self.listbox.set_cell("col_ks", index, info)
-				self.listbox.set_cell("col_bm", index, info)
-			else:
-				info.bookmarks = dialog.result.data["bookmarks"]
+			info = DemoInfo(
+				demo_name,
+				[] if info is None else info.killstreaks,
+				dialog.result.data["bookmarks"],
+			)
+			self.listbox.set_cell("col_ks", index, info)
+			self.listbox.set_cell("col_bm", index, info)
 		else:
 			# Container doesn't exist anymore; the info is now None.
 			self.listbox.set_cell("col_ks", index, None)
@@ -607,6 +730,52 @@ class MainApp():
 		self.listbox.format(("col_bm", "col_ks"), (index, ))
 		self._updatedemowindow(no_io = True)
 
+	def _bulk_bookmarks(self) -> None:
+		"""
+		Opens a bulk bookmarker dialog on the selected demos and applies
+		its return values.
+		"""
+		if not self.listbox.selection:
+			return
+		demodir = self._get_selection_dir()
+		if demodir is None:
+			return
+
+		selection = sorted(self.listbox.selection)
+		names = self.listbox.get_column("col_filename")
+		file_idx_map = {names[i]: i for i in selection}
+		dialog = BulkBookmarker(
+			self.root,
+			demodir = demodir,
+			files = [names[i] for i in selection],
+			cfg = self.cfg,
+			styleobj = self.ttkstyle,
+		)
+		dialog.show()
+		if dialog.result.state != DIAGSIG.SUCCESS:
+			return
+
+		if not self.cfg.lazy_reload:
+			self.reloadgui()
+			return
+
+		if self.cfg.data_grab_mode == CNST.DATA_GRAB_MODE.NONE.value:
+			return
+
+		new_info = dialog.result.data["demo_info"].get(
+			CNST.DATA_GRAB_MODE(self.cfg.data_grab_mode), {}
+		)
+		indices = []
+		for name, info in new_info.items():
+			# Replace the shared DemoInfo object, see `_managebookmarks`.
+			index = file_idx_map[name]
+			self.listbox.set_cell("col_ks", index, info)
+			self.listbox.set_cell("col_bm", index, info)
+			indices.append(index)
+		if indices:
+			self.listbox.format(("col_bm", "col_ks"), indices)
+			self._updatedemowindow(no_io = True)
+
 	def _applytheme(self) -> None:
 		"""
 		Looks at self.cfg, attempts to apply an interface theme using a
@@ -646,10 +815,12 @@ class MainApp():
 		Renews contents of demo information windows.
 		When `clear` is set to `True`, just clears the associated
 		widgets and returns.
-		If `no_io` is set to `True`, will not start a DemoMeta thread.
+		If `no_io` is set to `True`, will not request the demo's header
+		from the preview thread.
 		"""
 		index = self.listbox.get_active_cell()[1]
 		if clear or not no_io:
+			self._preview_path = None
 			self.demo_header_kvd.clear()
 		self.demoeventmfl.clear()
 		if clear or index is None:
@@ -661,61 +832,96 @@ class MainApp():
 				(info.killstreak_peaks, "Killstreak"),
 				(info.bookmarks, "Bookmark"),
 			):
-				for event in events:
+				for value, tick, _ in events.iter_tuples():
 					self.demoeventmfl.insert_row({
 						"col_type": name,
-						"col_tick": event.tick,
-						"col_value": str(event.value),
+						"col_tick": tick,
+						"col_value": str(value),
 					})
 
 		if not self.cfg.preview_demos or no_io:
 			return
 
-		demname = self.listbox.get_cell("col_filename", index)
-		# In case of a super slow drive, this will hang in order to
-		# prevent multiple referenceless threads going wild in the demo directory
-		self.threadgroups["demometa"].join_thread()
-		self.threadgroups["demometa"].start_thread(
-			target_demo_path = os.path.join(self.curdir, demname)
-		)
+		length = self.listbox.get_length()
+		self._preview_path = self._get_row_path(index)
+		neighbours = [
+			self._get_row_path(i)
+			for i in (index + 1, index - 1, index + 2, index - 2)
+			if 0 <= i < length
+		]
+		if not self.preview_threadgroup.thread.is_alive():
+			self._preview_queue = queue.Queue()
+			self.preview_threadgroup.start_thread(queue_inp = self._preview_queue)
+		self._preview_queue.put((self._preview_path, neighbours))
+
+	def _get_row_path(self, index: int) -> str:
+		"""
+		Returns the full path of the demo in the listbox row `index`.
+		"""
+		return os.path.join(self._get_row_dir(index), self.listbox.get_cell("col_filename", index))
 
-	def _after_callback_demoinfo(self, sig: THREADSIG, *args) -> None:
+	def _after_callback_preview(self, sig: THREADSIG, *args) -> None:
 		"""
-		Loop worker for the demo_info thread.
-		Updates demo info window with I/O-obtained information.
+		Loop worker for the preview thread.
+		Updates demo info window with I/O-obtained information, if it
+		still belongs to the previewed demo.
 		(Incomplete, requires `self`-dependent decoration in __init__())
 		"""
-		if sig.value < 0x100: # Finish
+		if sig.is_finish_signal():
 			return THREADGROUPSIG.FINISHED
 		elif sig is THREADSIG.RESULT_HEADER:
-			if args[0] is None:
+			path, header = args
+			if path != self._preview_path:
+				return THREADGROUPSIG.CONTINUE
+			if header is None:
 				for v in CNST.HEADER_HUMAN_NAMES.values():
 					self.demo_header_kvd.set_value(v, "?")
 			else:
-				for k, v in args[0].items():
+				for k, v in header.items():
 					if k in CNST.HEADER_HUMAN_NAMES:
 						self.demo_header_kvd.set_value(CNST.HEADER_HUMAN_NAMES[k], str(v))
 			return THREADGROUPSIG.CONTINUE
-		elif sig is THREADSIG.RESULT_FS_INFO:
-			return THREADGROUPSIG.CONTINUE
 
-	def reloadgui(self) -> None:
+	def reloadgui(self, warm: bool = False) -> None:
 		"""
 		Re-fetches the current directory's contents, cancelling all
 		running threads, clearing all information displays and then
-		starting the fetchdata thread.
+		starting the fetchdata thread, or the fetchlibrary thread in
+		aggregate mode.
 		If the current directory is `None`, will display a message on
 		the status bar instead of starting the fetchdata thread.
+		If `warm` is `True` and a snapshot of the current directory
+		exists, it is displayed right away and only patched with what
+		changed once the directory has been read.
 		"""
 		for g in self.threadgroups.values():
 			g.cancel_after()
+		self.root.after_cancel(self.after_handle_viewport)
 		self.listbox.clear()
 		self.directory_inf_kvd.clear()
 		self._config_action_buttons(force_disable = True)
 		self._updatedemowindow(clear = True)
 		for g in self.threadgroups.values():
 			g.join_thread(finalize = False)
-		if self.curdir is None:
+		self._aggregate_data = None
+		self._showing_directory = False
+		self._patch_fetched_data = False
+		if warm and self.curdir is not None and not self.aggregate:
+			data = read_snapshot(
+				platforming.get_snapshot_storage_path(), self.curdir, self.cfg.data_grab_mode
+			)
+			if data is not None:
+				self.directory_inf_kvd.set_value("l_amount", len(data))
+				self.directory_inf_kvd.set_value("l_totalsize", data.get_total_size())
+				self._display_demo_data(data)
+				self._config_action_buttons()
+				self._showing_directory = True
+				self._patch_fetched_data = True
+		if self.aggregate:
+			self.threadgroups["fetchlibrary"].start_thread(
+				paths = list(self.cfg.demo_paths), cfg = self.cfg
+			)
+		elif self.curdir is None:
 			self.setstatusbar(
 				"No directories registered. Click \"Add demo path...\" to get started!"
 			)
@@ -734,16 +940,167 @@ class MainApp():
 		elif sig is THREADSIG.INFO_STATUSBAR:
 			self.setstatusbar(*args)
 		elif sig is THREADSIG.RESULT_DEMODATA:
-			data = args[0]
+			data, pending_info = args
 			if data is not None:
-				self.directory_inf_kvd.set_value("l_amount", len(data["col_filename"]))
-				self._display_demo_data(data)
+				self.directory_inf_kvd.set_value("l_amount", len(data))
+				if self._patch_fetched_data:
+					self._patch_demo_data(data, pending_info)
+				else:
+					self._display_demo_data(data)
+				self._showing_directory = True
 				self._config_action_buttons()
+				header_names = (
+					self.listbox.get_column("col_filename") if self.cfg.header_columns else []
+				)
+				if pending_info or header_names:
+					self._start_info_loading(pending_info, header_names)
+		return THREADGROUPSIG.CONTINUE
+
+	def _after_callback_fetchlibrary(self, sig: THREADSIG, *args) -> None:
+		"""
+		Loop worker for the fetchlibrary thread. Adds the demos of each
+		directory to the listbox as they come in.
+		(Incomplete, requires `self`-dependent decoration in __init__())
+		"""
+		if sig.is_finish_signal():
+			return THREADGROUPSIG.FINISHED
+		elif sig is THREADSIG.INFO_STATUSBAR:
+			self.setstatusbar(*args)
+		elif sig is THREADSIG.RESULT_DEMODATA:
+			self._extend_aggregate_data(args[0])
+			self.directory_inf_kvd.set_value("l_amount", self.listbox.get_length())
+			self._config_action_buttons()
 		return THREADGROUPSIG.CONTINUE
 
 	def _finalization_fetchdata(self, *_) -> None:
 		self.directory_inf_kvd.set_value(
-			"l_totalsize", sum(self.listbox.get_column("col_filesize"))
+			"l_totalsize",
+			sum(s for s in self.listbox.get_column("col_filesize") if s is not None),
+		)
+		if self.cfg.watch_directory and self._showing_directory:
+			self.threadgroups["watch"].start_thread(targetdir = self.curdir, cfg = self.cfg)
+
+	def _start_info_loading(self, names: t.List[str], header_names: t.List[str]) -> None:
+		"""
+		Starts loading the demo info of the demos in `names` and the
+		headers of the demos in `header_names` of the current directory
+		in the background, keeping the loader informed about the
+		listbox's viewport.
+		"""
+		self._viewport_queue = queue.Queue()
+		self._last_viewport = None
+		self.threadgroups["loadinfo"].start_thread(
+			queue_inp = self._viewport_queue,
+			targetdir = self.curdir,
+			names = names,
+			cfg = self.cfg,
+			header_names = header_names,
+		)
+		self._poll_viewport()
+
+	def _poll_viewport(self) -> None:
+		"""
+		Sends the names of the demos in and near the listbox's viewport to
+		the loadinfo thread whenever it changed, then reschedules itself
+		for as long as that thread runs.
+		"""
+		length = self.listbox.get_length()
+		first, last = self.listbox.frames[0][1].yview()
+		start = int(first * length)
+		stop = min(length, math.ceil(last * length))
+		viewport = (start, stop, length)
+		if viewport != self._last_viewport:
+			self._last_viewport = viewport
+			names = self.listbox.get_column("col_filename")
+			span = max(stop - start, 1)
+			self._viewport_queue.put((
+				names[start:stop],
+				names[max(0, start - 2 * span):start] + names[stop:stop + 2 * span],
+			))
+		if self.threadgroups["loadinfo"].thread.is_alive():
+			self.after_handle_viewport = self.root.after(
+				CNST.VIEWPORT_POLL_INTERVAL, self._poll_viewport
+			)
+
+	def _after_callback_loadinfo(self, sig: THREADSIG, *args) -> None:
+		"""
+		Loop worker for the loadinfo thread. Fills in the demo info and
+		headers of the loaded demos.
+		(Incomplete, requires `self`-dependent decoration in __init__())
+		"""
+		if sig.is_finish_signal():
+			self.root.after_cancel(self.after_handle_viewport)
+			return THREADGROUPSIG.FINISHED
+		elif sig is THREADSIG.RESULT_DEMO_INFO:
+			active = self.listbox.get_active_cell()[1]
+			cells = []
+			for name, info in args[0].items():
+				index = self._find_row(name)
+				if index is not None:
+					cells.append((index, info))
+			self.listbox.set_cells(("col_ks", "col_bm"), cells, reset_sortstate = False)
+			if any(index == active for index, _ in cells):
+				self._updatedemowindow(no_io = True)
+		elif sig is THREADSIG.RESULT_DEMO_HEADERS:
+			cells = []
+			for name, header in args[0].items():
+				index = self._find_row(name)
+				if index is not None:
+					cells.append((index, header))
+			self.listbox.set_cells(CNST.HEADER_COLUMN_IDS, cells, reset_sortstate = False)
+		return THREADGROUPSIG.CONTINUE
+
+	def _find_row(self, name: str) -> t.Optional[int]:
+		"""
+		Returns the listbox row of the demo `name`, or `None` if it is not
+		displayed. Rows are remembered and only searched again once the
+		listbox changed.
+		"""
+		names = self.listbox.get_column("col_filename")
+		index = self._row_cache.get(name)
+		if index is not None and index < len(names) and names[index] == name:
+			return index
+		self._row_cache = {n: i for i, n in enumerate(names)}
+		return self._row_cache.get(name)
+
+	def _after_callback_watch(self, sig: THREADSIG, *args) -> None:
+		"""
+		Loop worker for the directory watcher thread. Applies changes to
+		single demos to the listbox as they are reported.
+		(Incomplete, requires `self`-dependent decoration in __init__())
+		"""
+		if sig.is_finish_signal():
+			return THREADGROUPSIG.FINISHED
+		elif sig is THREADSIG.INFO_STATUSBAR:
+			self.setstatusbar(*args)
+		elif sig is THREADSIG.RESULT_DEMO_UPDATE:
+			# A filtered view would need the filter to be applied to the demo.
+			# Changes will show up when it's cleared.
+			if self._showing_directory:
+				self._apply_demo_update(*args)
+		return THREADGROUPSIG.CONTINUE
+
+	def _apply_demo_update(self, name: str, row: t.Optional[t.Dict]) -> None:
+		"""
+		Adds, updates or removes (if `row` is `None`) the listbox row of
+		the demo `name`. `row` is a single row of demo data as delivered
+		by the ReadFolder thread.
+		"""
+		index = self._find_row(name)
+		if row is None:
+			if index is None:
+				return
+			was_active = self.listbox.get_active_cell()[1] == index
+			self.listbox.remove_rows([index])
+			if was_active:
+				self._updatedemowindow(clear = True)
+		else:
+			self._put_demo_row(index, row)
+
+		self.directory_inf_kvd.set_value("l_amount", self.listbox.get_length())
+		self.directory_inf_kvd.set_value(
+			"l_totalsize",
+			sum(s for s in self.listbox.get_column("col_filesize") if s is not None),
 		)
 
 	def _filter_select(self) -> None:
@@ -752,12 +1109,17 @@ class MainApp():
 		"""
 		if self.filterentry_var.get() == "":
 			return
+		if self.curdir is None and not self.aggregate:
+			return
 		self.filter_select_btn.config(text = "Select by filter", state = tk.DISABLED)
+		self._filter_select_hits = set()
 		self.threadgroups["filter_select"].start_thread(
 			filterstring = self.filterentry_var.get(),
 			curdir = self.curdir,
 			silent = True,
 			cfg = self.cfg,
+			paths = list(self.cfg.demo_paths) if self.aggregate else None,
+			headers = self._get_known_headers(),
 		)
 
 	def _after_callback_filter_select(self, sig: THREADSIG, *args) -> None:
@@ -774,6 +1136,11 @@ class MainApp():
 			self.setstatusbar(*args[0])
 			return THREADGROUPSIG.CONTINUE
 		elif sig is THREADSIG.RESULT_DEMODATA:
+			data = args[0]
+			self._filter_select_hits.update(zip(
+				itertools.repeat(self.curdir) if data.directories is None else data.directories,
+				data.names,
+			))
 			return THREADGROUPSIG.HOLDBACK
 
 	def _finalization_filter_select(self, sig: THREADSIG, *args) -> None:
@@ -782,24 +1149,29 @@ class MainApp():
 		if sig is not THREADSIG.RESULT_DEMODATA: # weird
 			return
 
-		filtered_files = set(args[0]["col_filename"])
+		hits = self._filter_select_hits
 		col_data = self.listbox.get_column("col_filename")
-		new_selection = [i for i, name in enumerate(col_data) if name in filtered_files]
+		new_selection = [
+			i for i, name in enumerate(col_data) if (self._get_row_dir(i), name) in hits
+		]
 
 		self.listbox.set_selection(new_selection)
 
 	def _filter(self, *_) -> None:
 		"""Starts a filtering thread and configures the filtering button."""
-		if not self.filterentry_var.get() or self.curdir is None:
+		if not self.filterentry_var.get() or (self.curdir is None and not self.aggregate):
 			return
 		self.filterbtn.config(text = "Stop Filtering", command = self._stopfilter)
 		self.filterentry.unbind("<Return>")
 		self.resetfilterbtn.config(state = tk.DISABLED)
+		self._aggregate_data = None
 		self.threadgroups["filter"].start_thread(
 			filterstring = self.filterentry_var.get(),
 			curdir = self.curdir,
 			silent = False,
 			cfg = self.cfg,
+			paths = list(self.cfg.demo_paths) if self.aggregate else None,
+			headers = self._get_known_headers(),
 		)
 
 	def _stopfilter(self) -> None:
@@ -829,20 +1201,257 @@ class MainApp():
 			self.setstatusbar(*args[0])
 			return THREADGROUPSIG.CONTINUE
 		elif sig is THREADSIG.RESULT_DEMODATA:
-			self._display_demo_data(args[0])
+			if self.aggregate:
+				self._extend_aggregate_data(args[0])
+			else:
+				self._display_demo_data(args[0])
+			self._showing_directory = False
 			return THREADGROUPSIG.CONTINUE
 
-	def _display_demo_data(self, data: t.Dict) -> None:
+	def _display_demo_data(self, data: DemoTable) -> None:
 		"""
 		Sets the main listbox to display demo data as delivered by the
-		ReadFolder and Filter thread. Mutates `data` before feeding it
-		to the listbox.
+		ReadFolder and Filter thread.
 		"""
-		di = data.pop("col_demo_info")
-		data["col_bm"] = data["col_ks"] = di
-		self.listbox.set_data(data)
+		# The listbox modifies column data in place, so no two columns may share a
+		# list, and neither may they share one with `data`.
+		columns = {
+			"col_filename": data.names.copy(),
+			"col_ks": data.demo_info.copy(),
+			"col_bm": data.demo_info.copy(),
+			"col_ctime": data.get_mtimes(),
+			"col_filesize": data.get_sizes(),
+		}
+		for col_id in CNST.HEADER_COLUMN_IDS:
+			columns[col_id] = data.get_headers()
+		if data.directories is not None:
+			columns["col_directory"] = data.directories.copy()
+		self.listbox.set_data(columns)
 		self.listbox.format()
 
+	def _patch_demo_data(self, data: DemoTable, pending_info: t.List[str]) -> None:
+		"""
+		Brings the listbox up to date with demo data as delivered by the
+		ReadFolder thread, only touching rows that changed. The order
+		of remaining rows is kept. Rows of demos in `pending_info`, whose
+		info is still being loaded, keep the info they display until
+		ThreadLoadDemoInfo delivers it.
+		"""
+		old_columns = {
+			col_id: self.listbox.get_column(col_id) for col_id in self.listbox.get_columns()
+		}
+		kept = [
+			i for i, name in enumerate(old_columns["col_filename"]) if data.index(name) is not None
+		]
+		row_map = {old: new for new, old in enumerate(kept)}
+		columns = {col_id: [col[i] for i in kept] for col_id, col in old_columns.items()}
+		new_idx = {name: i for i, name in enumerate(columns["col_filename"])}
+		active = row_map.get(self.listbox.get_active_cell()[1])
+		pending_info = set(pending_info)
+		update_active = False
+		for i, name in enumerate(data.names):
+			row = data.get_row(i)
+			index = new_idx.get(name)
+			if index is None:
+				new_row = self._make_demo_row(row)
+				for col_id, col in columns.items():
+					col.append(new_row.get(col_id, mfl.BLANK))
+				continue
+			changes = self._get_demo_row_changes(
+				lambda col_id: columns[col_id][index], row, name in pending_info
+			)
+			for col_id, value in changes:
+				columns[col_id][index] = value
+			update_active |= bool(changes) and index == active
+
+		self.listbox.replace_data(columns, row_map.get, reset_sortstate = False)
+		if update_active:
+			self._updatedemowindow(no_io = True)
+
+	def _make_demo_row(self, row: t.Dict) -> t.Dict:
+		"""
+		Returns the listbox row for `row`, a single row of demo data as
+		delivered by the ReadFolder thread.
+		"""
+		info = row["col_demo_info"]
+		new_row = {
+			"col_filename": row["col_filename"], "col_ks": info, "col_bm": info,
+			"col_ctime": row["col_ctime"], "col_filesize": row["col_filesize"],
+		}
+		for col_id in CNST.HEADER_COLUMN_IDS:
+			new_row[col_id] = None
+		return new_row
+
+	def _get_demo_row_changes(
+		self, get_cell: t.Callable[[str], t.Any], row: t.Dict, keep_info: bool = False
+	) -> t.List[t.Tuple[str, t.Any]]:
+		"""
+		Returns a list of (column id, value) pairs for the cells of a
+		listbox row that change when updating it with `row`, a single row
+		of demo data as delivered by the ReadFolder thread. `get_cell`
+		returns the current value of the row's cell in a column.
+		If `keep_info` is true, the row keeps its demo info.
+		"""
+		info = get_cell("col_ks") if keep_info else row["col_demo_info"]
+		file_changed = (
+			get_cell("col_ctime") != row["col_ctime"] or
+			get_cell("col_filesize") != row["col_filesize"]
+		)
+		if not file_changed and is_same_info(get_cell("col_ks"), info):
+			return []
+		changes = [("col_ks", info), ("col_bm", info)]
+		if file_changed:
+			changes += [("col_ctime", row["col_ctime"]), ("col_filesize", row["col_filesize"])]
+			# The header may have changed with the file.
+			changes += [(col_id, None) for col_id in CNST.HEADER_COLUMN_IDS]
+		return changes
+
+	def _put_demo_row(self, index: t.Optional[int], row: t.Dict) -> None:
+		"""
+		Appends `row`, a single row of demo data as delivered by the
+		ReadFolder thread, to the listbox if `index` is `None`, or
+		updates the listbox row at `index` with it if anything changed.
+		"""
+		if index is None:
+			self.listbox.insert_row(self._make_demo_row(row), reset_sortstate = False)
+			return
+
+		changes = self._get_demo_row_changes(
+			lambda col_id: self.listbox.get_cell(col_id, index), row
+		)
+		for col_id, value in changes:
+			self.listbox.set_cell(col_id, index, value, reset_sortstate = False)
+		if changes and self.listbox.get_active_cell()[1] == index:
+			self._updatedemowindow(no_io = True)
+
+	def _write_snapshot(self) -> None:
+		"""
+		Writes a snapshot of the displayed demos for a warm start, if
+		they are the unfiltered contents of the current directory.
+		"""
+		if self.curdir is None or self.aggregate or not self._showing_directory:
+			return
+		try:
+			write_snapshot(
+				platforming.get_snapshot_storage_path(),
+				self.curdir,
+				self.cfg.data_grab_mode,
+				DemoTable(
+					self.listbox.get_column("col_filename"),
+					self.listbox.get_column("col_ks"),
+					self.listbox.get_column("col_ctime"),
+					self.listbox.get_column("col_filesize"),
+				),
+			)
+		except OSError:
+			pass
+
+	def _extend_aggregate_data(self, data: DemoTable) -> None:
+		"""
+		Adds the demo data of another directory to the aggregate view,
+		replacing what was displayed before if it is the first one.
+		"""
+		if self._aggregate_data is None:
+			self._aggregate_data = DemoTable()
+		self._aggregate_data.extend(data)
+		self._display_demo_data(self._aggregate_data)
+
+	def _get_known_headers(self) -> t.Optional[t.Dict[str, t.Dict]]:
+		"""
+		Returns the headers of the displayed demos of the current
+		directory that are known, mapped by demo name. Returns `None`
+		in aggregate mode.
+		"""
+		if self.aggregate:
+			return None
+		return {
+			name: header
+			for name, header in zip(
+				self.listbox.get_column("col_filename"), self.listbox.get_column("col_map")
+			)
+			if header
+		}
+
+	def _get_row_dir(self, index: int) -> t.Optional[str]:
+		"""
+		Returns the directory of the demo in the listbox row `index`.
+		"""
+		if self.aggregate:
+			return self.listbox.get_cell("col_directory", index)
+		return self.curdir
+
+	def _get_selection_dir(self) -> t.Optional[str]:
+		"""
+		Returns the directory all selected demos are in. If there is no
+		selection in aggregate mode or the selected demos are spread over
+		several directories, notifies the user and returns `None`.
+		"""
+		if not self.aggregate:
+			return self.curdir
+		dirs = {self._get_row_dir(i) for i in self.listbox.selection}
+		if len(dirs) != 1:
+			tk_msg.showinfo(
+				"Demomgr",
+				"Please select demos from a single directory for this operation.",
+				parent = self.root,
+			)
+			return None
+		return next(iter(dirs))
+
+	def _get_path_selection_values(self) -> t.Tuple[str, ...]:
+		values = tuple(self.cfg.demo_paths)
+		if len(values) > 1:
+			values += (CNST.ALL_DEMO_PATHS, )
+		return values
+
+	def _show_columns(self, col_ids: t.Sequence[str], show: bool) -> None:
+		"""
+		Shows the given columns in additional frames of the listbox or
+		hides them and removes their frames again.
+		"""
+		for col_id in col_ids:
+			frame = self.listbox.columns[col_id].assignedframe
+			if show == (frame is not None):
+				continue
+			if show:
+				self.listbox.add_frames(1)
+				self.listbox.assign_column(col_id, len(self.listbox.frames) - 1)
+				self.listbox.format((col_id, ))
+				continue
+			# The column may have been moved around; free the last frame before removing it.
+			last = len(self.listbox.frames) - 1
+			self.listbox.assign_column(col_id, None)
+			if frame != last:
+				for other_id, col in self.listbox.columns.items():
+					if col.assignedframe == last:
+						self.listbox.assign_column(other_id, None)
+						self.listbox.assign_column(other_id, frame)
+						break
+			self.listbox.remove_frames(1)
+
+	def _refresh_catalog(self) -> None:
+		"""
+		Starts bringing the library catalog up to date for all registered
+		directories except the current one, which is read anyways.
+		"""
+		self.catalog_threadgroup.join_thread(finalize = False)
+		# The aggregate view reads all directories anyways.
+		if not self.cfg.library_catalog or self.aggregate:
+			return
+		paths = [p for p in self.cfg.demo_paths if p != self.curdir]
+		if paths:
+			self.catalog_threadgroup.start_thread(paths = paths, cfg = self.cfg)
+
+	def _after_callback_catalog(self, sig: THREADSIG, *args) -> None:
+		"""
+		Loop worker for the catalog refresh thread. It has nothing to
+		display, so this only waits for it to finish.
+		(Incomplete, requires `self`-dependent decoration in __init__())
+		"""
+		if sig.is_finish_signal():
+			return THREADGROUPSIG.FINISHED
+		return THREADGROUPSIG.CONTINUE
+
 	def _spinboxsel(self, *_) -> None:
 		"""
 		Observer callback to self.spinboxvar; is called whenever
@@ -851,8 +1460,13 @@ class MainApp():
 		Kicks off the process of reading the current directory.
 		"""
 		selpath = self.spinboxvar.get() or None
-		if selpath != self.curdir:
+		aggregate = selpath == CNST.ALL_DEMO_PATHS
+		if aggregate:
+			selpath = None
+		if selpath != self.curdir or aggregate != self.aggregate:
 			self.curdir = selpath
+			self.aggregate = aggregate
+			self._show_columns(("col_directory", ), aggregate)
 			self.reloadgui()
 
 	def setstatusbar(self, data: str, timeout: t.Optional[int] = None) -> None:
@@ -880,8 +1494,9 @@ class MainApp():
 		if dirpath in self.cfg.demo_paths:
 			return
 		self.cfg.demo_paths.append(dirpath)
-		self.pathsel_spinbox.config(values = tuple(self.cfg.demo_paths))
+		self.pathsel_spinbox.config(values = self._get_path_selection_values())
 		self.spinboxvar.set(dirpath)
+		self._refresh_catalog()
 
 	def _rempath(self) -> None:
 		"""
@@ -891,13 +1506,23 @@ class MainApp():
 		"""
 		if not self.cfg.demo_paths:
 			return
+		if self.aggregate:
+			tk_msg.showinfo(
+				"Demomgr", "Please select the demo path to remove first.", parent = self.root
+			)
+			return
 		popindex = self.cfg.demo_paths.index(self.curdir)
-		self.cfg.demo_paths.pop(popindex)
+		removed_path = self.cfg.demo_paths.pop(popindex)
+		if self.cfg.library_catalog and get_catalog() is not None:
+			try:
+				get_catalog().remove_directory(removed_path)
+			except OSError:
+				pass
 		if len(self.cfg.demo_paths) > 0:
 			self.spinboxvar.set(self.cfg.demo_paths[(popindex - 1) % len(self.cfg.demo_paths)])
 		else:
 			self.spinboxvar.set("")
-		self.pathsel_spinbox.config(values = tuple(self.cfg.demo_paths))
+		self.pathsel_spinbox.config(values = self._get_path_selection_values())
 
 	def writecfg(self) -> None:
 		"""
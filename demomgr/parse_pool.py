@@ -0,0 +1,226 @@
+"""
+Optional multiprocessing backend for the CPU-bound parts of reading
+demo information, which is parsing `_events.txt` logchunks and decoding
+JSON files.
+Work is split into slices that are parsed in worker processes, which
+send back compact tuples instead of `DemoInfo` objects.
+"""
+
+from concurrent.futures import CancelledError, ProcessPoolExecutor, wait, FIRST_COMPLETED
+import json
+import os
+import re
+import sys
+import threading
+import typing as t
+
+from demomgr.demo_info import DemoInfo
+from demomgr.handle_events import RawLogchunk
+
+# Below these, starting up and feeding worker processes is not worth it.
+EVENTS_PARALLEL_MIN_SIZE = 1 << 20
+JSON_PARALLEL_MIN_FILES = 512
+
+# Slices per worker process, so uneven slices even out a bit.
+_SLICES_PER_WORKER = 4
+# Files written in text mode on windows separate lines with \r\n
+_SEP_RE = re.compile(rb"\n>\r?\n")
+
+# (demo_name, killstreaks, bookmarks), events as (value, tick, date) tuples
+CompactInfo = t.Tuple[str, t.List[t.Tuple], t.List[t.Tuple]]
+
+_executor: t.Optional[ProcessPoolExecutor] = None
+_executor_workers = 0
+_executor_lock = threading.Lock()
+
+
+def _shutdown(executor: ProcessPoolExecutor) -> None:
+	"""
+	Shuts `executor` down without waiting, cancelling its pending work
+	where the Python version allows it (3.9+).
+	"""
+	if sys.version_info >= (3, 9):
+		executor.shutdown(wait = False, cancel_futures = True)
+	else:
+		executor.shutdown(wait = False)
+
+def get_process_pool(workers: int) -> ProcessPoolExecutor:
+	"""
+	Returns the process-wide process pool, (re)creating it if it does
+	not exist yet or was created with a different amount of workers.
+	"""
+	global _executor, _executor_workers
+	with _executor_lock:
+		if _executor is None or _executor_workers != workers:
+			if _executor is not None:
+				_shutdown(_executor)
+			_executor = ProcessPoolExecutor(max_workers = workers)
+			_executor_workers = workers
+		return _executor
+
+def shutdown_process_pool() -> None:
+	"""
+	Shuts down the process pool if it was ever started.
+	"""
+	global _executor
+	with _executor_lock:
+		if _executor is not None:
+			_shutdown(_executor)
+			_executor = None
+
+def _to_compact(info: DemoInfo) -> CompactInfo:
+	return (
+		info.demo_name,
+		list(info.killstreaks.iter_tuples()),
+		list(info.bookmarks.iter_tuples()),
+	)
+
+def _from_compact(c: CompactInfo) -> DemoInfo:
+	return DemoInfo(*c)
+
+def _parse_events_slice(path: str, start: int, end: int) -> t.List[CompactInfo]:
+	"""
+	Worker function. Parses all logchunks between the byte offsets
+	`start` and `end` of the events file at `path`, which must lie on
+	chunk boundaries. Malformed chunks are skipped, just like the
+	regular events reader does.
+	"""
+	with open(path, "rb") as f:
+		f.seek(start)
+		raw = f.read(end - start)
+	res = []
+	for content in raw.decode("utf-8").replace("\r\n", "\n").split(">\n"):
+		if content.endswith("\n"):
+			content = content[:-1]
+		if not content or content.isspace():
+			continue
+		try:
+			info = DemoInfo.from_raw_logchunk(RawLogchunk(content, False, path))
+		except ValueError:
+			continue
+		res.append(_to_compact(info))
+	return res
+
+def _parse_json_slice(
+	directory: str, names: t.List[str]
+) -> t.List[t.Union[CompactInfo, None, Exception]]:
+	"""
+	Worker function. Reads and decodes the JSON files of all demos in
+	`names`, returning results as the JSON reader would, with demo info
+	in its compact form.
+	"""
+	res = []
+	for name in names:
+		json_path = os.path.join(directory, os.path.splitext(name)[0] + ".json")
+		try:
+			with open(json_path, "r", encoding = "utf-8") as f:
+				data = json.load(f)
+		except FileNotFoundError:
+			res.append(None)
+			continue
+		except (OSError, json.decoder.JSONDecodeError, UnicodeDecodeError) as e:
+			res.append(e)
+			continue
+
+		try:
+			res.append(_to_compact(DemoInfo.from_json(data, name)))
+		except (KeyError, ValueError, TypeError) as e:
+			res.append(e)
+	return res
+
+def _find_slice_offsets(path: str, slices: int) -> t.List[int]:
+	"""
+	Finds up to `slices + 1` ascending byte offsets into the events file
+	at `path` that all lie on a logchunk boundary, starting at 0 and
+	ending at the file size.
+	"""
+	size = os.path.getsize(path)
+	offsets = [0]
+	with open(path, "rb") as f:
+		for i in range(1, slices):
+			target = max(size * i // slices, offsets[-1])
+			f.seek(target)
+			# Chunks are small, the separator should follow quickly.
+			pos = size
+			buf = b""
+			while True:
+				block = f.read(8192)
+				if not block:
+					break
+				buf += block
+				match = _SEP_RE.search(buf)
+				if match is not None:
+					pos = target + match.start() + 1
+					break
+			if pos >= size:
+				break
+			if pos > offsets[-1]:
+				offsets.append(pos)
+	offsets.append(size)
+	return offsets
+
+def _gather(futures: t.List, cancel_token: t.Optional[threading.Event]) -> t.List:
+	"""
+	Waits for all futures, periodically checking the cancellation token.
+	Returns their results in order. Raises `CancelledError` if the token
+	was set.
+	"""
+	pending = set(futures)
+	while pending:
+		if cancel_token is not None and cancel_token.is_set():
+			for fut in pending:
+				fut.cancel()
+			raise CancelledError()
+		_, pending = wait(pending, timeout = 0.05, return_when = FIRST_COMPLETED)
+	return [f.result() for f in futures]
+
+def parse_events_file(
+	path: str,
+	workers: int,
+	cancel_token: t.Optional[threading.Event] = None,
+) -> t.Dict[str, DemoInfo]:
+	"""
+	Parses the events file at `path` in `workers` worker processes and
+	returns a dict mapping demo names to their DemoInfo.
+
+	May raise: OSError, UnicodeDecodeError, CancelledError.
+	"""
+	offsets = _find_slice_offsets(path, workers * _SLICES_PER_WORKER)
+	pool = get_process_pool(workers)
+	futures = [
+		pool.submit(_parse_events_slice, path, start, end)
+		for start, end in zip(offsets, offsets[1:])
+	]
+	res = {}
+	for slice_res in _gather(futures, cancel_token):
+		for c in slice_res:
+			res[c[0]] = _from_compact(c)
+	return res
+
+def parse_json_files(
+	directory: str,
+	names: t.List[str],
+	workers: int,
+	cancel_token: t.Optional[threading.Event] = None,
+) -> t.List[t.Union[DemoInfo, None, Exception]]:
+	"""
+	Reads the JSON files of the given demos in `workers` worker processes.
+	Returns a list of DemoInfo, None or an exception for each name, just
+	like the JSON reader.
+
+	May raise: CancelledError.
+	"""
+	slice_count = max(1, min(len(names), workers * _SLICES_PER_WORKER))
+	step = -(-len(names) // slice_count)
+	pool = get_process_pool(workers)
+	futures = [
+		pool.submit(_parse_json_slice, directory, names[i:i + step])
+		for i in range(0, len(names), step)
+	]
+	res = []
+	for slice_res in _gather(futures, cancel_token):
+		res.extend(
+			_from_compact(r) if isinstance(r, tuple) else r
+			for r in slice_res
+		)
+	return res
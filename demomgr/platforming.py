@@ -63,6 +63,35 @@ if _system == "windows":
 	kernel32.GetLastError.argtypes = []
 	kernel32.GetLastError.restype = wintypes.DWORD
 
+	class PROCESSENTRY32W(Structure):
+		_fields_ = [
+			("dwSize", wintypes.DWORD),
+			("cntUsage", wintypes.DWORD),
+			("th32ProcessID", wintypes.DWORD),
+			("th32DefaultHeapID", ctypes.c_size_t),
+			("th32ModuleID", wintypes.DWORD),
+			("cntThreads", wintypes.DWORD),
+			("th32ParentProcessID", wintypes.DWORD),
+			("pcPriClassBase", wintypes.LONG),
+			("dwFlags", wintypes.DWORD),
+			("szExeFile", wintypes.WCHAR * 260),
+		]
+
+	kernel32.CreateToolhelp32Snapshot.argtypes = [wintypes.DWORD, wintypes.DWORD]
+	kernel32.CreateToolhelp32Snapshot.restype = wintypes.HANDLE
+
+	kernel32.Process32FirstW.argtypes = [wintypes.HANDLE, POINTER(PROCESSENTRY32W)]
+	kernel32.Process32FirstW.restype = wintypes.BOOL
+
+	kernel32.Process32NextW.argtypes = [wintypes.HANDLE, POINTER(PROCESSENTRY32W)]
+	kernel32.Process32NextW.restype = wintypes.BOOL
+
+	kernel32.GetCurrentThread.argtypes = []
+	kernel32.GetCurrentThread.restype = wintypes.HANDLE
+
+	kernel32.SetThreadPriority.argtypes = [wintypes.HANDLE, ctypes.c_int]
+	kernel32.SetThreadPriority.restype = wintypes.BOOL
+
 
 	# Stolen together from all over
 	# https://stackoverflow.com/questions/29213106/
@@ -145,6 +174,18 @@ else:
 	from shlex import split as split_cmdline
 	from shlex import quote as quote_cmdline_arg
 
+libc = None
+_ioprio_set_nr = None
+if _system == "linux":
+	try:
+		libc = ctypes.CDLL(None, use_errno = True)
+	except OSError:
+		pass
+	# The standard library does not wrap ioprio_set, so call it by its number.
+	_ioprio_set_nr = {
+		"x86_64": 251, "aarch64": 30, "i386": 289, "i686": 289, "armv7l": 314,
+	}.get(platform.machine())
+
 
 # Poor decisions. Why did i not want to roam a config file?
 # Also the `.demomgr` sticks out like a sore thumb alongside all other dirs in `.config`
@@ -172,6 +213,20 @@ def get_cfg_storage_path() -> str:
 		# there but A: i don't really care about that platform and B: i have no way of testing
 		# this as a direct consequence of A.
 
+def get_catalog_storage_path() -> str:
+	"""
+	Returns the path of the library catalog, which lives next to the
+	config file.
+	"""
+	return str(Path(get_cfg_storage_path()).parent / "catalog.sqlite")
+
+def get_snapshot_storage_path() -> str:
+	"""
+	Returns the path of the main window's demo snapshot, which lives
+	next to the config file.
+	"""
+	return str(Path(get_cfg_storage_path()).parent / "snapshot.bin")
+
 def get_contextmenu_btn() -> t.Optional[str]:
 	"""
 	Returns the name of the contextmenu button, dependent on the system.
@@ -277,3 +332,68 @@ def is_same_path(a: str, b: str) -> bool:
 		return res
 	else:
 		return os.path.samefile(a, b)
+
+def is_game_running() -> bool:
+	"""
+	Returns whether a process named like one in
+	`constants.GAME_PROCESS_NAMES` is running.
+	Returns `False` if processes can't be listed on this system.
+	"""
+	if _system == "windows":
+		# TH32CS_SNAPPROCESS is 2
+		snapshot = kernel32.CreateToolhelp32Snapshot(2, 0)
+		if snapshot == INVALID_HANDLE_VALUE:
+			return False
+		try:
+			entry = PROCESSENTRY32W()
+			entry.dwSize = ctypes.sizeof(entry)
+			ok = kernel32.Process32FirstW(snapshot, ctypes.byref(entry))
+			while ok:
+				if entry.szExeFile.lower() in CNST.GAME_PROCESS_NAMES:
+					return True
+				ok = kernel32.Process32NextW(snapshot, ctypes.byref(entry))
+		finally:
+			kernel32.CloseHandle(snapshot)
+		return False
+
+	elif _system == "linux":
+		try:
+			pids = [e.name for e in os.scandir("/proc") if e.name.isdigit()]
+		except OSError:
+			return False
+		for pid in pids:
+			try:
+				with open(f"/proc/{pid}/comm", "r") as f:
+					if f.read().rstrip("\n").lower() in CNST.GAME_PROCESS_NAMES:
+						return True
+			except OSError:
+				pass # Process is gone already
+		return False
+
+	return False
+
+def set_thread_background_io(enabled: bool) -> bool:
+	"""
+	Gives the I/O of the calling thread the lowest priority if `enabled`
+	is true, otherwise restores its default priority.
+	Returns whether that worked; it is not supported everywhere.
+	"""
+	if _system == "windows":
+		# THREAD_MODE_BACKGROUND_BEGIN is 0x10000, THREAD_MODE_BACKGROUND_END 0x20000.
+		# This also lowers the thread's CPU priority.
+		mode = 0x0001_0000 if enabled else 0x0002_0000
+		return bool(kernel32.SetThreadPriority(kernel32.GetCurrentThread(), mode))
+
+	elif _system == "linux":
+		if libc is None or _ioprio_set_nr is None:
+			return False
+		# IOPRIO_WHO_PROCESS (1) with an id of 0 targets the calling thread.
+		# IOPRIO_CLASS_IDLE is 3, shifted by IOPRIO_CLASS_SHIFT (13). Class 0 restores
+		# the default, which is derived from the CPU niceness.
+		prio = 3 << 13 if enabled else 0
+		res = libc.syscall(
+			ctypes.c_long(_ioprio_set_nr), ctypes.c_int(1), ctypes.c_int(0), ctypes.c_int(prio)
+		)
+		return res == 0
+
+	return False
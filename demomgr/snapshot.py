@@ -0,0 +1,105 @@
+"""
+Snapshot of the demos last displayed in the main window. It is written
+on quit and displayed right away on the next start, while the
+directory is read again in the background.
+Snapshots consist of a small header followed by zlib-compressed
+marshal data. marshal is quick, but its format may change between
+Python versions, so the version is part of the header and snapshots
+written by other versions are ignored.
+"""
+
+import marshal
+import os
+import struct
+import sys
+import typing as t
+import zlib
+
+from demomgr.demo_info import DemoInfo, LazyDemoInfo
+from demomgr.demo_table import DemoTable
+
+_MAGIC = b"DMGRSNAP"
+_FORMAT_VERSION = 2
+# Magic, format version, Python major and minor version
+_HEADER = struct.Struct("<8sHBB")
+
+
+def _get_header() -> bytes:
+	return _HEADER.pack(_MAGIC, _FORMAT_VERSION, *sys.version_info[:2])
+
+def _encode_info(info: t.Optional[DemoInfo]) -> t.Optional[t.Tuple]:
+	"""
+	Encodes demo info as a tuple of either its source text and whether
+	it is JSON, if it was not parsed yet, or its killstreaks and
+	bookmarks.
+	"""
+	if info is None:
+		return None
+	if isinstance(info, LazyDemoInfo):
+		source = info.get_source()
+		if source is not None:
+			return source
+	return (list(info.killstreaks.iter_tuples()), list(info.bookmarks.iter_tuples()))
+
+def _decode_info(name: str, data: t.Optional[t.Tuple]) -> t.Optional[DemoInfo]:
+	if data is None:
+		return None
+	if isinstance(data[0], str):
+		return LazyDemoInfo.from_source(name, *data)
+	return DemoInfo(name, data[0], data[1])
+
+def write_snapshot(path: str, directory: str, data_grab_mode: int, data: DemoTable) -> None:
+	"""
+	Writes a snapshot of the demo data of `directory` to `path`,
+	replacing the previous one.
+
+	data_grab_mode: Data grab mode the demo info was read with.
+	data: Demo data of the directory.
+
+	May raise: OSError.
+	"""
+	payload = (
+		directory,
+		int(data_grab_mode),
+		list(data.names),
+		data.get_mtimes(),
+		data.get_sizes(),
+		[_encode_info(info) for info in data.demo_info],
+	)
+	blob = _get_header() + zlib.compress(marshal.dumps(payload), 1)
+	os.makedirs(os.path.dirname(path), exist_ok = True)
+	tmp_path = path + ".tmp"
+	with open(tmp_path, "wb") as f:
+		f.write(blob)
+	os.replace(tmp_path, path)
+
+def read_snapshot(path: str, directory: str, data_grab_mode: int) -> t.Optional[DemoTable]:
+	"""
+	Reads the snapshot at `path` and returns its demo data as a
+	DemoTable, if it was taken of `directory` with the given data grab
+	mode. Returns `None` otherwise or if the snapshot does not
+	exist or is unusable.
+	"""
+	try:
+		with open(path, "rb") as f:
+			blob = f.read()
+	except OSError:
+		return None
+
+	if blob[:_HEADER.size] != _get_header():
+		return None
+	try:
+		snap_dir, snap_mode, names, ctimes, sizes, infos = marshal.loads(
+			zlib.decompress(blob[_HEADER.size:])
+		)
+	except (ValueError, TypeError, EOFError, zlib.error):
+		return None
+	if snap_dir != directory or snap_mode != int(data_grab_mode):
+		return None
+
+	try:
+		infos = [_decode_info(name, info) for name, info in zip(names, infos)]
+	except (KeyError, ValueError, TypeError):
+		return None
+
+	return DemoTable(names, infos, ctimes, sizes)
@@ -6,6 +6,7 @@ to simplify threading and tkinter.
 
 from enum import IntEnum
 import queue
+import time
 
 import demomgr.constants as CNST
 from demomgr.threads._base import _StoppableBaseThread
@@ -41,6 +42,12 @@ class ThreadGroup():
 		self.run_always_method_pre = None
 		self.run_always_method_post = None
 		self._cb_method = None
+		self._decorated_cb = None
+
+		# Diagnostics, updated on each run of the callback method.
+		self.last_drain_time = 0.0
+		self.last_drain_count = 0
+		self.peak_queue_depth = 0
 
 	def register_finalize_method(self, method):
 		"""
@@ -109,34 +116,19 @@ class ThreadGroup():
 		"""
 		if self.finalization_method is None:
 			def decorated0(reschedule):
-				finished = False
-				while True:
-					try:
-						sig, *args = self.queue_out.get_nowait()
-					except queue.Empty:
-						break
-					# Should be a bound method, so the original `self` is passed in automatically
-					res = cb_method(sig, *args)
-					if res is THREADGROUPSIG.FINISHED:
-						finished = True
+				finished, exhausted = self._drain_queue(cb_method, reschedule)
 				if not finished and reschedule:
 					# decorated is made a bound class method below, which this will access.
-					self.after_handle = self.tk_wdg.after(CNST.GUI_UPDATE_WAIT, self._decorated_cb)
+					self.after_handle = self.tk_wdg.after(
+						CNST.GUI_UPDATE_WAIT if exhausted else 0, self._decorated_cb
+					)
 		else:
 			def decorated0(reschedule):
-				finished = False
-				while True:
-					try:
-						sig, *args = self.queue_out.get_nowait()
-					except queue.Empty:
-						break
-					res = cb_method(sig, *args)
-					if res is THREADGROUPSIG.FINISHED:
-						finished = True
-					elif res is THREADGROUPSIG.HOLDBACK:
-						self.heldback_queue_elem = (sig, *args)
+				finished, exhausted = self._drain_queue(cb_method, reschedule)
 				if not finished and reschedule:
-					self.after_handle = self.tk_wdg.after(CNST.GUI_UPDATE_WAIT, self._decorated_cb)
+					self.after_handle = self.tk_wdg.after(
+						CNST.GUI_UPDATE_WAIT if exhausted else 0, self._decorated_cb
+					)
 				else:
 					if self.heldback_queue_elem is None:
 						self.finalization_method(None)
@@ -168,6 +160,50 @@ class ThreadGroup():
 
 		self._decorated_cb = decorated1
 
+	def _drain_queue(self, cb_method, budgeted):
+		"""
+		Feeds elements from the output queue into `cb_method` until it
+		is empty.
+		If `budgeted` is True, stops early once `CNST.GUI_UPDATE_BUDGET`
+		msecs have passed so a thread flooding the queue can't freeze
+		the UI. A finish signal lifts the budget, as it is the last
+		thing a thread sends anyways.
+		Returns a two-element tuple of whether a finish signal was
+		processed and whether the queue was emptied.
+		"""
+		self.peak_queue_depth = max(self.peak_queue_depth, self.queue_out.qsize())
+		start = time.perf_counter()
+		deadline = start + CNST.GUI_UPDATE_BUDGET / 1000
+		finished = False
+		exhausted = False
+		count = 0
+		while True:
+			try:
+				sig, *args = self.queue_out.get_nowait()
+			except queue.Empty:
+				exhausted = True
+				break
+			# Should be a bound method, so the original `self` is passed in automatically
+			res = cb_method(sig, *args)
+			count += 1
+			if res is THREADGROUPSIG.FINISHED:
+				finished = True
+			elif res is THREADGROUPSIG.HOLDBACK:
+				self.heldback_queue_elem = (sig, *args)
+			if budgeted and not finished and time.perf_counter() >= deadline:
+				break
+
+		self.last_drain_time = time.perf_counter() - start
+		self.last_drain_count = count
+		return finished, exhausted
+
+	@property
+	def queue_depth(self):
+		"""
+		Amount of elements currently waiting in the output queue.
+		"""
+		return self.queue_out.qsize()
+
 	def start_thread(self, *args, **kwargs):
 		"""
 		Instantiate the thread with the supplied args and kwargs, except the
@@ -180,6 +216,7 @@ class ThreadGroup():
 				"suitable callback function."
 			)
 		self.heldback_queue_elem = None
+		self.peak_queue_depth = 0
 		self.thread = self.thread_cls(queue_out = self.queue_out, *args, **kwargs)
 		self.thread.start()
 		self.after_handle = self.tk_wdg.after(0, self._decorated_cb)
@@ -1,13 +1,24 @@
+from .bulk_mark import ThreadBulkMark
 from .cmd_demos import CMDDemosThread
 from .filter import ThreadFilter
+from .load_demo_info import ThreadLoadDemoInfo
 from .mark_demo import ThreadMarkDemo
+from .preview_demo import ThreadPreviewDemo
 from .rcon import RCONThread
 from .read_demo_meta import ReadDemoMetaThread
 from .read_folder import ThreadReadFolder
+from .read_library import ThreadReadLibrary
+from .refresh_catalog import ThreadRefreshCatalog
+from .rename_demos import ThreadRenameDemos
+from .watch_directory import ThreadWatchDirectory
 
+from ._pool import TASK_PRIORITY, get_worker_pool, set_worker_count
 from ._threadsig import THREADSIG
 
 __all__ = (
-	"CMDDemosThread", "ThreadFilter", "ThreadMarkDemo", "RCONThread",
-	"ReadDemoMetaThread", "ThreadReadFolder", "THREADSIG"
+	"CMDDemosThread", "ThreadBulkMark", "ThreadFilter", "ThreadLoadDemoInfo", "ThreadMarkDemo",
+	"ThreadPreviewDemo", "RCONThread", "ReadDemoMetaThread", "ThreadReadFolder", "ThreadReadLibrary",
+	"ThreadRefreshCatalog", "ThreadRenameDemos", "ThreadWatchDirectory", "TASK_PRIORITY",
+	"THREADSIG",
+	"get_worker_pool", "set_worker_count",
 )
@@ -1,4 +1,8 @@
 import threading
+import typing as t
+
+from demomgr.threads._pool import TASK_PRIORITY, Task, get_worker_pool
+from demomgr.threads._threadsig import THREADSIG
 
 class _StoppableBaseThread(threading.Thread):
 	"""
@@ -7,12 +11,36 @@ class _StoppableBaseThread(threading.Thread):
 	The stopflag can be set by calling the thread's `join()` method,
 	however regularly has to be checked for in the run method.
 	Override this thread's `run()` method, start by calling `start()`!
+
+	If the class attribute `PRIORITY` is set to a `TASK_PRIORITY`, the
+	thread's `run()` method is not executed in a dedicated OS thread but
+	on the shared worker pool in that priority lane. The stopflag then
+	serves as the task's cancellation token; a thread cancelled before
+	it was picked up by a worker will put a single `ABORTED` signal into
+	its output queue.
 	"""
+
+	PRIORITY: t.Optional[TASK_PRIORITY] = None
+
 	def __init__(self, queue_inp, queue_out):
 		super().__init__()
 		self.queue_inp = queue_inp
 		self.queue_out = queue_out
 		self.stoprequest = threading.Event()
+		self._task: t.Optional[Task] = None
+
+	def start(self):
+		if self.PRIORITY is None:
+			super().start()
+			return
+		self._task = get_worker_pool().submit(
+			self.run, self.PRIORITY, self.stoprequest, self._on_cancel
+		)
+
+	def is_alive(self):
+		if self._task is None:
+			return super().is_alive()
+		return self._task.is_alive()
 
 	def join(self, timeout = None, nostop = False):
 		"""
@@ -22,7 +50,15 @@ class _StoppableBaseThread(threading.Thread):
 		"""
 		if not nostop:
 			self.stoprequest.set()
-		super().join(timeout)
+		if self._task is None:
+			super().join(timeout)
+			return
+		if not nostop:
+			self._task.cancel()
+		self._task.wait(timeout)
+
+	def _on_cancel(self):
+		self.queue_out_put(THREADSIG.ABORTED)
 
 	def queue_out_put(self, sig, *args):
 		"""
@@ -0,0 +1,84 @@
+"""
+Helpers to work on several demo directories at once. Each storage
+device gets its own lane of I/O, so a slow or unreachable drive only
+holds up the directories on it.
+"""
+
+import os
+import queue
+import threading
+import time
+import traceback
+import typing as t
+
+# Seconds to wait for directories to be stat'ed. Those that take longer
+# get a lane of their own.
+_STAT_TIMEOUT = 1.0
+
+def group_by_device(paths: t.Sequence[str]) -> t.List[t.List[str]]:
+	"""
+	Groups the given directories by the device they are on, keeping
+	their order. Directories that can't be stat'ed in time or at all end
+	up in groups of their own.
+	"""
+	devices = {}
+	def stat(path):
+		try:
+			devices[path] = os.stat(path).st_dev
+		except OSError:
+			pass
+
+	stat_threads = [threading.Thread(target = stat, args = (p,), daemon = True) for p in paths]
+	for thread in stat_threads:
+		thread.start()
+	deadline = time.monotonic() + _STAT_TIMEOUT
+	for thread in stat_threads:
+		thread.join(max(0.0, deadline - time.monotonic()))
+
+	groups = {}
+	for path in paths:
+		key = ("dev", devices[path]) if path in devices else ("path", path)
+		groups.setdefault(key, []).append(path)
+	return list(groups.values())
+
+def run_in_lanes(
+	paths: t.Sequence[str],
+	fn: t.Callable[[str], t.Any],
+	cancel_token: threading.Event,
+) -> t.Iterator[t.Tuple[str, t.Any]]:
+	"""
+	Calls `fn` on every path, processing the paths of each device one
+	after another in a lane thread of their own.
+	Yields (path, result) tuples in the order they complete. Stops once
+	`cancel_token` is set; `fn` is expected to respect it as well, so
+	the lanes wind down on their own.
+	"""
+	results = queue.Queue()
+	def lane(lane_paths):
+		try:
+			for path in lane_paths:
+				if cancel_token.is_set():
+					break
+				try:
+					results.put((path, fn(path)))
+				except Exception:
+					traceback.print_exc()
+		finally:
+			results.put(None)
+
+	lanes = group_by_device(paths)
+	for lane_paths in lanes:
+		threading.Thread(target = lane, args = (lane_paths,), daemon = True).start()
+
+	running = len(lanes)
+	while running:
+		if cancel_token.is_set():
+			return
+		try:
+			item = results.get(timeout = 0.05)
+		except queue.Empty:
+			continue
+		if item is None:
+			running -= 1
+			continue
+		yield item
@@ -0,0 +1,205 @@
+"""
+A process-wide pool of worker threads the threads in `demomgr.threads`
+run on instead of each spawning a fresh OS thread.
+Work is picked up in order of its priority lane, then in order of
+submission.
+"""
+
+from enum import IntEnum
+import heapq
+from itertools import count
+import threading
+import traceback
+import typing as t
+
+
+class TASK_PRIORITY(IntEnum):
+	"""
+	Priority lanes of the worker pool. Lower values are picked up first.
+	"""
+	INTERACTIVE = 0
+	FILTER = 1
+	BACKGROUND = 2
+
+
+class _TASK_STATE(IntEnum):
+	PENDING = 0
+	RUNNING = 1
+	DONE = 2
+
+
+class Task():
+	"""
+	A unit of work submitted to the `WorkerPool`.
+	Behaves a bit like a thread in that it can be checked for liveness
+	and be waited on.
+	"""
+
+	__slots__ = (
+		"fn", "priority", "cancel_token", "on_cancel", "_state", "_lock", "_done",
+	)
+
+	def __init__(
+		self,
+		fn: t.Callable[[], None],
+		priority: TASK_PRIORITY,
+		cancel_token: threading.Event,
+		on_cancel: t.Optional[t.Callable[[], None]],
+	) -> None:
+		self.fn = fn
+		self.priority = priority
+		self.cancel_token = cancel_token
+		self.on_cancel = on_cancel
+		self._state = _TASK_STATE.PENDING
+		self._lock = threading.Lock()
+		self._done = threading.Event()
+
+	def _claim(self) -> bool:
+		"""
+		Called by a worker; transitions the task into the running state.
+		Returns whether that worked out, which it won't if the task was
+		cancelled in the meantime.
+		"""
+		with self._lock:
+			if self._state is not _TASK_STATE.PENDING:
+				return False
+			self._state = _TASK_STATE.RUNNING
+			return True
+
+	def _finish(self) -> None:
+		with self._lock:
+			self._state = _TASK_STATE.DONE
+		self._done.set()
+
+	def cancel(self) -> bool:
+		"""
+		Sets the task's cancellation token. If the task has not been
+		picked up by a worker yet, it is dropped immediately and its
+		`on_cancel` callback is run in the calling thread.
+		Returns whether the task was dropped that way.
+		"""
+		self.cancel_token.set()
+		with self._lock:
+			if self._state is not _TASK_STATE.PENDING:
+				return False
+			self._state = _TASK_STATE.DONE
+		if self.on_cancel is not None:
+			self.on_cancel()
+		self._done.set()
+		return True
+
+	def is_alive(self) -> bool:
+		return not self._done.is_set()
+
+	def wait(self, timeout: t.Optional[float] = None) -> bool:
+		"""
+		Blocks until the task is done or `timeout` seconds have passed.
+		Returns whether the task is done.
+		"""
+		return self._done.wait(timeout)
+
+
+class WorkerPool():
+	"""
+	Fixed-size pool of daemon worker threads processing `Task`s from a
+	priority queue.
+	"""
+
+	def __init__(self, worker_count: int) -> None:
+		self._cond = threading.Condition()
+		self._heap = []
+		self._seq = count()
+		self._worker_count = 0
+		self._target_worker_count = 0
+		self.set_worker_count(worker_count)
+
+	def set_worker_count(self, worker_count: int) -> None:
+		"""
+		Changes the amount of worker threads. Surplus workers retire once
+		they finish their current task.
+		"""
+		worker_count = max(1, worker_count)
+		with self._cond:
+			self._target_worker_count = worker_count
+			while self._worker_count < worker_count:
+				self._worker_count += 1
+				threading.Thread(target = self._work, daemon = True).start()
+			self._cond.notify_all()
+
+	def get_worker_count(self) -> int:
+		return self._target_worker_count
+
+	def submit(
+		self,
+		fn: t.Callable[[], None],
+		priority: TASK_PRIORITY,
+		cancel_token: t.Optional[threading.Event] = None,
+		on_cancel: t.Optional[t.Callable[[], None]] = None,
+	) -> Task:
+		"""
+		Queues `fn` to be called by a worker and returns its `Task`.
+
+		cancel_token: Event that is set when the task is cancelled. `fn`
+			is expected to check it regularly. Created if not given.
+		on_cancel: Called instead of `fn` if the task is cancelled before
+			a worker picked it up.
+		"""
+		if cancel_token is None:
+			cancel_token = threading.Event()
+		task = Task(fn, priority, cancel_token, on_cancel)
+		with self._cond:
+			heapq.heappush(self._heap, (priority, next(self._seq), task))
+			self._cond.notify()
+		return task
+
+	def get_pending_count(self) -> t.Dict[TASK_PRIORITY, int]:
+		"""
+		Returns the amount of queued tasks per priority lane. Cancelled
+		tasks that were not yet discarded are included.
+		"""
+		res = {p: 0 for p in TASK_PRIORITY}
+		with self._cond:
+			for prio, _, _ in self._heap:
+				res[prio] += 1
+		return res
+
+	def _work(self) -> None:
+		while True:
+			with self._cond:
+				while not self._heap and self._worker_count <= self._target_worker_count:
+					self._cond.wait()
+				if self._worker_count > self._target_worker_count:
+					self._worker_count -= 1
+					return
+				_, _, task = heapq.heappop(self._heap)
+
+			if not task._claim():
+				continue
+			try:
+				task.fn()
+			except Exception:
+				traceback.print_exc()
+			finally:
+				task._finish()
+
+
+_DEFAULT_WORKER_COUNT = 3
+
+_pool: t.Optional[WorkerPool] = None
+_pool_lock = threading.Lock()
+
+def get_worker_pool() -> WorkerPool:
+	"""
+	Returns the process-wide worker pool, creating it if necessary.
+	"""
+	global _pool
+	with _pool_lock:
+		if _pool is None:
+			_pool = WorkerPool(_DEFAULT_WORKER_COUNT)
+		return _pool
+
+def set_worker_count(worker_count: int) -> None:
+	"""
+	Sets the amount of workers in the process-wide worker pool.
+	"""
+	get_worker_pool().set_worker_count(worker_count)
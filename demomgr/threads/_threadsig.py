@@ -29,12 +29,16 @@ class THREADSIG(IntEnum):
 	INFO_STATUSBAR = 0x201
 	INFO_INFORMATION_CONTAINERS = 0x202
 	INFO_IDX_PARAM = 0x203
+	INFO_PROGRESS = 0x204
 
 	# Result data
 	RESULT_DEMODATA = 0x300
 	RESULT_FS_INFO = 0x301
 	RESULT_HEADER = 0x302
 	RESULT_INFO_WRITE_RESULTS = 0x303
+	RESULT_DEMO_UPDATE = 0x304
+	RESULT_DEMO_INFO = 0x305
+	RESULT_DEMO_HEADERS = 0x306
 
 	def is_finish_signal(self):
 		return self.value < 0x100
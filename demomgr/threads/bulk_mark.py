@@ -0,0 +1,155 @@
+"""Contains the ThreadBulkMark class."""
+
+from datetime import datetime
+
+from demomgr.demo_data_manager import DemoDataManager, uses_database
+from demomgr.demo_info import DemoInfo
+from demomgr.threads._threadsig import THREADSIG
+from demomgr.threads._base import _StoppableBaseThread
+from demomgr import constants as CNST
+
+
+class ThreadBulkMark(_StoppableBaseThread):
+	"""
+	Thread for adding, removing or renaming a bookmark in the demo
+	info of many demos of a directory at once.
+	All demos are read and written through a single DemoDataManager
+	which is only flushed once at the end, so the `_events.txt` file is
+	rewritten once no matter how many demos are marked.
+	Demos whose info would not change are not written, but reported as
+	successfully processed. If the thread is stopped, info containers
+	that were not yet updated are left alone; the updates already made
+	are still written.
+
+	Sent to the output queue:
+		BOOKMARK_CONTAINER_UPDATE_START(1) when the demo info of a
+				bookmark container type starts being read.
+			- Container type as the proper enum member.
+
+		RESULT_INFO_WRITE_RESULTS(2) for each container type once all
+				demo info has been written.
+			- Container type as the proper enum member.
+			- Dict mapping each demo name to `None` if it was
+				processed successfully or an exception if reading or
+				writing its info failed.
+
+		RESULT_DEMO_INFO(2) for each container type once all demo info
+				has been written.
+			- Container type as the proper enum member.
+			- Dict mapping the names of the demos whose info was
+				successfully changed to their new DemoInfo, or `None`
+				if they do not have any anymore.
+	"""
+	def __init__(
+		self, queue_out, directory, names, operation, bookmark_name, tick, new_name, cfg
+	):
+		"""
+		Thread takes an output queue and the following args:
+			directory <Str>: Absolute path to the directory containing
+				the demos.
+			names <List[Str]>: Names of the demos to be marked.
+			operation <BOOKMARK_OPERATION>: What to do.
+			bookmark_name <Str>: Name of the bookmark to add, or of the
+				bookmarks to remove or rename.
+			tick <Int|None>: Tick of the bookmark to add. For removing and
+				renaming, only bookmarks at this tick are affected, or all
+				of them if it is `None`.
+			new_name <Str|None>: The new name of renamed bookmarks.
+			cfg <config.Config>: Program configuration.
+		"""
+		self.directory = directory
+		self.names = names
+		self.operation = operation
+		self.bookmark_name = bookmark_name
+		self.tick = tick
+		self.new_name = new_name
+		self.cfg = cfg
+
+		super().__init__(None, queue_out)
+
+	def _matches(self, bookmark):
+		return bookmark[0] == self.bookmark_name and (self.tick is None or bookmark[1] == self.tick)
+
+	def _get_new_bookmarks(self, bookmarks, date):
+		"""
+		Returns the bookmarks resulting from applying the thread's
+		operation to `bookmarks`, a sequence of (name, tick, time) events,
+		or `None` if they would not change.
+		"""
+		if self.operation is CNST.BOOKMARK_OPERATION.ADD:
+			if any(self._matches(bm) for bm in bookmarks):
+				return None
+			res = [tuple(bm) for bm in bookmarks]
+			res.append((self.bookmark_name, self.tick, date))
+			res.sort(key = lambda bm: bm[1])
+			return res
+
+		if not any(self._matches(bm) for bm in bookmarks):
+			return None
+		if self.operation is CNST.BOOKMARK_OPERATION.REMOVE:
+			return [tuple(bm) for bm in bookmarks if not self._matches(bm)]
+		return [
+			(self.new_name, bm[1], bm[2]) if self._matches(bm) else tuple(bm)
+			for bm in bookmarks
+		]
+
+	def run(self):
+		finish_sig = THREADSIG.SUCCESS
+		date = datetime.now().strftime("%Y/%m/%d %H:%M")
+		ddm = DemoDataManager(self.directory, self.cfg, self.stoprequest)
+		results = {}
+		new_info = {}
+
+		for data_mode in CNST.DATA_GRAB_MODE:
+			if data_mode is CNST.DATA_GRAB_MODE.NONE:
+				continue
+			if (
+				data_mode is CNST.DATA_GRAB_MODE.SQLITE and
+				not uses_database(ddm.directory, self.cfg)
+			):
+				continue
+			if self.stoprequest.is_set():
+				finish_sig = THREADSIG.ABORTED
+				break
+
+			self.queue_out_put(THREADSIG.BOOKMARK_CONTAINER_UPDATE_START, data_mode)
+			mode_results = results[data_mode] = {}
+			mode_info = new_info[data_mode] = {}
+			for name, info in zip(self.names, ddm.get_demo_info(self.names, data_mode)):
+				if isinstance(info, Exception):
+					mode_results[name] = info
+					continue
+				mode_results[name] = None
+				bookmarks = self._get_new_bookmarks(
+					() if info is None else list(info.bookmarks.iter_tuples()), date
+				)
+				if bookmarks is not None:
+					mode_info[name] = DemoInfo(
+						name, () if info is None else info.killstreaks, bookmarks
+					)
+
+			if self.stoprequest.is_set():
+				# Reading was cancelled midway; don't write half of this container type.
+				mode_info.clear()
+				finish_sig = THREADSIG.ABORTED
+				break
+			if mode_info:
+				ddm.write_demo_info(list(mode_info), list(mode_info.values()), data_mode)
+
+		ddm.flush()
+		for data_mode, write_results in ddm.get_write_results().items():
+			results[data_mode].update(write_results)
+		ddm.destroy()
+
+		for data_mode, mode_results in results.items():
+			self.queue_out_put(THREADSIG.RESULT_INFO_WRITE_RESULTS, data_mode, mode_results)
+			self.queue_out_put(
+				THREADSIG.RESULT_DEMO_INFO,
+				data_mode,
+				{
+					name: None if info.is_empty() else info
+					for name, info in new_info[data_mode].items()
+					if mode_results[name] is None
+				},
+			)
+		self.queue_out_put(finish_sig)
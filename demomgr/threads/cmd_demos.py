@@ -1,16 +1,27 @@
+from concurrent.futures import CancelledError
 import os
-import shutil
 
 from demomgr.constants import BULK_OPERATION, DATA_GRAB_MODE
-from demomgr.demo_data_manager import DemoDataManager
+from demomgr.demo_data_manager import DemoDataManager, splice_events, transfer_json_info
+from demomgr.io_governor import get_io_governor
 from demomgr.threads._base import _StoppableBaseThread
 from demomgr.threads._threadsig import THREADSIG
+from demomgr.transfer import TransferEngine
 
 
 class CMDDemosThread(_StoppableBaseThread):
 	"""
 	Thread to bulk delete, or copy/move demos between directories
 	alongside with their info.
+	Demos are copied and moved through a `TransferEngine`, so a stop
+	request cancels the demo being transferred as well; its partial copy
+	is removed. If both directories are on the same file system, demos
+	are moved by renaming them in one go instead.
+	JSON files are copied or moved as they are, without being parsed,
+	unless the `validate_json` setting is enabled. Logchunks are spliced
+	from one `_events.txt` into the other, see
+	`demo_data_manager.splice_events`.
+	All of the thread's I/O is background I/O, see `io_governor`.
 
 	Sent to the output queue:
 		SUCCESS(0) when the thread is not aborted.
@@ -19,12 +30,22 @@ class CMDDemosThread(_StoppableBaseThread):
 
 		ABORTED(0) on abort.
 
-		FILE_OPERATION_SUCCESS(1) when a file is successfully deleted.
-			- Name of the deleted file
+		FILE_OPERATION_SUCCESS(1) when a file is successfully processed.
+			- Name of the processed file
 
-		FILE_OPERATION_FAILURE(2) when a file deletion fails.
+		FILE_OPERATION_FAILURE(2) when processing a file fails.
 			- Name of the file
 			- The raised error
+
+		INFO_PROGRESS(2) every now and then while copying or moving.
+			- Amount of bytes transferred so far.
+			- Amount of bytes to be transferred in total.
+
+		RESULT_INFO_WRITE_RESULTS(2) for each data grab mode once the
+				demo info of the processed demos has been processed.
+			- Data grab mode as the proper enum member.
+			- Dict mapping demo names to `None` or the exception that
+				prevented processing their info.
 	"""
 
 	def __init__(
@@ -35,7 +56,7 @@ class CMDDemosThread(_StoppableBaseThread):
 		mode,
 		files_to_process,
 		info_to_process,
-		cfg
+		cfg,
 	):
 		"""
 		Thread takes an output queue and the following kwargs:
@@ -63,12 +84,21 @@ class CMDDemosThread(_StoppableBaseThread):
 		self.cfg = cfg
 
 		self.finish_sig = THREADSIG.SUCCESS
+		self._same_file_system = False
 
 		self._FULL_DGM = [x for x in DATA_GRAB_MODE if x is not DATA_GRAB_MODE.NONE]
 
 		super().__init__(None, queue_out)
 
 	def run(self):
+		with get_io_governor().background():
+			self._run()
+		self.queue_out_put(self.finish_sig)
+
+	def _run(self):
+		if self.mode is BULK_OPERATION.MOVE:
+			self._same_file_system = self._is_same_file_system()
+
 		file_processor, info_processor = {
 			BULK_OPERATION.COPY: (self.copy, self.copy_info),
 			BULK_OPERATION.MOVE: (self.move, self.move_info),
@@ -85,54 +115,83 @@ class CMDDemosThread(_StoppableBaseThread):
 				mode_files_map[mode].append(file)
 		info_processor({m: files for m, files in mode_files_map.items() if files})
 
-		self.queue_out_put(self.finish_sig)
+	def _is_same_file_system(self):
+		"""
+		Returns whether the source and target directory are on the same
+		file system, so files can be renamed between them.
+		"""
+		try:
+			return os.stat(self.source_dir).st_dev == os.stat(self.target_dir).st_dev
+		except OSError:
+			return False
 
 	# === Stage 1 functions ===
 
-	# NOTE: _move, _copy and _delete are almost duplicates. Could probably be condensed.
-	def move(self):
+	def _transfer(self, move):
+		processed = set()
+		def on_done(file, exc):
+			if exc is None:
+				processed.add(file)
+				self.queue_out_put(THREADSIG.FILE_OPERATION_SUCCESS, file)
+			else:
+				self.queue_out_put(THREADSIG.FILE_OPERATION_FAILURE, file, exc)
+
+		engine = TransferEngine(
+			self.stoprequest,
+			lambda done, total: self.queue_out_put(THREADSIG.INFO_PROGRESS, done, total),
+			self.cfg.hardlink_copies,
+		)
+		engine.run(
+			(
+				(file, os.path.join(self.source_dir, file), os.path.join(self.target_dir, file))
+				for file in self.to_process
+			),
+			move,
+			on_done,
+		)
+		if self.stoprequest.is_set():
+			self.finish_sig = THREADSIG.ABORTED
+
+		return [file for file in self.to_process if file in processed]
+
+	def _rename(self):
+		governor = get_io_governor()
 		successfully_moved = []
 		for file in self.to_process:
 			try:
-				shutil.move(
-					os.path.join(self.source_dir, file),
-					os.path.join(self.target_dir, file),
-				)
-			except OSError as e:
-				self.queue_out_put(THREADSIG.FILE_OPERATION_FAILURE, file, e)
-			else:
-				self.queue_out_put(THREADSIG.FILE_OPERATION_SUCCESS, file)
-				successfully_moved.append(file)
-
+				governor.throttle(0, 1, self.stoprequest)
+			except CancelledError:
+				pass
 			if self.stoprequest.is_set():
 				self.finish_sig = THREADSIG.ABORTED
 				break
-
-		return successfully_moved
-
-	def copy(self):
-		successfully_copied = []
-		for file in self.to_process:
 			try:
-				shutil.copy(
-					os.path.join(self.source_dir, file),
-					os.path.join(self.target_dir, file),
-				)
+				os.replace(os.path.join(self.source_dir, file), os.path.join(self.target_dir, file))
 			except OSError as e:
 				self.queue_out_put(THREADSIG.FILE_OPERATION_FAILURE, file, e)
 			else:
 				self.queue_out_put(THREADSIG.FILE_OPERATION_SUCCESS, file)
-				successfully_copied.append(file)
+				successfully_moved.append(file)
 
-			if self.stoprequest.is_set():
-				self.finish_sig = THREADSIG.ABORTED
-				break
+		return successfully_moved
 
-		return successfully_copied
+	def move(self):
+		if self._same_file_system:
+			return self._rename()
+		return self._transfer(True)
+
+	def copy(self):
+		return self._transfer(False)
 
 	def delete(self):
+		governor = get_io_governor()
 		successfully_deleted = []
 		for file in self.to_process:
+			try:
+				governor.throttle(0, 1, self.stoprequest)
+			except CancelledError:
+				self.finish_sig = THREADSIG.ABORTED
+				break
 			try:
 				os.remove(os.path.join(self.source_dir, file))
 			except OSError as e:
@@ -167,12 +226,38 @@ class CMDDemosThread(_StoppableBaseThread):
 		dst_ddm.write_demo_info(info_to_transfer, data, mode)
 		dst_ddm.flush()
 
+	def _transfer_raw_demo_info(self, files, mode, move):
+		"""
+		Copies or moves the demo info of all specified files for the
+		given mode `mode` without parsing it, if that mode's containers
+		allow it. Returns the write results or `None` if they do not.
+		"""
+		if mode is DATA_GRAB_MODE.JSON:
+			res = transfer_json_info(
+				self.source_dir,
+				self.target_dir,
+				files,
+				move,
+				self.cfg.validate_json,
+				self.stoprequest,
+			)
+			if self.stoprequest.is_set():
+				self.finish_sig = THREADSIG.ABORTED
+			return res
+		if mode is DATA_GRAB_MODE.EVENTS:
+			return splice_events(self.source_dir, self.target_dir, files, move, self.cfg)
+		return None
+
 	def move_info(self, fmm):
 		src_ddm = DemoDataManager(self.source_dir, self.cfg)
 		dest_ddm = DemoDataManager(self.target_dir, self.cfg)
 
 		for mode, files in fmm.items():
-			write_results = {}
+			raw_results = self._transfer_raw_demo_info(files, mode, True)
+			if raw_results is not None:
+				self.queue_out_put(THREADSIG.RESULT_INFO_WRITE_RESULTS, mode, raw_results)
+				continue
+
 			self._copy_demo_info(files, src_ddm, dest_ddm, mode)
 			write_results = dest_ddm.get_write_results()[mode]
 
@@ -207,6 +292,11 @@ class CMDDemosThread(_StoppableBaseThread):
 		dest_ddm = DemoDataManager(self.target_dir, self.cfg)
 
 		for mode, files in fmm.items():
+			raw_results = self._transfer_raw_demo_info(files, mode, False)
+			if raw_results is not None:
+				self.queue_out_put(THREADSIG.RESULT_INFO_WRITE_RESULTS, mode, raw_results)
+				continue
+
 			self._copy_demo_info(files, src_ddm, dest_ddm, mode)
 			self.queue_out_put(
 				THREADSIG.RESULT_INFO_WRITE_RESULTS,
@@ -1,95 +1,99 @@
-import os
+from concurrent.futures import CancelledError
 import time
-import queue
+from demomgr.demo_data_manager import DemoDataManager
 from demomgr.demo_info import DemoInfo
 
 from demomgr.filterlogic import process_filterstring, FILTERFLAGS
-from demomgr.helpers import readdemoheader
-from demomgr.threads.read_folder import ThreadReadFolder
+from demomgr.io_governor import get_io_governor
+from demomgr.threads.read_folder import read_folder
+from demomgr.threads._lanes import run_in_lanes
 from demomgr.threads._threadsig import THREADSIG
 from demomgr.threads._base import _StoppableBaseThread
+from demomgr.threads._pool import TASK_PRIORITY
 
 class ThreadFilter(_StoppableBaseThread):
 	"""
-	Thread to filter a directory of demos.
+	Thread to filter a directory of demos, or several directories at
+	once.
+	The filtered demo data is sent as a DemoTable in a RESULT_DEMODATA
+	signal. When filtering several directories, one is sent for each of
+	them as soon as it is done, with the directory of each demo set.
+	The demo data always carries the headers of the demos, `None` where
+	they are not known. Reading missing headers is background I/O, see
+	`io_governor`.
 	"""
 
-	def __init__(self, queue_out, filterstring, curdir, cfg, silent = False):
+	PRIORITY = TASK_PRIORITY.FILTER
+
+	def __init__(
+		self, queue_out, filterstring, curdir, cfg, silent = False, paths = None, headers = None
+	):
 		"""
 		Thread requires output queue and the following args:
 			filterstring <Str>: Raw user input from the entry field
-			curdir <Str>: Absolute path to current directory
+			curdir <Str>: Absolute path to current directory. Ignored if
+				`paths` is given.
 			cfg <Dict>: Program configuration
 			silent <Bool>: If True, thread will not drop progress messages
+			paths <List[Str] | None>: Absolute paths to several directories
+				to filter, one lane per storage device.
+			headers <Dict[Str, Dict] | None>: Already known headers of
+				demos in `curdir`, which are not read again. Ignored if
+				`paths` is given.
 		"""
 		self.filterstring = filterstring
 		self.curdir = curdir
 		self.cfg = cfg
 		self.silent = silent
+		self.paths = paths
+		self.headers = headers
 
 		super().__init__(None, queue_out)
 
-	def run(self):
-		starttime = time.time()
-
-		self.queue_out_put(THREADSIG.INFO_STATUSBAR, ("Filtering demos; Parsing filter...", ))
-		try:
-			filters, flags = process_filterstring(self.filterstring)
-		except Exception as error:
-			self.queue_out_put(
-				THREADSIG.INFO_STATUSBAR, (f"Error parsing filter request: {error}", 4000)
-			)
-			self.queue_out_put(THREADSIG.FAILURE)
-			return
-
-		if self.stoprequest.is_set():
-			self.queue_out_put(THREADSIG.ABORTED)
-			return
-
-		if not self.silent:
+	def _filter_directory(self, directory, filters, flags, silent, known_headers = None):
+		"""
+		Reads and filters the demos of `directory`. Headers in the
+		`known_headers` dict are used instead of reading them.
+		Returns a tuple of the exit code, the filtered demo data, the
+		amount of demos in the directory and the amount of demos
+		excluded due to errors. The demo data is `None` unless the exit
+		code is SUCCESS.
+		"""
+		if not silent:
 			self.queue_out_put(
 				THREADSIG.INFO_STATUSBAR, ("Filtering demos; Reading information...", )
 			)
 
-		self.datafetcherqueue = queue.Queue()
-		self.datafetcherthread = ThreadReadFolder(
-			self.datafetcherqueue, targetdir = self.curdir, cfg = self.cfg
-		)
-		self.datafetcherthread.start()
-		# NOTE: Can't really wait for join to this thread here.
-		self.datafetcherthread.join(None, nostop = True)
-		if self.stoprequest.is_set():
-			self.queue_out_put(THREADSIG.ABORTED)
-			return
+		demo_data, _, _, exitcode = read_folder(directory, self.cfg, self.stoprequest)
+		if exitcode is THREADSIG.ABORTED or self.stoprequest.is_set():
+			return (THREADSIG.ABORTED, None, 0, 0)
+		if exitcode is not THREADSIG.SUCCESS:
+			return (THREADSIG.FAILURE, None, 0, 0)
 
-		demo_data = None
-		while True:
-			try:
-				queueobj = self.datafetcherqueue.get_nowait()
-				if queueobj[0] is THREADSIG.RESULT_DEMODATA:
-					demo_data = queueobj[1]
-				elif queueobj[0].is_finish_signal():
-					if queueobj[0] is THREADSIG.SUCCESS:
-						break
+		names = demo_data.names
+		known_headers = {} if known_headers is None else known_headers
+		headers = [known_headers.get(name) for name in names]
+		if flags & FILTERFLAGS.HEADER:
+			missing = [i for i, header in enumerate(headers) if header is None]
+			if missing:
+				if not silent:
 					self.queue_out_put(
-						THREADSIG.INFO_STATUSBAR,
-						("Demo fetching thread failed during filtering.", 4000)
+						THREADSIG.INFO_STATUSBAR, ("Filtering demos; Reading demo headers...", )
 					)
-					self.queue_out_put(THREADSIG.FAILURE)
-					return
-			except queue.Empty:
-				break
-		if self.stoprequest.is_set():
-			self.queue_out_put(THREADSIG.ABORTED)
-			return
+				ddm = DemoDataManager(directory, self.cfg, self.stoprequest)
+				with get_io_governor().background():
+					read = ddm.get_demo_headers([names[i] for i in missing])
+				for i, header in zip(missing, read):
+					headers[i] = header
+				ddm.destroy()
 
 		errors = 0
-		filtered_demo_data = {
-			"col_filename": [], "col_demo_info": [], "col_ctime": [], "col_filesize": []
-		}
-		file_amnt = len(demo_data["col_filename"])
-		for i, demo_name in enumerate(demo_data["col_filename"]):
-			if not self.silent:
+		file_amnt = len(names)
+		sizes = demo_data.get_sizes()
+		mtimes = demo_data.get_mtimes()
+		mask = [False] * file_amnt
+		for i, demo_name in enumerate(names):
+			if not silent:
 				self.queue_out_put(
 					THREADSIG.INFO_STATUSBAR, (f"Filtering demos; {i+1} / {file_amnt}", )
 				)
@@ -97,31 +101,65 @@ class ThreadFilter(_StoppableBaseThread):
 			curdataset = {
 				"name": demo_name,
 				"demo_info": (
-					DemoInfo(demo_name, [], []) if demo_data["col_demo_info"][i] is None
-					else demo_data["col_demo_info"][i]
+					DemoInfo(demo_name, [], []) if demo_data.demo_info[i] is None
+					else demo_data.demo_info[i]
 				),
 				"header": None,
 				"filedata": {
-					"filesize": demo_data["col_filesize"][i],
-					"modtime": demo_data["col_ctime"][i],
+					"filesize": sizes[i],
+					"modtime": mtimes[i],
 				},
 			}
 			if flags & FILTERFLAGS.HEADER:
-				try:
-					curdataset["header"] = readdemoheader(os.path.join(self.curdir, demo_name))
-				except (OSError, ValueError):
+				if isinstance(headers[i], Exception):
+					if isinstance(headers[i], CancelledError):
+						return (THREADSIG.ABORTED, None, 0, 0)
 					errors += 1
 					continue
+				curdataset["header"] = headers[i]
 
-			if all(lambda_(curdataset) for lambda_ in filters):
-				filtered_demo_data["col_filename" ].append(demo_name)
-				filtered_demo_data["col_demo_info"].append(demo_data["col_demo_info"][i])
-				filtered_demo_data["col_ctime"    ].append(demo_data["col_ctime"][i])
-				filtered_demo_data["col_filesize" ].append(demo_data["col_filesize"][i])
+			mask[i] = all(lambda_(curdataset) for lambda_ in filters)
 
 			if self.stoprequest.is_set():
-				self.queue_out_put(THREADSIG.ABORTED)
-				return
+				return (THREADSIG.ABORTED, None, 0, 0)
+
+		demo_data.set_headers(headers)
+		return (THREADSIG.SUCCESS, demo_data.where(mask), file_amnt, errors)
+
+	def run(self):
+		starttime = time.time()
+
+		self.queue_out_put(THREADSIG.INFO_STATUSBAR, ("Filtering demos; Parsing filter...", ))
+		try:
+			filters, flags = process_filterstring(self.filterstring)
+		except Exception as error:
+			self.queue_out_put(
+				THREADSIG.INFO_STATUSBAR, (f"Error parsing filter request: {error}", 4000)
+			)
+			self.queue_out_put(THREADSIG.FAILURE)
+			return
+
+		if self.stoprequest.is_set():
+			self.queue_out_put(THREADSIG.ABORTED)
+			return
+
+		if self.paths is not None:
+			self._run_multiple(starttime, filters, flags)
+			return
+
+		exitcode, filtered_demo_data, file_amnt, errors = self._filter_directory(
+			self.curdir, filters, flags, self.silent, self.headers
+		)
+		if exitcode is THREADSIG.ABORTED:
+			self.queue_out_put(THREADSIG.ABORTED)
+			return
+		if exitcode is not THREADSIG.SUCCESS:
+			self.queue_out_put(
+				THREADSIG.INFO_STATUSBAR,
+				("Demo fetching failed during filtering.", 4000)
+			)
+			self.queue_out_put(THREADSIG.FAILURE)
+			return
 
 		res_msg = f"Filtered {file_amnt} demos in {round(time.time() - starttime, 3)} seconds."
 		if errors > 0:
@@ -129,3 +167,43 @@ class ThreadFilter(_StoppableBaseThread):
 		self.queue_out_put(THREADSIG.INFO_STATUSBAR, (res_msg, 3000))
 		self.queue_out_put(THREADSIG.RESULT_DEMODATA, filtered_demo_data)
 		self.queue_out_put(THREADSIG.SUCCESS)
+
+	def _run_multiple(self, starttime, filters, flags):
+		"""
+		Filters all directories in `self.paths`, sending results as they
+		come in. Directories that fail to be read are skipped and
+		reported once all others are done.
+		"""
+		failed = []
+		file_amnt = 0
+		errors = 0
+		for i, (path, (exitcode, data, dir_file_amnt, dir_errors)) in enumerate(run_in_lanes(
+			self.paths, lambda p: self._filter_directory(p, filters, flags, True), self.stoprequest
+		)):
+			if exitcode is THREADSIG.SUCCESS:
+				data.set_directory(path)
+				file_amnt += dir_file_amnt
+				errors += dir_errors
+				self.queue_out_put(THREADSIG.RESULT_DEMODATA, data)
+			elif exitcode is THREADSIG.FAILURE:
+				failed.append(path)
+			if not self.silent:
+				self.queue_out_put(
+					THREADSIG.INFO_STATUSBAR,
+					(f"Filtering demos; {i + 1} / {len(self.paths)} directories", )
+				)
+
+		if self.stoprequest.is_set():
+			self.queue_out_put(THREADSIG.ABORTED)
+			return
+
+		res_msg = (
+			f"Filtered {file_amnt} demos in {len(self.paths) - len(failed)} directories in "
+			f"{round(time.time() - starttime, 3)} seconds."
+		)
+		if errors > 0:
+			res_msg += f" {errors} of those excluded due to errors."
+		if failed:
+			res_msg += f" Failed to read: {', '.join(failed)}"
+		self.queue_out_put(THREADSIG.INFO_STATUSBAR, (res_msg, 3000))
+		self.queue_out_put(THREADSIG.SUCCESS)
@@ -0,0 +1,137 @@
+"""Contains the ThreadLoadDemoInfo class."""
+
+import itertools
+import queue
+
+from demomgr.catalog import get_catalog
+from demomgr.demo_data_manager import DemoDataManager, uses_database
+from demomgr.threads._threadsig import THREADSIG
+from demomgr.threads._base import _StoppableBaseThread
+
+# Demos loaded at once. Small, so a change of the viewport is picked up quickly.
+_BATCH_SIZE = 32
+
+class ThreadLoadDemoInfo(_StoppableBaseThread):
+	"""
+	Thread to load the demo information and headers of demos displayed
+	without them, prioritizing the ones in and near the viewport.
+	The viewport is communicated through the input queue as tuples of
+	two lists: Names of the demos currently visible and names of the
+	demos near them. Only the last tuple in the queue is considered.
+	Visible demos are loaded first, their headers included even if not
+	requested so they are cached for the preview; then the ones near
+	them, then everything else.
+	Runs in a dedicated thread and not on the worker pool, as it may
+	run for a while and waits on its input queue.
+
+	Sent to the output queue:
+		RESULT_DEMO_INFO(1) for each batch of loaded demos.
+			- Dict mapping demo names to their DemoInfo or `None` if
+				they have none or it could not be read.
+
+		RESULT_DEMO_HEADERS(1) for each batch of loaded headers.
+			- Dict mapping demo names to their header as returned by
+				`readdemoheader` or `None` if it could not be read.
+	"""
+
+	def __init__(self, queue_inp, queue_out, targetdir, names, cfg, header_names = ()):
+		"""
+		Thread requires an input queue, an output queue and the
+		following args:
+			targetdir <Str>: Full path to the directory of the demos
+			names <List[Str]>: Names of the demos to load the info of
+			cfg <Config>: Program configuration
+			header_names <List[Str]>: Names of the demos to load the
+				header of
+		"""
+		self.targetdir = targetdir
+		self.names = names
+		self.cfg = cfg
+		self.header_names = header_names
+
+		super().__init__(queue_inp, queue_out)
+
+	def _get_viewport(self):
+		"""
+		Returns the latest viewport tuple from the input queue, or `None`
+		if there is none.
+		"""
+		viewport = None
+		try:
+			while True:
+				viewport = self.queue_inp.get_nowait()
+		except queue.Empty:
+			pass
+		return viewport
+
+	def run(self):
+		pending_info = dict.fromkeys(self.names)
+		pending_headers = dict.fromkeys(self.header_names)
+		visible = []
+		nearby = []
+		datamode = self.cfg.data_grab_mode
+		catalog = get_catalog() if self.cfg.library_catalog else None
+		# Headers are only worth reading ahead if they end up stored somewhere.
+		load_headers = catalog is not None or uses_database(self.targetdir, self.cfg)
+		ddm = DemoDataManager(self.targetdir, self.cfg, self.stoprequest)
+
+		while (pending_info or pending_headers) and not self.stoprequest.is_set():
+			viewport = self._get_viewport()
+			if viewport is not None:
+				visible, nearby = viewport
+
+			is_pending = lambda n: n in pending_info or n in pending_headers
+			batch = [n for n in visible if is_pending(n)][:_BATCH_SIZE]
+			batch_visible = bool(batch)
+			if not batch:
+				batch = [n for n in nearby if is_pending(n)][:_BATCH_SIZE]
+			if not batch:
+				batch = list(itertools.islice(
+					itertools.chain(pending_info, (n for n in pending_headers if n not in pending_info)),
+					_BATCH_SIZE,
+				))
+			info_batch = [n for n in batch if n in pending_info]
+			header_batch = [n for n in batch if n in pending_headers]
+			for name in info_batch:
+				del pending_info[name]
+			for name in header_batch:
+				del pending_headers[name]
+
+			if info_batch:
+				validators = ddm.get_info_validators(info_batch, datamode)
+				results = {}
+				for i, (name, res) in enumerate(
+					zip(info_batch, ddm.get_demo_info(info_batch, datamode))
+				):
+					if isinstance(res, Exception):
+						validators[i] = None
+						res = None
+					results[name] = res
+				if ddm.is_cancelled():
+					break
+				self.queue_out_put(THREADSIG.RESULT_DEMO_INFO, results)
+
+				if catalog is not None:
+					fs_info = ddm.get_fs_info(info_batch)
+					try:
+						catalog.put_info(self.targetdir, [
+							(name, fs["size"], fs["mtime"], datamode, validators[i], results[name])
+							for i, (name, fs) in enumerate(zip(info_batch, fs_info))
+							if isinstance(fs, dict)
+						])
+					except OSError:
+						catalog = None
+
+			if header_batch:
+				headers = {
+					name: None if isinstance(res, Exception) else res
+					for name, res in zip(header_batch, ddm.get_demo_headers(header_batch))
+				}
+				if ddm.is_cancelled():
+					break
+				self.queue_out_put(THREADSIG.RESULT_DEMO_HEADERS, headers)
+			elif batch_visible and load_headers:
+				ddm.get_demo_headers(batch)
+
+		ddm.destroy()
+		self.queue_out_put(THREADSIG.ABORTED if self.stoprequest.is_set() else THREADSIG.SUCCESS)
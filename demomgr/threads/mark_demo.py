@@ -2,7 +2,7 @@
 
 import os
 
-from demomgr.demo_data_manager import DemoDataManager
+from demomgr.demo_data_manager import DemoDataManager, uses_database
 from demomgr.demo_info import DemoInfo
 from demomgr.threads._threadsig import THREADSIG
 from demomgr.threads._base import _StoppableBaseThread
@@ -51,6 +51,11 @@ class ThreadMarkDemo(_StoppableBaseThread):
 		for data_mode in CNST.DATA_GRAB_MODE:
 			if data_mode is CNST.DATA_GRAB_MODE.NONE:
 				continue
+			if (
+				data_mode is CNST.DATA_GRAB_MODE.SQLITE and
+				not uses_database(ddm.directory, self.cfg)
+			):
+				continue
 
 			self.queue_out_put(THREADSIG.BOOKMARK_CONTAINER_UPDATE_START, data_mode)
 			res, = ddm.get_demo_info([demo_name], data_mode)
@@ -60,10 +65,11 @@ class ThreadMarkDemo(_StoppableBaseThread):
 				)
 				continue # NOTE: this skips the stoprequest check but who cares
 
-			if res is None:
-				res = DemoInfo(demo_name, [], self.bookmarks)
-			else:
-				res.bookmarks = self.bookmarks
+			try:
+				res = DemoInfo(demo_name, [] if res is None else res.killstreaks, self.bookmarks)
+			except ValueError as e: # A bookmark's tick is out of range.
+				self.queue_out_put(THREADSIG.BOOKMARK_CONTAINER_UPDATE_FAILURE, data_mode, e)
+				continue
 
 			ddm.write_demo_info([demo_name], [res], data_mode)
 			ddm.flush()
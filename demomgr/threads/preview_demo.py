@@ -0,0 +1,120 @@
+"""Contains the ThreadPreviewDemo class."""
+
+from collections import OrderedDict
+import os
+import queue
+
+from demomgr.helpers import readdemoheader
+from demomgr.threads._threadsig import THREADSIG
+from demomgr.threads._base import _StoppableBaseThread
+
+# Time a request has to stay the latest one before its header is read, in seconds.
+_DEBOUNCE_TIME = 0.06
+# Amount of headers kept in the LRU cache.
+_CACHE_SIZE = 64
+# Interval in which the stoprequest is checked while idle, in seconds.
+_IDLE_TIMEOUT = 0.25
+
+class ThreadPreviewDemo(_StoppableBaseThread):
+	"""
+	Long-lived thread to deliver the headers of demos to be previewed.
+	Requests are communicated through the input queue as tuples of the
+	full path of the demo to preview and a list of full paths of demos
+	whose headers should be read ahead, usually its neighbours in the
+	listbox. Only the latest request is answered; older ones are dropped
+	and if a request is superseded while headers are read ahead, reading
+	ahead stops.
+	Headers are kept in a small LRU cache and reused as long as their
+	demo's size and modification time do not change, so cached and read
+	ahead previews are answered right away, while requests for uncached
+	demos are debounced.
+	Runs in a dedicated thread and not on the worker pool, as it lives
+	as long as the main window and waits on its input queue.
+
+	Sent to the output queue:
+		RESULT_HEADER(2) when the header of a requested demo is known.
+			- Full path of the demo.
+			- Either a dict representing the demo header as returned by
+				the helper function `readdemoheader` or `None` if there
+				was an error retrieving it.
+	"""
+
+	def __init__(self, queue_inp, queue_out):
+		"""
+		Thread requires an input and an output queue.
+		"""
+		self._cache = OrderedDict()
+
+		super().__init__(queue_inp, queue_out)
+
+	def _get_request(self, timeout):
+		"""
+		Returns the latest request from the input queue, waiting up to
+		`timeout` seconds for one if the queue is empty. Returns `None`
+		if there was none.
+		"""
+		try:
+			req = self.queue_inp.get(timeout = timeout)
+		except queue.Empty:
+			return None
+		try:
+			while True:
+				req = self.queue_inp.get_nowait()
+		except queue.Empty:
+			pass
+		return req
+
+	def _get_header(self, path, read = True):
+		"""
+		Returns the header of the demo at `path`, from the cache if it is
+		still valid there. If it is not and `read` is `False`, returns
+		`False` instead of reading the header.
+		"""
+		try:
+			stat_res = os.stat(path)
+		except OSError:
+			self._cache.pop(path, None)
+			return None
+		validator = (stat_res.st_size, stat_res.st_mtime_ns)
+		cached = self._cache.get(path)
+		if cached is not None and cached[0] == validator:
+			self._cache.move_to_end(path)
+			return cached[1]
+		if not read:
+			return False
+
+		try:
+			header = readdemoheader(path)
+		except (OSError, ValueError):
+			header = None
+		self._cache[path] = (validator, header)
+		self._cache.move_to_end(path)
+		while len(self._cache) > _CACHE_SIZE:
+			self._cache.popitem(last = False)
+		return header
+
+	def run(self):
+		request = None
+		while not self.stoprequest.is_set():
+			if request is None:
+				request = self._get_request(_IDLE_TIMEOUT)
+				if request is None:
+					continue
+
+			path, neighbours = request
+			header = self._get_header(path, False)
+			if header is False:
+				newer = self._get_request(_DEBOUNCE_TIME)
+				if newer is not None:
+					request = newer
+					continue
+				header = self._get_header(path)
+			self.queue_out_put(THREADSIG.RESULT_HEADER, path, header)
+
+			request = None
+			for neighbour in neighbours:
+				if self.stoprequest.is_set() or not self.queue_inp.empty():
+					break
+				self._get_header(neighbour)
+
+		self.queue_out_put(THREADSIG.ABORTED)
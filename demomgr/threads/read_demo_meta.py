@@ -3,6 +3,7 @@ import os
 from demomgr.helpers import readdemoheader
 from demomgr.threads._threadsig import THREADSIG
 from demomgr.threads._base import _StoppableBaseThread
+from demomgr.threads._pool import TASK_PRIORITY
 
 
 class ReadDemoMetaThread(_StoppableBaseThread):
@@ -19,6 +20,9 @@ class ReadDemoMetaThread(_StoppableBaseThread):
 				the helper function `readdemoheader` or `None` if there
 				was an error retrieving it.
 	"""
+
+	PRIORITY = TASK_PRIORITY.INTERACTIVE
+
 	def __init__(self, queue_out, target_demo_path):
 		"""
 		Thread requires output queue and the following args:
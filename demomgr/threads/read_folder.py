@@ -3,23 +3,30 @@
 import os
 import time
 
+from demomgr.catalog import get_catalog
 from demomgr.demo_data_manager import DemoDataManager
 from demomgr.demo_info import DemoInfo
+from demomgr.demo_table import DemoTable
 from demomgr.threads._threadsig import THREADSIG
 from demomgr.threads._base import _StoppableBaseThread
+from demomgr.threads._pool import TASK_PRIORITY
 from demomgr import constants as CNST
 
+# Coarsest modification time granularity of common file systems, which
+# is 2 seconds on FAT and some network shares, in nanoseconds.
+_DIR_MTIME_GRANULARITY = 2_000_000_000
+
 class ThreadReadFolder(_StoppableBaseThread):
 	"""
-	Thread to read a directory containing demos and return a dict of names,
-	creation dates, demo information and filesizes.
+	Thread to read a directory containing demos and return a DemoTable of
+	their names, modification times, demo information and filesizes.
 
 	Sent to the output queue:
-		RESULT_DEMODATA(1) for a set of demo data, the thread's main
+		RESULT_DEMODATA(2) for a set of demo data, the thread's main
 				reason for existence.
-			- Demo data as a dict that requires little work to be fed
-				into the main window's MultiframeList. May be `None` on
-				failure.
+			- Demo data as a DemoTable. May be `None` on failure.
+			- List of names of the demos whose demo info was left to
+				`ThreadLoadDemoInfo`, which happens for large directories.
 
 		INFO_STATUSBAR(2) for displaying info on a statusbar
 				# TODO: REMOVE (issue #31)
@@ -28,6 +35,8 @@ class ThreadReadFolder(_StoppableBaseThread):
 				to specify permanent duration.
 	"""
 
+	PRIORITY = TASK_PRIORITY.INTERACTIVE
+
 	def __init__(self, queue_out, targetdir, cfg):
 		"""
 		Thread requires an output queue and the following args:
@@ -39,7 +48,7 @@ class ThreadReadFolder(_StoppableBaseThread):
 
 		super().__init__(None, queue_out)
 
-	def __stop(self, status_msg, status_timeout, result, exitcode):
+	def __stop(self, status_msg, status_timeout, result, pending_info, exitcode):
 		"""
 		Outputs end signals to self.queue_out.
 		If the first arg is None, the Statusbar tuple will not be output.
@@ -47,7 +56,7 @@ class ThreadReadFolder(_StoppableBaseThread):
 		if status_msg is not None:
 			self.queue_out_put(THREADSIG.INFO_STATUSBAR, status_msg, status_timeout)
 
-		self.queue_out_put(THREADSIG.RESULT_DEMODATA, result)
+		self.queue_out_put(THREADSIG.RESULT_DEMODATA, result, pending_info)
 		self.queue_out_put(exitcode)
 
 	def run(self):
@@ -56,80 +65,176 @@ class ThreadReadFolder(_StoppableBaseThread):
 		return it in a format that can be directly fed into listbox.
 		"""
 		if self.targetdir is None:
-			self.__stop(None, None, None, THREADSIG.FAILURE)
+			self.__stop(None, None, None, [], THREADSIG.FAILURE)
 			return
 
 		self.queue_out_put(THREADSIG.INFO_STATUSBAR, f"Reading demo information...", None)
-		starttime = time.time()
-
-		try:
-			files = [
-				i for i in os.listdir(self.targetdir)
-				if os.path.splitext(i)[1] == ".dem" and
-					os.path.isfile(os.path.join(self.targetdir, i))
-			]
-		except FileNotFoundError:
-			self.__stop(
-				f"ERROR: Selected directory does not exist.", None, None, THREADSIG.FAILURE
-			)
-			return
-		except OSError as exc:
-			self.__stop(f"Error reading directory: {exc}.", None, None, THREADSIG.FAILURE)
-			return
-
-		# Grab demo information
-		datamode = self.cfg.data_grab_mode
-		ddm = DemoDataManager(self.targetdir, self.cfg)
-
-		# Get FS info and punch it into returnable shape, disposes of exceptions
-		sizes = [None] * len(files)
-		dates_created = [None] * len(files)
-		for i, x in enumerate(ddm.get_fs_info(files)):
-			if isinstance(x, dict):
-				sizes[i] = x["size"]
-				dates_created[i] = x["mtime"]
-
-		if self.stoprequest.is_set():
+		result, pending_info, res_msg, exitcode = read_folder(
+			self.targetdir, self.cfg, self.stoprequest, CNST.DEFER_INFO_MIN_DEMOS
+		)
+		if exitcode is THREADSIG.ABORTED:
 			self.queue_out_put(THREADSIG.ABORTED)
 			return
 
-		# Get demo info.
-		demo_info = [None] * len(files)
-		encountered_exception = None
-		same_exception = True
-		info_read_success_count = 0
-		for i, result in enumerate(ddm.get_demo_info(files, datamode)):
-			if isinstance(result, Exception):
-				if encountered_exception is None:
-					encountered_exception = result
-				else:
-					if same_exception and result != encountered_exception:
-						same_exception = False
-				continue
-			info_read_success_count += 1
-			demo_info[i] = result
+		self.__stop(
+			res_msg, 5000 if exitcode is THREADSIG.SUCCESS else None, result, pending_info, exitcode
+		)
 
-		ddm.destroy()
 
-		if datamode is CNST.DATA_GRAB_MODE.NONE:
-			res_msg = "Demo information disabled."
+def read_folder(targetdir, cfg, cancel_token = None, defer_info_min = None):
+	"""
+	Reads file system info and demo information of all demos in
+	`targetdir`. This is the work `ThreadReadFolder` does, made available
+	to other threads that need it as a step of their own.
+	If the library catalog is enabled, the directory listing and demo
+	information are taken from it where they are still valid, and the
+	catalog is updated with the result.
+
+	targetdir <Str>: Full path to the directory to be read out
+	cfg <Config>: Program configuration
+	cancel_token <threading.Event|None>: Stops the read as soon as
+		possible once set.
+	defer_info_min <Int|None>: If given and demo information would have
+		to be read for at least this many demos, it is not read. Their
+		demo info is `None` and their names are returned, to be loaded
+		later.
+
+	Returns a four-element tuple of:
+		- Demo data as a DemoTable, or `None` on failure.
+		- List of names of the demos whose demo info was deferred.
+		- A message describing the result. May be `None`.
+		- One of the finish signals `SUCCESS`, `FAILURE` or `ABORTED`.
+	"""
+	starttime = time.time()
+
+	catalog = get_catalog() if cfg.library_catalog else None
+	catalog_entries = {}
+	catalog_dir_mtime = None
+	if catalog is not None:
+		try:
+			catalog_entries = catalog.get_entries(targetdir)
+			catalog_dir_mtime = catalog.get_directory_mtime(targetdir)
+		except OSError:
+			catalog = None
+
+	try:
+		dir_mtime = os.stat(targetdir).st_mtime_ns
+		listed_from_catalog = catalog is not None and dir_mtime == catalog_dir_mtime
+		if listed_from_catalog:
+			# No files were added, removed or renamed since the last read
+			files = list(catalog_entries)
 		else:
-			res_msg = (
-				f"Processed data from {info_read_success_count}/{len(files)} files in "
-				f"{round(time.time() - starttime, 4)} seconds"
-			)
-			if encountered_exception is not None and same_exception:
-				res_msg += f": {encountered_exception}."
+			listed_at = time.time_ns()
+			files = [
+				i for i in os.listdir(targetdir)
+				if os.path.splitext(i)[1] == ".dem" and
+					os.path.isfile(os.path.join(targetdir, i))
+			]
+	except FileNotFoundError:
+		return (None, [], f"ERROR: Selected directory does not exist.", THREADSIG.FAILURE)
+	except OSError as exc:
+		return (None, [], f"Error reading directory: {exc}.", THREADSIG.FAILURE)
+
+	# Grab demo information
+	datamode = cfg.data_grab_mode
+	ddm = DemoDataManager(targetdir, cfg, cancel_token)
+
+	# Get FS info and punch it into returnable shape, disposes of exceptions
+	table = DemoTable(files)
+	for i, x in enumerate(ddm.get_fs_info(files)):
+		if isinstance(x, dict):
+			table.sizes[i] = x["size"]
+			table.mtimes[i] = x["mtime"]
+
+	if ddm.is_cancelled():
+		ddm.destroy()
+		return (None, [], None, THREADSIG.ABORTED)
+
+	# Take still valid demo info from the catalog, read the rest.
+	demo_info = table.demo_info
+	validators = [None] * len(files)
+	to_read = list(range(len(files)))
+	if catalog is not None:
+		validators = ddm.get_info_validators(files, datamode)
+		to_read = []
+		for i, name in enumerate(files):
+			entry = catalog_entries.get(name)
+			if (
+				entry is not None and entry.info_mode is datamode and
+				entry.info_validator is not None and entry.info_validator == validators[i]
+			):
+				demo_info[i] = entry.get_info(name)
 			else:
-				res_msg += "."
-
-		self.__stop(
-			res_msg,
-			5000,
-			{
-				"col_filename": files, "col_demo_info": demo_info,
-				"col_ctime": dates_created, "col_filesize": sizes
-			},
-			THREADSIG.SUCCESS,
+				to_read.append(i)
+
+	deferred = []
+	if (
+		defer_info_min is not None and len(to_read) >= defer_info_min and
+		datamode is not CNST.DATA_GRAB_MODE.NONE
+	):
+		deferred = to_read
+		to_read = []
+		for i in deferred:
+			validators[i] = None
+
+	encountered_exception = None
+	same_exception = True
+	info_read_success_count = len(files) - len(to_read) - len(deferred)
+	read_results = ddm.get_demo_info([files[i] for i in to_read], datamode)
+	for i, result in zip(to_read, read_results):
+		if isinstance(result, Exception):
+			validators[i] = None
+			if encountered_exception is None:
+				encountered_exception = result
+			else:
+				if same_exception and result != encountered_exception:
+					same_exception = False
+			continue
+		info_read_success_count += 1
+		demo_info[i] = result
+
+	ddm.destroy()
+
+	if ddm.is_cancelled():
+		return (None, [], None, THREADSIG.ABORTED)
+
+	if catalog is not None:
+		read_indices = set(to_read)
+		changed = []
+		for i, name in enumerate(files):
+			entry = catalog_entries.get(name)
+			size = table.get_size(i)
+			mtime = table.get_mtime(i)
+			if i in read_indices or entry is None or entry.size != size or entry.mtime != mtime:
+				changed.append((name, size, mtime, datamode, validators[i], demo_info[i]))
+		stored_mtime = dir_mtime
+		if not listed_from_catalog and listed_at - dir_mtime < _DIR_MTIME_GRANULARITY:
+			# A demo created right after listing may not have changed the
+			# directory's mtime, so don't trust the listing next time.
+			stored_mtime = None
+		try:
+			if changed or not listed_from_catalog:
+				catalog.update_directory(
+					targetdir, stored_mtime, None if listed_from_catalog else files, changed
+				)
+		except OSError:
+			pass
+
+	if datamode is CNST.DATA_GRAB_MODE.NONE:
+		res_msg = "Demo information disabled."
+	elif deferred:
+		res_msg = (
+			f"Read {len(files)} demos in {round(time.time() - starttime, 4)} seconds, "
+			f"loading demo information of {len(deferred)} in the background."
 		)
-		return
+	else:
+		res_msg = (
+			f"Processed data from {info_read_success_count}/{len(files)} files in "
+			f"{round(time.time() - starttime, 4)} seconds"
+		)
+		if encountered_exception is not None and same_exception:
+			res_msg += f": {encountered_exception}."
+		else:
+			res_msg += "."
+
+	return (table, [files[i] for i in deferred], res_msg, THREADSIG.SUCCESS)
@@ -0,0 +1,75 @@
+"""Contains the ThreadReadLibrary class."""
+
+import time
+
+from demomgr.threads.read_folder import read_folder
+from demomgr.threads._lanes import run_in_lanes
+from demomgr.threads._threadsig import THREADSIG
+from demomgr.threads._base import _StoppableBaseThread
+from demomgr.threads._pool import TASK_PRIORITY
+
+class ThreadReadLibrary(_StoppableBaseThread):
+	"""
+	Thread to read several demo directories at once, one lane per
+	storage device, for the aggregate view of all demo paths.
+
+	Sent to the output queue:
+		RESULT_DEMODATA(1) for each directory that was read, in the
+				order they complete.
+			- Demo data as a DemoTable like sent by `ThreadReadFolder`,
+				with the directory of each demo set.
+
+		INFO_STATUSBAR(2) for displaying info on a statusbar
+			- Message to be displayed.
+			- Timeout to remove the message after (May be `None`)
+				to specify permanent duration.
+	"""
+
+	PRIORITY = TASK_PRIORITY.INTERACTIVE
+
+	def __init__(self, queue_out, paths, cfg):
+		"""
+		Thread requires an output queue and the following args:
+			paths <List[Str]>: Full paths to the directories to be read out
+			cfg <Config>: Program configuration
+		"""
+		self.paths = paths
+		self.cfg = cfg
+
+		super().__init__(None, queue_out)
+
+	def run(self):
+		starttime = time.time()
+		self.queue_out_put(
+			THREADSIG.INFO_STATUSBAR, "Reading demo information of all demo paths...", None
+		)
+
+		failed = []
+		demo_amount = 0
+		for i, (path, (data, _, _, exitcode)) in enumerate(run_in_lanes(
+			self.paths, lambda p: read_folder(p, self.cfg, self.stoprequest), self.stoprequest
+		)):
+			if exitcode is THREADSIG.SUCCESS:
+				data.set_directory(path)
+				demo_amount += len(data)
+				self.queue_out_put(THREADSIG.RESULT_DEMODATA, data)
+			elif exitcode is THREADSIG.FAILURE:
+				failed.append(path)
+			self.queue_out_put(
+				THREADSIG.INFO_STATUSBAR,
+				f"Reading demo information of all demo paths; {i + 1} / {len(self.paths)}",
+				None,
+			)
+
+		if self.stoprequest.is_set():
+			self.queue_out_put(THREADSIG.ABORTED)
+			return
+
+		res_msg = (
+			f"Read {demo_amount} demos from {len(self.paths) - len(failed)}/{len(self.paths)} "
+			f"demo paths in {round(time.time() - starttime, 4)} seconds."
+		)
+		if failed:
+			res_msg += f" Failed: {', '.join(failed)}"
+		self.queue_out_put(THREADSIG.INFO_STATUSBAR, res_msg, 5000)
+		self.queue_out_put(THREADSIG.SUCCESS)
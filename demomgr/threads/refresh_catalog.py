@@ -0,0 +1,46 @@
+"""Contains the ThreadRefreshCatalog class."""
+
+from demomgr.io_governor import get_io_governor
+from demomgr.threads.read_folder import read_folder
+from demomgr.threads._threadsig import THREADSIG
+from demomgr.threads._base import _StoppableBaseThread
+from demomgr.threads._pool import TASK_PRIORITY
+
+class ThreadRefreshCatalog(_StoppableBaseThread):
+	"""
+	Thread to bring the library catalog up to date for a set of
+	directories in the background, so switching to them later is quick.
+	All of the thread's I/O is background I/O, see `io_governor`.
+
+	Sent to the output queue:
+		INFO_IDX_PARAM(1) after each directory.
+			- Index of the directory that was refreshed.
+			- Finish signal of reading it; one of `SUCCESS`, `FAILURE`.
+	"""
+
+	PRIORITY = TASK_PRIORITY.BACKGROUND
+
+	def __init__(self, queue_out, paths, cfg):
+		"""
+		Thread requires an output queue and the following args:
+			paths <List[Str]>: Directories to refresh.
+			cfg <Config>: Program configuration
+		"""
+		self.paths = paths
+		self.cfg = cfg
+
+		super().__init__(None, queue_out)
+
+	def run(self):
+		with get_io_governor().background():
+			self._refresh()
+
+	def _refresh(self):
+		for i, path in enumerate(self.paths):
+			_, _, _, exitcode = read_folder(path, self.cfg, self.stoprequest)
+			if exitcode is THREADSIG.ABORTED or self.stoprequest.is_set():
+				self.queue_out_put(THREADSIG.ABORTED)
+				return
+			self.queue_out_put(THREADSIG.INFO_IDX_PARAM, i, exitcode)
+
+		self.queue_out_put(THREADSIG.SUCCESS)
@@ -0,0 +1,155 @@
+"""Contains the ThreadRenameDemos class."""
+
+from concurrent.futures import CancelledError
+import os
+
+from demomgr.demo_data_manager import rename_demo_info
+from demomgr.helpers import (
+	NAME_PATTERN_HEADER_FIELDS, format_demo_name, get_name_pattern_fields, readdemoheaders
+)
+from demomgr.threads._threadsig import THREADSIG
+from demomgr.threads._base import _StoppableBaseThread
+
+
+class ThreadRenameDemos(_StoppableBaseThread):
+	"""
+	Thread for renaming many demos of a directory after a name pattern,
+	see `helpers.format_demo_name`, taking their demo info along.
+	Demos whose new name is taken, shared with another demo or can't
+	be built fail, all others are renamed. The demo info of all renamed
+	demos is then moved at once, so `_events.txt` is rewritten once.
+	If the thread is stopped, no more demos are renamed, but the info
+	of the ones renamed so far is still moved.
+
+	Sent to the output queue:
+		FILE_OPERATION_SUCCESS(2) when a demo was renamed.
+			- Old name of the demo.
+			- New name of the demo.
+
+		FILE_OPERATION_FAILURE(2) when a demo could not be renamed.
+			- Name of the demo.
+			- Error that occurred.
+
+		RESULT_INFO_WRITE_RESULTS(2) for each container type once the
+				demo info of all renamed demos was moved.
+			- Container type as the proper enum member.
+			- Dict mapping the old names of renamed demos to `None` if
+				their info was moved successfully or the exception that
+				prevented it.
+	"""
+	def __init__(self, queue_out, directory, names, pattern, cfg, headers = None):
+		"""
+		Thread takes an output queue and the following args:
+			directory <Str>: Absolute path to the directory containing
+				the demos.
+			names <List[Str]>: Names of the demos to rename, in the
+				order their `{n}` field is counted up in, starting at 1.
+			pattern <Str>: Name pattern for the new names.
+			cfg <config.Config>: Program configuration.
+			headers <Dict[Str, Dict]|None>: Already known headers of some
+				demos. Missing ones are read if the pattern requires them.
+		"""
+		self.directory = directory
+		self.names = names
+		self.pattern = pattern
+		self.cfg = cfg
+		self.headers = {} if headers is None else headers
+
+		super().__init__(None, queue_out)
+
+	def _get_new_names(self):
+		"""
+		Builds the new names of all demos. Returns a dict mapping names
+		to either their new name or an exception.
+		"""
+		fields = get_name_pattern_fields(self.pattern)
+		headers = self.headers
+		if not fields.isdisjoint(NAME_PATTERN_HEADER_FIELDS):
+			headers = headers.copy()
+			missing = [name for name in self.names if headers.get(name) is None]
+			read = readdemoheaders(
+				(os.path.join(self.directory, name) for name in missing), self.stoprequest
+			)
+			headers.update(zip(missing, read))
+
+		res = {}
+		for i, name in enumerate(self.names, 1):
+			header = headers.get(name)
+			if isinstance(header, Exception):
+				res[name] = header
+				continue
+			try:
+				mtime = None
+				if "date" in fields:
+					mtime = os.stat(os.path.join(self.directory, name)).st_mtime
+				res[name] = format_demo_name(self.pattern, name, i, mtime, header)
+			except (OSError, ValueError) as e:
+				res[name] = e
+		return res
+
+	def _is_same_file(self, a, b):
+		try:
+			return os.path.samefile(os.path.join(self.directory, a), os.path.join(self.directory, b))
+		except OSError:
+			return False
+
+	def _check_conflicts(self, new_names):
+		"""
+		Replaces new names in `new_names` that would overwrite another
+		demo with an exception.
+		"""
+		targets = {}
+		for name, new_name in new_names.items():
+			if not isinstance(new_name, Exception) and new_name != name:
+				targets.setdefault(new_name, []).append(name)
+		for new_name, names in targets.items():
+			if len(names) > 1:
+				err = FileExistsError(f"{len(names)} demos would be named {new_name}")
+			elif os.path.lexists(os.path.join(self.directory, new_name)):
+				if self._is_same_file(names[0], new_name):
+					continue # Case-only rename on a case-insensitive file system
+				err = FileExistsError(f"{new_name} already exists")
+			else:
+				continue
+			for name in names:
+				new_names[name] = err
+
+	def run(self):
+		try:
+			new_names = self._get_new_names()
+		except ValueError as e:
+			for name in self.names:
+				self.queue_out_put(THREADSIG.FILE_OPERATION_FAILURE, name, e)
+			self.queue_out_put(THREADSIG.FAILURE)
+			return
+		self._check_conflicts(new_names)
+
+		finish_sig = THREADSIG.SUCCESS
+		renames = {}
+		for name in self.names:
+			new_name = new_names[name]
+			if self.stoprequest.is_set():
+				finish_sig = THREADSIG.ABORTED
+				break
+			if isinstance(new_name, CancelledError):
+				continue
+			if isinstance(new_name, Exception):
+				self.queue_out_put(THREADSIG.FILE_OPERATION_FAILURE, name, new_name)
+				continue
+			if new_name == name:
+				self.queue_out_put(THREADSIG.FILE_OPERATION_SUCCESS, name, new_name)
+				continue
+			try:
+				os.rename(
+					os.path.join(self.directory, name), os.path.join(self.directory, new_name)
+				)
+			except OSError as e:
+				self.queue_out_put(THREADSIG.FILE_OPERATION_FAILURE, name, e)
+				continue
+			renames[name] = new_name
+			self.queue_out_put(THREADSIG.FILE_OPERATION_SUCCESS, name, new_name)
+
+		if renames:
+			for mode, results in rename_demo_info(self.directory, renames, self.cfg).items():
+				self.queue_out_put(THREADSIG.RESULT_INFO_WRITE_RESULTS, mode, results)
+		self.queue_out_put(finish_sig)
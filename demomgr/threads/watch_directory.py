@@ -0,0 +1,200 @@
+"""Contains the ThreadWatchDirectory class."""
+
+import os
+import time
+
+from demomgr.demo_data_manager import DemoDataManager
+from demomgr.demo_info import DemoInfo, is_same_info
+from demomgr.dir_watch import CONTAINER_FILES, WatcherGone, get_watcher
+from demomgr.handle_events import EventTailReader
+from demomgr.threads.read_folder import read_folder
+from demomgr.threads._threadsig import THREADSIG
+from demomgr.threads._base import _StoppableBaseThread
+from demomgr import constants as CNST
+
+# Seconds to keep collecting changes after the first one, as files
+# usually change in bursts.
+_SETTLE_TIME = 0.3
+
+class ThreadWatchDirectory(_StoppableBaseThread):
+	"""
+	Thread to watch a demo directory for changes until stopped, reporting
+	demos that were added, removed or modified, including changes to
+	their demo information.
+	Runs in a dedicated thread and not on the worker pool, as it lives
+	for as long as the directory is displayed.
+	In the `EVENTS` data grab mode, `_events.txt` is followed, so only
+	chunks appended to it are parsed.
+
+	Sent to the output queue:
+		RESULT_DEMO_UPDATE(2) for each demo that changed.
+			- Name of the demo.
+			- Dict of the demo's new row in the format of a single row of
+				`ThreadReadFolder`'s demo data or `None` if it was removed.
+
+		INFO_STATUSBAR(2) when watching stops due to an error.
+			- Message to be displayed.
+			- Timeout to remove the message after.
+	"""
+
+	def __init__(self, queue_out, targetdir, cfg):
+		"""
+		Thread requires an output queue and the following args:
+			targetdir <Str>: Full path to the directory to be watched
+			cfg <Config>: Program configuration
+		"""
+		self.targetdir = targetdir
+		self.cfg = cfg
+		self._known = {}
+		self._events_tail = None
+
+		super().__init__(None, queue_out)
+
+	def run(self):
+		try:
+			watcher = get_watcher(self.targetdir)
+		except OSError as e:
+			self.queue_out_put(THREADSIG.INFO_STATUSBAR, f"Can not watch directory: {e}", 5000)
+			self.queue_out_put(THREADSIG.FAILURE)
+			return
+
+		if self.cfg.data_grab_mode is CNST.DATA_GRAB_MODE.EVENTS:
+			self._events_tail = EventTailReader(
+				os.path.join(self.targetdir, CNST.EVENT_FILE),
+				blocksz = self.cfg.events_blocksize,
+				from_end = True,
+			)
+			self._read_events_tail()
+
+		try:
+			# Baseline to compare changes against. This is cheap, as the directory
+			# was just read and its info is cached.
+			data, _, _, exitcode = read_folder(self.targetdir, self.cfg, self.stoprequest)
+			if exitcode is not THREADSIG.SUCCESS:
+				self.queue_out_put(THREADSIG.ABORTED if exitcode is THREADSIG.ABORTED else exitcode)
+				return
+			for name, size, mtime, info in zip(
+				data.names, data.get_sizes(), data.get_mtimes(), data.demo_info
+			):
+				self._known[name] = (size, mtime, info)
+
+			while not self.stoprequest.is_set():
+				changed = watcher.wait(0.25)
+				if not changed:
+					continue
+				settle_end = time.monotonic() + _SETTLE_TIME
+				while not self.stoprequest.is_set():
+					remaining = settle_end - time.monotonic()
+					if remaining <= 0:
+						break
+					changed |= watcher.wait(remaining)
+				self._process_changes(changed)
+		except WatcherGone as e:
+			self.queue_out_put(THREADSIG.INFO_STATUSBAR, str(e), 5000)
+			self.queue_out_put(THREADSIG.FAILURE)
+			return
+		except OSError as e:
+			self.queue_out_put(
+				THREADSIG.INFO_STATUSBAR, f"Stopped watching directory: {e}", 5000
+			)
+			self.queue_out_put(THREADSIG.FAILURE)
+			return
+		finally:
+			watcher.close()
+
+		self.queue_out_put(THREADSIG.ABORTED)
+
+	def _read_events_tail(self):
+		"""
+		Reads the chunks appended to the followed events file and returns
+		a dict mapping the names of the demos they describe to their new
+		demo info. If the file was rewritten, all known demos without a
+		chunk are mapped to `None`.
+		Returns `None` if the file can't be followed anymore.
+		"""
+		try:
+			restarted, chunks = self._events_tail.read_new()
+		except (OSError, UnicodeDecodeError):
+			self._events_tail = None
+			return None
+
+		infos = {}
+		for chk in chunks:
+			try:
+				info = DemoInfo.from_raw_logchunk(chk)
+			except ValueError:
+				continue
+			infos[info.demo_name] = info
+		if restarted:
+			for name in self._known:
+				infos.setdefault(name, None)
+		return infos
+
+	def _process_changes(self, changed):
+		"""
+		Re-reads the demos affected by the changed directory entries and
+		reports the ones that actually differ from what is known.
+		"""
+		demos = set()
+		for name in changed:
+			stem, ext = os.path.splitext(name)
+			if ext == ".dem":
+				demos.add(name)
+			elif ext == ".json":
+				demos.add(stem + ".dem")
+
+		tail_infos = None
+		if self._events_tail is not None and CNST.EVENT_FILE in changed:
+			tail_infos = self._read_events_tail()
+		if self._events_tail is not None:
+			if tail_infos is not None:
+				demos.update(tail_infos)
+		elif any(c in changed for c in CONTAINER_FILES):
+			demos.update(self._known)
+		if not demos:
+			return
+
+		demos = sorted(demos)
+		ddm = DemoDataManager(self.targetdir, self.cfg, self.stoprequest)
+		fs_info = ddm.get_fs_info(demos)
+		present = [
+			name for name, fs in zip(demos, fs_info)
+			if isinstance(fs, dict) and os.path.isfile(os.path.join(self.targetdir, name))
+		]
+		infos = {}
+		to_read = []
+		for name in present:
+			if tail_infos is not None and name in tail_infos:
+				infos[name] = tail_infos[name]
+			elif self._events_tail is not None and name in self._known:
+				# The followed events file did not mention it, so its info is unchanged.
+				infos[name] = self._known[name][2]
+			else:
+				to_read.append(name)
+		if to_read:
+			infos.update(zip(to_read, ddm.get_demo_info(to_read, self.cfg.data_grab_mode)))
+		ddm.destroy()
+		if self.stoprequest.is_set():
+			return
+
+		for name, fs in zip(demos, fs_info):
+			if name not in infos:
+				if name in self._known and isinstance(fs, FileNotFoundError):
+					del self._known[name]
+					self.queue_out_put(THREADSIG.RESULT_DEMO_UPDATE, name, None)
+				continue
+
+			info = infos[name]
+			if isinstance(info, Exception):
+				info = None
+			new = (fs["size"], fs["mtime"], info)
+			old = self._known.get(name)
+			if old is not None and old[:2] == new[:2] and is_same_info(old[2], info):
+				continue
+			self._known[name] = new
+			self.queue_out_put(THREADSIG.RESULT_DEMO_UPDATE, name, {
+				"col_filename": name,
+				"col_demo_info": info,
+				"col_ctime": fs["mtime"],
+				"col_filesize": fs["size"],
+			})
@@ -2,8 +2,9 @@ from .headed_frame import HeadedFrame
 from .key_value_display import KeyValueDisplay
 from .misc import PasswordButton, DmgrEntry, DmgrSpinbox, DynamicLabel, purge_commands
 from .ttk_text import TtkText
+from .virtual_multiframe_list import VirtualMultiframeList
 
 __all__ = (
 	"DmgrEntry", "DmgrSpinbox", "DynamicLabel", "HeadedFrame", "KeyValueDisplay",
-	"PasswordButton", "TtkText", "purge_commands"
+	"PasswordButton", "TtkText", "VirtualMultiframeList", "purge_commands"
 )
@@ -0,0 +1,393 @@
+"""
+VirtualMultiframeList, a MultiframeList that only renders the rows
+around its viewport.
+"""
+
+from bisect import bisect_left
+import tkinter as tk
+
+import multiframe_list.multiframe_list as mfl
+
+# Rows rendered above and below the viewport.
+_MARGIN = 64
+
+# NOTE: This hooks into internals of multiframe_list 4.0.1 (see requirements.txt),
+# check it still works when upgrading.
+
+class _WindowedColumn(mfl._Column):
+	"""
+	Column that leaves formatting to its VirtualMultiframeList, which
+	only formats the rows it renders, and changes its data in place
+	instead of rebuilding it.
+	"""
+	def format(self, exclusively = None):
+		if self.assignedframe is not None:
+			self.mfl._schedule_render()
+
+	def data_insert(self, elem, index = None):
+		if index is None:
+			self.data.append(elem)
+		else:
+			self.data.insert(index, elem)
+		if self.assignedframe is not None:
+			self.mfl._schedule_render()
+
+	def data_delete(self, from_, to = None):
+		to = from_ + 1 if to is None else to
+		if to <= from_:
+			return
+		del self.data[from_:to]
+		if self.assignedframe is not None:
+			self.mfl._schedule_render()
+
+
+class _ListboxWindow():
+	"""
+	Stands in for the tk Listbox of a VirtualMultiframeList's frame.
+	The MultiframeList talks to it in logical row indices, which are
+	translated to the rendered window of rows; everything else is
+	passed through to the actual listbox.
+	Content written to it is ignored, as the VirtualMultiframeList
+	renders the window from its columns' data.
+	"""
+	def __init__(self, owner, listbox):
+		self._owner = owner
+		self.listbox = listbox
+
+	def __getattr__(self, name):
+		return getattr(self.listbox, name)
+
+	def __getitem__(self, key):
+		return self.listbox[key]
+
+	def __setitem__(self, key, value):
+		self.listbox[key] = value
+
+	def __str__(self):
+		return str(self.listbox)
+
+	def insert(self, index, *elements):
+		self._owner._schedule_render()
+
+	def delete(self, first, last = None):
+		self._owner._schedule_render()
+
+	def size(self):
+		return self._owner.length
+
+	def see(self, index):
+		self._owner._see(index)
+
+	def itemconfigure(self, index, cnf = None, **kw):
+		index = self._owner._to_window(index)
+		if index is not None:
+			self.listbox.itemconfigure(index, cnf, **kw)
+
+	def selection_set(self, first, last = None):
+		# The MultiframeList only ever sets single items
+		first = self._owner._to_window(first)
+		if first is not None:
+			self.listbox.selection_set(first)
+
+	def selection_clear(self, first, last = None):
+		# The MultiframeList only ever clears everything
+		self.listbox.selection_clear(0, tk.END)
+
+	def yview(self, *args):
+		if not args:
+			return self._owner._get_yview()
+		self._owner._scrollallbar(*args)
+
+	def yview_moveto(self, fraction):
+		self._owner._scroll_to(int(float(fraction) * self._owner.length))
+
+
+class VirtualMultiframeList(mfl.MultiframeList):
+	"""
+	A MultiframeList that keeps its data in its columns as usual, but
+	only renders the rows in and around its viewport into its listboxes,
+	formatting them as they are rendered. Setting, sorting and
+	formatting data therefore takes time proportional to the viewport
+	and not to the amount of rows, and Tk does not have to hold all of
+	them. Column data is changed in place, and a cell is set in
+	constant time; see `set_cells` for setting many at once.
+	Unlike with a MultiframeList, inserting and removing rows keeps the
+	selection and the active cell on the rows they were on.
+	Row indices, the selection and the active cell are logical, so it
+	is used exactly like a MultiframeList. The listboxes in `frames`
+	are replaced by wrappers translating those indices; the actual
+	listbox is in their `listbox` attribute.
+	"""
+
+	def __init__(self, master, inicolumns = None, **kwargs):
+		# First logical row rendered into the listboxes and amount of rows rendered
+		self._offset = 0
+		self._rendered = 0
+		# First logical row in the viewport
+		self._top = 0
+		self._render_handle = None
+
+		super().__init__(master, **kwargs)
+
+		if inicolumns is not None:
+			self.add_frames(len(inicolumns))
+			for index, colopt in enumerate(inicolumns):
+				new_col = _WindowedColumn(self, **colopt)
+				new_col.setdisplay(index)
+				self.columns[new_col.col_id] = new_col
+
+		self.framecontainer.bind("<Configure>", lambda _: self._schedule_render(), add = True)
+
+	def add_columns(self, *coldicts):
+		for coldict in coldicts:
+			new_col = _WindowedColumn(self, **coldict)
+			self.columns[new_col.col_id] = new_col
+
+	def add_frames(self, amount):
+		startindex = len(self.frames)
+		super().add_frames(amount)
+		for frame in self.frames[startindex:]:
+			frame[1] = _ListboxWindow(self, frame[1])
+		self._render()
+
+	def format(self, targetcols = None, indices = None):
+		self._schedule_render()
+
+	def set_cell(self, col_to_mod, y, data, reset_sortstate = True):
+		self.set_cells((col_to_mod,), ((y, data),), reset_sortstate)
+
+	def insert_row(self, data, insindex = None, reset_sortstate = True):
+		at = self.length if insindex is None else insindex
+		self._keep_rows(
+			lambda i: i + 1 if i >= at else i,
+			lambda: super(VirtualMultiframeList, self).insert_row(data, insindex, reset_sortstate),
+		)
+
+	def remove_rows(self, what, to = None):
+		if isinstance(what, int):
+			removed = list(range(what, what + 1 if to is None else to))
+		else:
+			removed = sorted(what)
+		removed_set = set(removed)
+		self._keep_rows(
+			lambda i: None if i in removed_set else i - bisect_left(removed, i),
+			lambda: super(VirtualMultiframeList, self).remove_rows(what, to),
+		)
+
+	def replace_data(self, data, row_map, reset_sortstate = True):
+		"""
+		Sets the data of the MultiframeList like `set_data`, keeping the
+		selection and the active cell on the rows that `row_map`, a
+		function, maps their old row indices to. Rows mapped to `None`
+		are considered removed.
+		"""
+		self._keep_rows(row_map, lambda: self.set_data(data, reset_sortstate))
+
+	def _keep_rows(self, row_map, change):
+		"""
+		Calls `change`, which inserts or removes rows, and then moves the
+		selection and the active cell to the rows `row_map` maps their
+		old row indices to, dropping them for rows it maps to `None`.
+		Generates a <<MultiframeSelect>> event if selected rows were
+		removed.
+		"""
+		selection = self.selection.copy()
+		anchor = self._selection_anchor
+		active_y = self.active_cell_y
+		# Cleared silently, so changing the length does not report an empty selection
+		self.selection.clear()
+		if active_y is not None and self.active_cell_x is not None:
+			self._undraw_active_cell()
+		self.active_cell_y = None
+
+		change()
+
+		new_selection = {row_map(i) for i in selection} - {None}
+		self.selection.update(new_selection)
+		anchor = None if anchor is None else row_map(anchor)
+		if anchor is None and new_selection:
+			anchor = min(new_selection)
+		self._selection_anchor = anchor
+		if active_y is not None:
+			self.active_cell_y = row_map(active_y)
+			self._redraw_active_cell()
+		self._redraw_selection()
+		if len(new_selection) != len(selection):
+			self.event_generate("<<MultiframeSelect>>", when = "tail")
+
+	def set_cells(self, col_ids, cells, reset_sortstate = True):
+		"""
+		Sets the cells of all columns in `col_ids` in the rows given by
+		`cells`, an iterable of (row index, value) pairs, to that value.
+		The rows around the viewport are rendered anew once if any of
+		them changed.
+		The function takes an optional reset_sortstate parameter to control whether
+		or not to reset the sortstates on all columns. (Default True)
+		"""
+		if reset_sortstate:
+			self._reset_sortstate()
+		cols = [self._get_col_by_id(col_id) for col_id in col_ids]
+		end = self._offset + self._rendered
+		rendered = False
+		for y, value in cells:
+			if y > (self.length - 1):
+				raise IndexError("Cell index does not exist.")
+			for col in cols:
+				col.data[y] = value
+			rendered |= self._offset <= y < end
+		if rendered:
+			self._schedule_render()
+
+	def _schedule_render(self):
+		"""
+		Renders the rows around the viewport once Tk is idle. Data
+		changes come in bulk, so they are not rendered one by one.
+		"""
+		if self._render_handle is None:
+			self._render_handle = self.after_idle(self._render)
+
+	def _visible_rows(self):
+		"""
+		Returns the amount of rows fitting into the listboxes.
+		"""
+		if not self.frames:
+			return self.cnf.listboxheight
+		lb = self.frames[0][1].listbox
+		height = lb.winfo_height() - 2 * (int(lb["borderwidth"]) + int(lb["highlightthickness"]))
+		if height <= 1:
+			# Not mapped yet
+			return self.cnf.listboxheight
+		return max(1, height // self._get_listbox_entry_height(lb))
+
+	def _render(self):
+		"""
+		Renders the rows in and around the viewport into the listboxes,
+		then restores selection and active cell on them.
+		"""
+		if self._render_handle is not None:
+			self.after_cancel(self._render_handle)
+			self._render_handle = None
+		visible = self._visible_rows()
+		self._top = max(0, min(self._top, self.length - visible))
+		self._offset = max(0, self._top - _MARGIN)
+		end = min(self.length, self._top + visible + _MARGIN)
+		self._rendered = end - self._offset
+
+		for fidx, frame in enumerate(self.frames):
+			col = self._get_col_by_frame(fidx)
+			if col is None:
+				items = (mfl.BLANK for _ in range(self._rendered))
+			elif col.cnf.formatter is None:
+				items = col.data[self._offset:end]
+			else:
+				items = [col.cnf.formatter(x) for x in col.data[self._offset:end]]
+			lb = frame[1].listbox
+			lb.delete(0, tk.END)
+			lb.insert(tk.END, *items)
+			lb.yview(self._top - self._offset)
+
+		self._redraw_selection()
+		self._redraw_active_cell()
+		self._update_scrollbar(visible)
+
+	def _to_window(self, index):
+		"""
+		Translates a logical row index to an index into the listboxes,
+		or `None` if it is not rendered.
+		"""
+		if isinstance(index, int) and self._offset <= index < self._offset + self._rendered:
+			return index - self._offset
+		return None
+
+	def _get_yview(self):
+		if self.length == 0:
+			return (0.0, 1.0)
+		return (
+			self._top / self.length,
+			min(1.0, (self._top + self._visible_rows()) / self.length),
+		)
+
+	def _update_scrollbar(self, visible):
+		if self.length == 0:
+			self.scrollbar.set(0.0, 1.0)
+		else:
+			self.scrollbar.set(
+				self._top / self.length, min(1.0, (self._top + visible) / self.length)
+			)
+
+	def _scroll_to(self, top):
+		"""
+		Scrolls the listboxes so that the logical row `top` is the first
+		one visible, rendering them anew if needed.
+		"""
+		visible = self._visible_rows()
+		self._top = top = max(0, min(top, self.length - visible))
+		if (
+			(self._offset > 0 and top - self._offset < _MARGIN // 2) or
+			(
+				self._offset + self._rendered < self.length and
+				self._offset + self._rendered - (top + visible) < _MARGIN // 2
+			)
+		):
+			self._render()
+			return
+		for frame in self.frames:
+			frame[1].listbox.yview(top - self._offset)
+		self._update_scrollbar(visible)
+
+	def _see(self, index):
+		visible = self._visible_rows()
+		if index < self._top:
+			self._scroll_to(index)
+		elif index >= self._top + visible:
+			self._scroll_to(index - visible + 1)
+
+	def _get_index_from_mouse_y(self, lb, y_pos):
+		offset = self._top
+		borderwidth = int(lb["borderwidth"])
+		e_height = self._get_listbox_entry_height(lb)
+		return ((y_pos - borderwidth) // e_height) + offset
+
+	def _redraw_selection(self):
+		end = self._offset + self._rendered
+		window_sel = [i - self._offset for i in self.selection if self._offset <= i < end]
+		for frame in self.frames:
+			# Frames being added are not wrapped yet; they are rendered right after.
+			if not isinstance(frame[1], _ListboxWindow):
+				continue
+			frame[1].listbox.selection_clear(0, tk.END)
+			for idx in window_sel:
+				frame[1].listbox.selection_set(idx)
+
+	def _scroll_get(self):
+		return self._top
+
+	def _scroll_restore(self, scroll):
+		self._scroll_to(scroll)
+
+	def _scrollallbar(self, *args):
+		"""Bound to the scrollbar, scrolls by logical rows."""
+		if args[0] == "moveto":
+			self._scroll_to(int(float(args[1]) * self.length))
+		elif args[0] == "scroll":
+			step = self._visible_rows() if args[2] == "pages" else 1
+			self._scroll_to(self._top + int(args[1]) * step)
+
+	def _scrollalllistbox(self, a, b):
+		"""
+		Bound to all listboxes, which scroll within the rendered rows on
+		their own when the mouse wheel is used. Scrolls the other
+		listboxes along and renders anew once the viewport gets close to
+		the edge of the rendered rows.
+		"""
+		if self._rendered == 0:
+			self.scrollbar.set(0.0, 1.0)
+			return
+		a = float(a)
+		b = float(b)
+		top = self._offset + round(a * self._rendered)
+		visible = max(1, round((b - a) * self._rendered))
+		if top != self._top:
+			self._scroll_to(top)
+		else:
+			self._update_scrollbar(visible)
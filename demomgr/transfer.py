@@ -0,0 +1,335 @@
+"""
+Copies and moves files between directories chunk by chunk, so that
+transfers can be cancelled midway and report their progress in bytes.
+Where the file system allows it, copies are made without moving the
+data through user space, see `copy_file`.
+All transfers are throttled by the I/O governor if they happen as
+background I/O, see `demomgr.io_governor`.
+Batches of files are transferred by a bounded pool of threads with one
+lane per pair of source and target device: Transfers between distinct
+devices run in parallel, while the ones on the same device don't
+compete for it.
+"""
+
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+import errno
+from functools import partial
+import os
+import shutil
+import sys
+import threading
+import time
+import typing as t
+
+try:
+	import fcntl
+except ImportError:
+	fcntl = None
+
+from demomgr.io_governor import ACCESS_HINT, get_io_governor
+
+CHUNK_SIZE = 1 << 20
+# Chunk size for copies within the kernel, which are cheaper per byte.
+RANGE_CHUNK_SIZE = 16 << 20
+# Suffix of files that are still being copied.
+PART_SUFFIX = ".dmgrpart"
+
+# Most lanes transferring at once
+_MAX_LANES = 4
+# Minimum time between two progress reports, in seconds
+_PROGRESS_INTERVAL = 0.1
+
+# ioctl to share a file's data with another one on copy-on-write file systems
+# such as btrfs and XFS, from linux/fs.h
+_FICLONE = 0x40049409
+_CAN_REFLINK = fcntl is not None and sys.platform.startswith("linux")
+_CAN_COPY_RANGE = hasattr(os, "copy_file_range")
+# Errors copy_file_range fails with if the files or file systems don't support it
+_COPY_RANGE_UNSUPPORTED = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.EBADF}
+
+
+def _reflink(fsrc: t.BinaryIO, fdst: t.BinaryIO) -> bool:
+	"""
+	Makes `fdst` share the data of `fsrc`. Returns whether that worked.
+	"""
+	if not _CAN_REFLINK:
+		return False
+	try:
+		fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+	except OSError:
+		return False
+	return True
+
+def _copy_range(
+	fsrc: t.BinaryIO,
+	fdst: t.BinaryIO,
+	cancel_token: t.Optional[threading.Event],
+	on_progress: t.Optional[t.Callable[[int], None]],
+) -> bool:
+	"""
+	Copies the rest of `fsrc` to `fdst` within the kernel. Returns
+	whether that worked; if it did not, both files are positioned
+	behind the data that was copied.
+	May raise: OSError, CancelledError.
+	"""
+	if not _CAN_COPY_RANGE:
+		return False
+	governor = get_io_governor()
+	chunk_size = governor.get_chunk_size(RANGE_CHUNK_SIZE)
+	copied = 0
+	try:
+		while True:
+			if cancel_token is not None and cancel_token.is_set():
+				raise CancelledError()
+			read = os.copy_file_range(fsrc.fileno(), fdst.fileno(), chunk_size)
+			if not read:
+				return True
+			copied += read
+			governor.throttle(read, 0, cancel_token)
+			if on_progress is not None:
+				on_progress(read)
+	except OSError as e:
+		if e.errno not in _COPY_RANGE_UNSUPPORTED:
+			raise
+	fsrc.seek(copied)
+	fdst.seek(copied)
+	return False
+
+
+def copy_file(
+	src: str,
+	dst: str,
+	cancel_token: t.Optional[threading.Event] = None,
+	on_progress: t.Optional[t.Callable[[int], None]] = None,
+	hardlink: bool = False,
+) -> None:
+	"""
+	Copies the file `src` to `dst` along with its permission bits, like
+	`shutil.copy`. The data is written to a partial file next to `dst`
+	that replaces it once complete and is removed again if copying
+	fails or is cancelled, so an existing `dst` is only overwritten by
+	a complete copy.
+	`cancel_token` is checked between chunks. `on_progress` is called
+	with the size of each copied chunk.
+	Copying tries the following, each falling back to the next:
+		- Cloning the file on copy-on-write file systems (Linux).
+		- If `hardlink` is true, hardlinking `dst` to `src`. Only works
+			on the same file system; the files then share their data and
+			permissions.
+		- Copying within the kernel with `os.copy_file_range` (Linux).
+		- Copying through a buffer.
+
+	May raise: OSError, CancelledError.
+	"""
+	governor = get_io_governor()
+	governor.throttle(0, 1, cancel_token)
+	part = dst + PART_SUFFIX
+	try:
+		with open(src, "rb") as fsrc:
+			size = os.fstat(fsrc.fileno()).st_size
+			governor.advise(fsrc.fileno(), ACCESS_HINT.SEQUENTIAL)
+			with open(part, "wb") as fdst:
+				cloned = _reflink(fsrc, fdst)
+				if not cloned and not hardlink:
+					_copy_data(fsrc, fdst, cancel_token, on_progress)
+			if not cloned and hardlink:
+				if _hardlink(src, part):
+					if on_progress is not None:
+						on_progress(size)
+					# Hardlinks share their permissions with src already
+					os.replace(part, dst)
+					return
+				with open(part, "wb") as fdst:
+					_copy_data(fsrc, fdst, cancel_token, on_progress)
+			if cloned and on_progress is not None:
+				on_progress(size)
+			governor.advise(fsrc.fileno(), ACCESS_HINT.DONE)
+		shutil.copymode(src, part)
+		os.replace(part, dst)
+	except BaseException:
+		try:
+			os.unlink(part)
+		except OSError:
+			pass
+		raise
+
+def _hardlink(src: str, part: str) -> bool:
+	"""
+	Replaces the empty partial file `part` with a hardlink to `src`.
+	Returns whether that worked.
+	"""
+	try:
+		os.unlink(part)
+		os.link(src, part)
+	except OSError:
+		return False
+	return True
+
+def _copy_data(
+	fsrc: t.BinaryIO,
+	fdst: t.BinaryIO,
+	cancel_token: t.Optional[threading.Event],
+	on_progress: t.Optional[t.Callable[[int], None]],
+) -> None:
+	if not _copy_range(fsrc, fdst, cancel_token, on_progress):
+		_copy_buffered(fsrc, fdst, cancel_token, on_progress)
+
+def _copy_buffered(
+	fsrc: t.BinaryIO,
+	fdst: t.BinaryIO,
+	cancel_token: t.Optional[threading.Event],
+	on_progress: t.Optional[t.Callable[[int], None]],
+) -> None:
+	governor = get_io_governor()
+	buf = bytearray(governor.get_chunk_size(CHUNK_SIZE))
+	view = memoryview(buf)
+	while True:
+		if cancel_token is not None and cancel_token.is_set():
+			raise CancelledError()
+		read = fsrc.readinto(buf)
+		if not read:
+			break
+		fdst.write(view[:read])
+		governor.throttle(read, 0, cancel_token)
+		if on_progress is not None:
+			on_progress(read)
+
+def move_file(
+	src: str,
+	dst: str,
+	cancel_token: t.Optional[threading.Event] = None,
+	on_progress: t.Optional[t.Callable[[int], None]] = None,
+) -> None:
+	"""
+	Moves the file `src` to `dst`, overwriting it. Renames it if both
+	are on the same file system, otherwise copies it with `copy_file`
+	and removes `src` afterwards.
+
+	May raise: OSError, CancelledError.
+	"""
+	get_io_governor().throttle(0, 1, cancel_token)
+	try:
+		os.replace(src, dst)
+		return
+	except OSError as e:
+		if e.errno != errno.EXDEV:
+			raise
+	copy_file(src, dst, cancel_token, on_progress)
+	os.unlink(src)
+
+
+class TransferEngine():
+	"""
+	Transfers batches of files, see the module docstring.
+	"""
+
+	def __init__(
+		self,
+		cancel_token: t.Optional[threading.Event] = None,
+		on_progress: t.Optional[t.Callable[[int, int], None]] = None,
+		hardlink: bool = False,
+	) -> None:
+		"""
+		cancel_token: Optional event. Once it is set, running transfers
+			are cancelled and no more are started.
+		on_progress: Called with the amount of bytes transferred so far
+			and in total from any of the transferring threads, every
+			now and then and once all transfers are done.
+		hardlink: Whether copies may be hardlinks to their source, see
+			`copy_file`.
+		"""
+		self.cancel_token = threading.Event() if cancel_token is None else cancel_token
+		self.on_progress = on_progress
+		self.hardlink = hardlink
+		self._lock = threading.Lock()
+		self._done_bytes = 0
+		self._total_bytes = 0
+		self._last_report = 0.0
+
+	def _add_progress(self, amount: int) -> None:
+		with self._lock:
+			self._done_bytes += amount
+			now = time.monotonic()
+			if self.on_progress is None or now - self._last_report < _PROGRESS_INTERVAL:
+				return
+			self._last_report = now
+			done, total = self._done_bytes, self._total_bytes
+		self.on_progress(done, total)
+
+	def _build_lanes(
+		self, jobs: t.Iterable[t.Tuple[t.Any, str, str]]
+	) -> t.Dict[t.Any, t.List[t.Tuple[t.Any, str, str, int]]]:
+		"""
+		Sorts jobs into lanes by the devices of their source file and
+		target directory and sums up their sizes. Jobs whose devices
+		can't be determined end up in a lane of their own, where they
+		will likely fail.
+		"""
+		lanes = {}
+		dir_devs = {}
+		for key, src, dst in jobs:
+			try:
+				stat_res = os.stat(src)
+				dst_dir = os.path.dirname(dst)
+				if dst_dir not in dir_devs:
+					dir_devs[dst_dir] = os.stat(dst_dir).st_dev
+				lane, size = (stat_res.st_dev, dir_devs[dst_dir]), stat_res.st_size
+			except OSError:
+				lane, size = None, 0
+			lanes.setdefault(lane, []).append((key, src, dst, size))
+			self._total_bytes += size
+		return lanes
+
+	def _run_lane(self, jobs, transfer, on_done) -> None:
+		for key, src, dst, size in jobs:
+			if self.cancel_token.is_set():
+				return
+			transferred = 0
+			def on_chunk(amount):
+				nonlocal transferred
+				transferred += amount
+				self._add_progress(amount)
+			try:
+				transfer(src, dst, self.cancel_token, on_chunk)
+			except CancelledError:
+				return
+			except OSError as e:
+				on_done(key, e)
+			else:
+				# Renamed files did not report any progress
+				self._add_progress(size - transferred)
+				on_done(key, None)
+
+	def run(
+		self,
+		jobs: t.Iterable[t.Tuple[t.Any, str, str]],
+		move: bool,
+		on_done: t.Callable[[t.Any, t.Optional[OSError]], None],
+	) -> None:
+		"""
+		Copies or moves (if `move` is true) files given as (key, source
+		path, target path) jobs and blocks until all are done or the
+		engine is cancelled. `on_done` is called from the transferring
+		threads with the key of each finished job and `None` or the
+		error that made it fail. Jobs that were not done because the
+		engine was cancelled are not reported.
+		"""
+		if move:
+			transfer = move_file
+		else:
+			transfer = partial(copy_file, hardlink = self.hardlink)
+		lanes = self._build_lanes(jobs)
+		if len(lanes) == 1:
+			self._run_lane(next(iter(lanes.values())), transfer, on_done)
+		elif lanes:
+			with ThreadPoolExecutor(min(len(lanes), _MAX_LANES)) as executor:
+				run_lane = get_io_governor().bind(self._run_lane)
+				futures = [
+					executor.submit(run_lane, lane_jobs, transfer, on_done)
+					for lane_jobs in lanes.values()
+				]
+			for future in futures:
+				future.result()
+
+		if self.on_progress is not None:
+			self.on_progress(self._done_bytes, self._total_bytes)
@@ -1,5 +1,9 @@
 #!/usr/bin/env python
+import multiprocessing
+
 from demomgr.main_app import MainApp
 
-m = MainApp()
-m.root.mainloop()
+if __name__ == "__main__":
+	multiprocessing.freeze_support()
+	m = MainApp()
+	m.root.mainloop()